@@ -19,9 +19,15 @@
 #include "PngIO.h"
 #include "TiffIO.h"
 
+#include <cstddef>
+#include <ios>
+#include <istream>
 #include <memory>
 #include <optional>
+#include <stdexcept>
+#include <streambuf>
 #include <string>
+#include <utility>
 
 namespace py = pybind11;
 
@@ -29,6 +35,65 @@ namespace cxximg {
 
 namespace io {
 
+namespace {
+
+// Decode with the GIL released, then copy the pixels into the caller's array which must have the decoded shape. The
+// image reader always allocates its own image: the formats decoded straight into the caller's array are read by the
+// region functions, this is the fallback of the other ones and saves no memory.
+template <typename Decode>
+void decodeInto(const Decode &decode, py::array &out) {
+    std::optional<decltype(decode())> decoded;
+    {
+        const py::gil_scoped_release release;
+        decoded.emplace(decode());
+    }
+    const py::array pixels(py::cast(std::move(*decoded)));
+    py::module_::import("numpy").attr("copyto")(out, pixels, py::arg("casting") = "no");
+}
+
+// Read-only stream buffer on memory owned by Python, the bytes are not copied.
+class MemoryBuffer : public std::streambuf {
+public:
+    MemoryBuffer(char *data, size_t size) { setg(data, data, data + size); }
+
+protected:
+    pos_type seekoff(off_type off, std::ios_base::seekdir dir, std::ios_base::openmode which) override {
+        char *origin = dir == std::ios_base::beg ? eback() : (dir == std::ios_base::cur ? gptr() : egptr());
+        char *target = origin + off;
+        if ((which & std::ios_base::in) == 0 || target < eback() || target > egptr()) {
+            return {off_type(-1)};
+        }
+        setg(eback(), target, egptr());
+        return {target - eback()};
+    }
+
+    pos_type seekpos(pos_type pos, std::ios_base::openmode which) override {
+        return seekoff(off_type(pos), std::ios_base::beg, which);
+    }
+};
+
+// Input stream on a Python buffer (bytes, bytearray, memoryview, numpy array). The buffer view is held until the
+// stream is destroyed, so the memory stays valid and can not be resized while readers use it.
+class MemoryStream {
+public:
+    explicit MemoryStream(const py::buffer &data)
+        : mInfo(data.request()),
+          mBuffer(static_cast<char *>(mInfo.ptr), static_cast<size_t>(mInfo.size * mInfo.itemsize)),
+          mStream(&mBuffer) {}
+
+    std::istream *stream() { return &mStream; }
+
+private:
+    py::buffer_info mInfo;
+    MemoryBuffer mBuffer;
+    std::istream mStream;
+};
+
+} // namespace
+
+void initRegionIO(py::module &mIO);    // NOLINT(misc-use-internal-linkage)
+void initMipiPacking(py::module &mIO); // NOLINT(misc-use-internal-linkage)
+
 void initIO(py::module &mod) {                                 // NOLINT(misc-use-internal-linkage)
     py::module_ mIO = mod.def_submodule("io", "io namespace"); // NOLINT(misc-const-correctness)
 
@@ -37,55 +102,107 @@ void initIO(py::module &mod) {                                 // NOLINT(misc-us
             .def("readMetadata",
                  [](ImageReader &self, py::object &metadata) {
                      std::optional<ImageMetadata> cls = metadata.cast<ImageMetadata>();
-                     self.readMetadata(cls);
+                     {
+                         const py::gil_scoped_release release;
+                         self.readMetadata(cls);
+                     }
                      return py::cast(cls);
                  })
-            .def("readExif", &ImageReader::readExif);
+            .def("readExif", &ImageReader::readExif, py::call_guard<py::gil_scoped_release>())
+            // Layout parsed from the file header (or the sidecar) when the reader is made, no pixel is decoded.
+            // Named like the Image accessors so that a reader can fill metadata.fileInfo the same way as an image.
+            .def("pixelType", [](const ImageReader &self) { return self.layoutDescriptor().pixelType; })
+            .def("pixelPrecision", [](const ImageReader &self) { return self.layoutDescriptor().pixelPrecision; })
+            .def("imageLayout", [](const ImageReader &self) { return self.layoutDescriptor().imageLayout; })
+            .def("width", [](const ImageReader &self) { return self.layoutDescriptor().width; })
+            .def("height", [](const ImageReader &self) { return self.layoutDescriptor().height; })
+            .def(
+                    "readInto",
+                    [](ImageReader &self, py::array &out) {
+                        if (py::isinstance<py::array_t<uint8_t>>(out)) {
+                            decodeInto([&self]() { return self.read8u(); }, out);
+                        } else if (py::isinstance<py::array_t<uint16_t>>(out)) {
+                            decodeInto([&self]() { return self.read16u(); }, out);
+                        } else if (py::isinstance<py::array_t<float>>(out)) {
+                            decodeInto([&self]() { return self.readf(); }, out);
+                        } else {
+                            throw std::invalid_argument("out must be a uint8, uint16 or float32 numpy array.");
+                        }
+                    },
+                    py::arg("out"),
+                    "Read the image and copy it into the numpy array out, which must have the shape and the dtype of "
+                    "the image. The image is decoded into a new buffer first.");
 
     py::class_<PlainReader, ImageReader> plainReader(mIO, "PlainReader");
-    plainReader.def("read8u", &PlainReader::read8u)
-            .def("read16u", &PlainReader::read16u)
-            .def("readf", &PlainReader::readf);
+    plainReader.def("read8u", &PlainReader::read8u, py::call_guard<py::gil_scoped_release>())
+            .def("read16u", &PlainReader::read16u, py::call_guard<py::gil_scoped_release>())
+            .def("readf", &PlainReader::readf, py::call_guard<py::gil_scoped_release>());
 
     py::class_<BmpReader, ImageReader> bmpReader(mIO, "BmpReader");
-    bmpReader.def("read8u", &BmpReader::read8u);
+    bmpReader.def("read8u", &BmpReader::read8u, py::call_guard<py::gil_scoped_release>());
 
     py::class_<JpegReader, ImageReader> jpegReader(mIO, "JpegReader");
-    jpegReader.def("read8u", &JpegReader::read8u).def("readExif", &JpegReader::readExif);
+    jpegReader.def("read8u", &JpegReader::read8u, py::call_guard<py::gil_scoped_release>())
+            .def("readExif", &JpegReader::readExif, py::call_guard<py::gil_scoped_release>());
 
     py::class_<PngReader, ImageReader> pngReader(mIO, "PngReader");
-    pngReader.def("read8u", &PngReader::read8u).def("read16u", &PngReader::read16u);
+    pngReader.def("read8u", &PngReader::read8u, py::call_guard<py::gil_scoped_release>())
+            .def("read16u", &PngReader::read16u, py::call_guard<py::gil_scoped_release>());
 
     py::class_<TiffReader, ImageReader> tiffReader(mIO, "TiffReader");
-    tiffReader.def("read8u", &TiffReader::read8u)
-            .def("read16u", &TiffReader::read16u)
-            .def("readf", &TiffReader::readf)
-            .def("readExif", &TiffReader::readExif);
+    tiffReader.def("read8u", &TiffReader::read8u, py::call_guard<py::gil_scoped_release>())
+            .def("read16u", &TiffReader::read16u, py::call_guard<py::gil_scoped_release>())
+            .def("readf", &TiffReader::readf, py::call_guard<py::gil_scoped_release>())
+            .def("readExif", &TiffReader::readExif, py::call_guard<py::gil_scoped_release>());
 
     py::class_<CfaReader, ImageReader> cfaReader(mIO, "CfaReader");
-    cfaReader.def("read16u", &CfaReader::read16u);
+    cfaReader.def("read16u", &CfaReader::read16u, py::call_guard<py::gil_scoped_release>());
 
     py::class_<MipiRaw10Reader, ImageReader> mipiRaw10Reader(mIO, "MipiRaw10Reader");
-    mipiRaw10Reader.def("read16u", &MipiRaw10Reader::read16u);
+    mipiRaw10Reader.def("read16u", &MipiRaw10Reader::read16u, py::call_guard<py::gil_scoped_release>());
 
     py::class_<MipiRaw12Reader, ImageReader> mipiRaw12Reader(mIO, "MipiRaw12Reader");
-    mipiRaw12Reader.def("read16u", &MipiRaw12Reader::read16u);
+    mipiRaw12Reader.def("read16u", &MipiRaw12Reader::read16u, py::call_guard<py::gil_scoped_release>());
 
     py::class_<DngReader, ImageReader> dngReader(mIO, "DngReader");
-    dngReader.def("read16u", &DngReader::read16u).def("readf", &DngReader::readf).def("readExif", &DngReader::readExif);
+    dngReader.def("read16u", &DngReader::read16u, py::call_guard<py::gil_scoped_release>())
+            .def("readf", &DngReader::readf, py::call_guard<py::gil_scoped_release>())
+            .def("readExif", &DngReader::readExif, py::call_guard<py::gil_scoped_release>());
 
     mIO.def("makeReader", [](const std::string &inputPath, const py::object &metadata) {
         if (!metadata.is(py::none())) {
             auto *cls = metadata.cast<ImageMetadata *>();
-            std::unique_ptr<ImageReader> imageReader = io::makeReader(inputPath, ImageReader::Options(*cls));
+            const ImageReader::Options options(*cls);
+            const py::gil_scoped_release release;
+            std::unique_ptr<ImageReader> imageReader = io::makeReader(inputPath, options);
             return imageReader;
         }
+        const py::gil_scoped_release release;
         std::unique_ptr<ImageReader> imageReader = io::makeReader(inputPath);
         return imageReader;
     });
 
+    py::class_<MemoryStream>(mIO, "MemoryStream").def(py::init<const py::buffer &>(), py::arg("data"));
+
+    mIO.def(
+            "makeReaderFromStream",
+            [](const std::string &inputPath, MemoryStream &stream, const py::object &metadata) {
+                const ImageReader::Options options = metadata.is_none()
+                                                             ? ImageReader::Options()
+                                                             : ImageReader::Options(*metadata.cast<ImageMetadata *>());
+                const py::gil_scoped_release release;
+                std::unique_ptr<ImageReader> imageReader = io::makeReader(inputPath, stream.stream(), options);
+                return imageReader;
+            },
+            py::arg("inputPath"),
+            py::arg("stream"),
+            py::arg("metadata") = py::none(),
+            py::keep_alive<0, 2>(),
+            "Make a reader on an in-memory stream, inputPath only gives the file name used to pick the reader. The "
+            "stream is kept alive by the reader.");
+
     py::class_<ImageWriter> imageWriter(mIO, "ImageWriter");
-    imageWriter.def("writeExif", &ImageWriter::writeExif);
+    imageWriter.def("writeExif", &ImageWriter::writeExif, py::call_guard<py::gil_scoped_release>());
 
     py::enum_<ImageWriter::TiffCompression>(imageWriter, "TiffCompression")
             .value("NONE", ImageWriter::TiffCompression::NONE)
@@ -103,49 +220,113 @@ void initIO(py::module &mod) {                                 // NOLINT(misc-us
             .def_readwrite("metadata", &ImageWriter::Options::metadata);
 
     py::class_<PlainWriter, ImageWriter> plainWriter(mIO, "PlainWriter");
-    plainWriter.def("write", [](PlainWriter &self, const Image8u &image) { self.write(image); })
-            .def("write", [](PlainWriter &self, const Image16u &image) { self.write(image); })
-            .def("write", [](PlainWriter &self, const Imagef &image) { self.write(image); });
+    plainWriter
+            .def("write",
+                 [](PlainWriter &self, const Image8u &image) {
+                     const py::gil_scoped_release release;
+                     self.write(image);
+                 })
+            .def("write",
+                 [](PlainWriter &self, const Image16u &image) {
+                     const py::gil_scoped_release release;
+                     self.write(image);
+                 })
+            .def("write", [](PlainWriter &self, const Imagef &image) {
+                const py::gil_scoped_release release;
+                self.write(image);
+            });
 
     py::class_<BmpWriter, ImageWriter> bmpWriter(mIO, "BmpWriter");
-    bmpWriter.def("write", [](BmpWriter &self, const Image8u &image) { self.write(image); });
+    bmpWriter.def("write", [](BmpWriter &self, const Image8u &image) {
+        const py::gil_scoped_release release;
+        self.write(image);
+    });
 
     py::class_<JpegWriter, ImageWriter> jpegWriter(mIO, "JpegWriter");
-    jpegWriter.def("write", [](JpegWriter &self, const Image8u &image) { self.write(image); })
-            .def("writeExif", &JpegWriter::writeExif);
+    jpegWriter
+            .def("write",
+                 [](JpegWriter &self, const Image8u &image) {
+                     const py::gil_scoped_release release;
+                     self.write(image);
+                 })
+            .def("writeExif", &JpegWriter::writeExif, py::call_guard<py::gil_scoped_release>());
 
     py::class_<PngWriter, ImageWriter> pngWriter(mIO, "PngWriter");
-    pngWriter.def("write", [](PngWriter &self, const Image8u &image) { self.write(image); })
-            .def("write", [](PngWriter &self, const Image16u &image) { self.write(image); });
+    pngWriter
+            .def("write",
+                 [](PngWriter &self, const Image8u &image) {
+                     const py::gil_scoped_release release;
+                     self.write(image);
+                 })
+            .def("write", [](PngWriter &self, const Image16u &image) {
+                const py::gil_scoped_release release;
+                self.write(image);
+            });
 
     py::class_<TiffWriter, ImageWriter> tiffWriter(mIO, "TiffWriter");
-    tiffWriter.def("write", [](TiffWriter &self, const Image8u &image) { self.write(image); })
-            .def("write", [](TiffWriter &self, const Image16u &image) { self.write(image); })
-            .def("write", [](TiffWriter &self, const Imagef &image) { self.write(image); })
-            .def("writeExif", &TiffWriter::writeExif);
+    tiffWriter
+            .def("write",
+                 [](TiffWriter &self, const Image8u &image) {
+                     const py::gil_scoped_release release;
+                     self.write(image);
+                 })
+            .def("write",
+                 [](TiffWriter &self, const Image16u &image) {
+                     const py::gil_scoped_release release;
+                     self.write(image);
+                 })
+            .def("write",
+                 [](TiffWriter &self, const Imagef &image) {
+                     const py::gil_scoped_release release;
+                     self.write(image);
+                 })
+            .def("writeExif", &TiffWriter::writeExif, py::call_guard<py::gil_scoped_release>());
 
     py::class_<CfaWriter, ImageWriter> cfaWriter(mIO, "CfaWriter");
-    cfaWriter.def("write", [](CfaWriter &self, const Image16u &image) { self.write(image); });
+    cfaWriter.def("write", [](CfaWriter &self, const Image16u &image) {
+        const py::gil_scoped_release release;
+        self.write(image);
+    });
 
     py::class_<MipiRaw10Writer, ImageWriter> mipiRaw10Writer(mIO, "MipiRaw10Writer");
-    mipiRaw10Writer.def("write", [](MipiRaw10Writer &self, const Image16u &image) { self.write(image); });
+    mipiRaw10Writer.def("write", [](MipiRaw10Writer &self, const Image16u &image) {
+        const py::gil_scoped_release release;
+        self.write(image);
+    });
 
     py::class_<MipiRaw12Writer, ImageWriter> mipiRaw12Writer(mIO, "MipiRaw12Writer");
-    mipiRaw12Writer.def("write", [](MipiRaw12Writer &self, const Image16u &image) { self.write(image); });
+    mipiRaw12Writer.def("write", [](MipiRaw12Writer &self, const Image16u &image) {
+        const py::gil_scoped_release release;
+        self.write(image);
+    });
 
     py::class_<DngWriter, ImageWriter> dngWriter(mIO, "DngWriter");
-    dngWriter.def("write", [](DngWriter &self, const Image16u &image) { self.write(image); })
-            .def("write", [](DngWriter &self, const Imagef &image) { self.write(image); });
+    dngWriter
+            .def("write",
+                 [](DngWriter &self, const Image16u &image) {
+                     const py::gil_scoped_release release;
+                     self.write(image);
+                 })
+            .def("write", [](DngWriter &self, const Imagef &image) {
+                const py::gil_scoped_release release;
+                self.write(image);
+            });
 
     mIO.def("makeWriter", [](const std::string &outputPath, const py::object &write_options) {
         if (!write_options.is(py::none())) {
             auto *cls = write_options.cast<ImageWriter::Options *>();
-            std::unique_ptr<ImageWriter> imageWriter = io::makeWriter(outputPath, ImageWriter::Options(*cls));
+            const ImageWriter::Options options(*cls);
+            const py::gil_scoped_release release;
+            std::unique_ptr<ImageWriter> imageWriter = io::makeWriter(outputPath, options);
             return imageWriter;
         }
+        const py::gil_scoped_release release;
         std::unique_ptr<ImageWriter> imageWriter = io::makeWriter(outputPath);
         return imageWriter;
     });
+
+    initRegionIO(mIO);
+    initMipiPacking(mIO);
 }
 
 } // namespace io
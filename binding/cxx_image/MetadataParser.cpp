@@ -15,7 +15,8 @@ namespace parser {
 void initParser(py::module &mod) {                                        // NOLINT(misc-use-internal-linkage)
     py::module_ mParser = mod.def_submodule("parser", "parse namespace"); // NOLINT(misc-const-correctness)
     mParser.def("readMetadata",
-                py::overload_cast<const std::string &, const std::optional<std::string> &>(&readMetadata));
+                py::overload_cast<const std::string &, const std::optional<std::string> &>(&readMetadata),
+                py::call_guard<py::gil_scoped_release>());
 }
 
 } // namespace parser
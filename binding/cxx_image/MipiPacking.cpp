@@ -0,0 +1,226 @@
+#include "pybind11/numpy.h"
+#include "pybind11/pybind11.h"
+#include "pybind11/pytypes.h"
+
+#include <algorithm>
+#include <cstddef>
+#include <cstdint>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <vector>
+
+namespace py = pybind11;
+
+namespace cxximg {
+
+namespace io {
+
+namespace {
+
+// Pixels are packed by groups: RAW10 stores 4 pixels in 5 bytes, RAW12 2 pixels in 3 bytes.
+struct MipiFormat {
+    int bits;
+    int groupPixels;
+    int groupBytes;
+};
+
+constexpr MipiFormat MIPI_RAW10{10, 4, 5};
+constexpr MipiFormat MIPI_RAW12{12, 2, 3};
+
+// Below this amount of packed bytes per thread, starting a thread costs more than it saves.
+constexpr size_t MIN_BYTES_PER_THREAD = size_t{1} << 20;
+
+// The inner loops work on whole groups with no dependency between them, so that compilers vectorize them.
+void unpackRaw10Row(const uint8_t *src, uint16_t *dst, int groups) {
+    for (int g = 0; g < groups; ++g) {
+        const uint8_t *in = src + 5 * g;
+        uint16_t *out = dst + 4 * g;
+        const unsigned low = in[4];
+        out[0] = static_cast<uint16_t>((in[0] << 2) | (low & 3));
+        out[1] = static_cast<uint16_t>((in[1] << 2) | ((low >> 2) & 3));
+        out[2] = static_cast<uint16_t>((in[2] << 2) | ((low >> 4) & 3));
+        out[3] = static_cast<uint16_t>((in[3] << 2) | (low >> 6));
+    }
+}
+
+void unpackRaw12Row(const uint8_t *src, uint16_t *dst, int groups) {
+    for (int g = 0; g < groups; ++g) {
+        const uint8_t *in = src + 3 * g;
+        uint16_t *out = dst + 2 * g;
+        out[0] = static_cast<uint16_t>((in[0] << 4) | (in[2] & 0xF));
+        out[1] = static_cast<uint16_t>((in[1] << 4) | (in[2] >> 4));
+    }
+}
+
+void packRaw10Row(const uint16_t *src, uint8_t *dst, int groups) {
+    for (int g = 0; g < groups; ++g) {
+        const uint16_t *in = src + 4 * g;
+        uint8_t *out = dst + 5 * g;
+        out[0] = static_cast<uint8_t>(in[0] >> 2);
+        out[1] = static_cast<uint8_t>(in[1] >> 2);
+        out[2] = static_cast<uint8_t>(in[2] >> 2);
+        out[3] = static_cast<uint8_t>(in[3] >> 2);
+        out[4] = static_cast<uint8_t>((in[0] & 3) | ((in[1] & 3) << 2) | ((in[2] & 3) << 4) | ((in[3] & 3) << 6));
+    }
+}
+
+void packRaw12Row(const uint16_t *src, uint8_t *dst, int groups) {
+    for (int g = 0; g < groups; ++g) {
+        const uint16_t *in = src + 2 * g;
+        uint8_t *out = dst + 3 * g;
+        out[0] = static_cast<uint8_t>(in[0] >> 4);
+        out[1] = static_cast<uint8_t>(in[1] >> 4);
+        out[2] = static_cast<uint8_t>((in[0] & 0xF) | ((in[1] & 0xF) << 4));
+    }
+}
+
+// Run rowFunction(row) on every row, split into contiguous bands of rows over several threads.
+template <typename RowFunction>
+void forEachRow(int height, size_t packedBytes, int threads, const RowFunction &rowFunction) {
+    if (threads <= 0) {
+        threads = static_cast<int>(std::max(1U, std::thread::hardware_concurrency()));
+        threads = static_cast<int>(std::min<size_t>(threads, std::max<size_t>(1, packedBytes / MIN_BYTES_PER_THREAD)));
+    }
+    threads = std::min(threads, std::max(height, 1));
+
+    const auto runBand = [&](int band) {
+        const int rowBegin = static_cast<int>(static_cast<int64_t>(height) * band / threads);
+        const int rowEnd = static_cast<int>(static_cast<int64_t>(height) * (band + 1) / threads);
+        for (int row = rowBegin; row < rowEnd; ++row) {
+            rowFunction(row);
+        }
+    };
+
+    std::vector<std::thread> workers;
+    workers.reserve(threads - 1);
+    for (int band = 1; band < threads; ++band) {
+        workers.emplace_back(runBand, band);
+    }
+    runBand(0);
+    for (std::thread &worker : workers) {
+        worker.join();
+    }
+}
+
+int groupsPerRow(int width, const MipiFormat &format) {
+    if (width <= 0 || width % format.groupPixels != 0) {
+        throw std::invalid_argument("MIPI RAW" + std::to_string(format.bits) +
+                                    " width must be a positive multiple of " + std::to_string(format.groupPixels) +
+                                    ", got " + std::to_string(width) + ".");
+    }
+    return width / format.groupPixels;
+}
+
+bool isContiguous(const py::buffer_info &info) {
+    py::ssize_t stride = info.itemsize;
+    for (py::ssize_t dim = info.ndim - 1; dim >= 0; --dim) {
+        if (info.shape[dim] > 1 && info.strides[dim] != stride) {
+            return false;
+        }
+        stride *= info.shape[dim];
+    }
+    return true;
+}
+
+py::array_t<uint16_t> unpackMipi(const py::buffer &data, int width, int height, int threads, const MipiFormat &format) {
+    const py::buffer_info info = data.request();
+    if (!isContiguous(info)) {
+        throw std::invalid_argument("MIPI buffer must be contiguous.");
+    }
+    const int groups = groupsPerRow(width, format);
+    const auto size = static_cast<size_t>(info.size * info.itemsize);
+    const size_t rowBytes = static_cast<size_t>(groups) * format.groupBytes;
+    // Rows may be padded to an alignment, the row stride is found from the buffer size as MipiRawReader does.
+    if (height <= 0 || size % height != 0 || size / height < rowBytes) {
+        throw std::invalid_argument("MIPI buffer of " + std::to_string(size) + " bytes does not hold " +
+                                    std::to_string(height) + " rows of " + std::to_string(rowBytes) + " bytes.");
+    }
+    const size_t stride = size / height;
+
+    py::array_t<uint16_t> image({height, width});
+    const auto *src = static_cast<const uint8_t *>(info.ptr);
+    uint16_t *dst = image.mutable_data();
+    {
+        const py::gil_scoped_release release;
+        const auto unpackRow = format.bits == 10 ? unpackRaw10Row : unpackRaw12Row;
+        forEachRow(height, size, threads, [&](int row) {
+            unpackRow(src + row * stride, dst + static_cast<size_t>(row) * width, groups);
+        });
+    }
+    return image;
+}
+
+py::array_t<uint8_t> packMipi(const py::array_t<uint16_t, py::array::c_style | py::array::forcecast> &image,
+                              int threads,
+                              const MipiFormat &format) {
+    if (image.ndim() != 2) {
+        throw std::invalid_argument("MIPI packing expects a 2D image, got " + std::to_string(image.ndim()) +
+                                    " dimensions.");
+    }
+    const auto height = static_cast<int>(image.shape(0));
+    const auto width = static_cast<int>(image.shape(1));
+    const int groups = groupsPerRow(width, format);
+    const size_t rowBytes = static_cast<size_t>(groups) * format.groupBytes;
+
+    py::array_t<uint8_t> packed({static_cast<py::ssize_t>(height), static_cast<py::ssize_t>(rowBytes)});
+    const uint16_t *src = image.data();
+    uint8_t *dst = packed.mutable_data();
+    {
+        const py::gil_scoped_release release;
+        const auto packRow = format.bits == 10 ? packRaw10Row : packRaw12Row;
+        forEachRow(height, rowBytes * height, threads, [&](int row) {
+            packRow(src + static_cast<size_t>(row) * width, dst + row * rowBytes, groups);
+        });
+    }
+    return packed;
+}
+
+} // namespace
+
+void initMipiPacking(py::module &mIO) { // NOLINT(misc-use-internal-linkage)
+    mIO.def(
+            "unpackMipiRaw10",
+            [](const py::buffer &data, int width, int height, int threads) {
+                return unpackMipi(data, width, height, threads, MIPI_RAW10);
+            },
+            py::arg("data"),
+            py::arg("width"),
+            py::arg("height"),
+            py::arg("threads") = 0,
+            "Unpack a MIPI RAW10 buffer of height rows, padded or not, to a uint16 image of height x width, "
+            "over threads threads (0 to choose from the buffer size).");
+    mIO.def(
+            "unpackMipiRaw12",
+            [](const py::buffer &data, int width, int height, int threads) {
+                return unpackMipi(data, width, height, threads, MIPI_RAW12);
+            },
+            py::arg("data"),
+            py::arg("width"),
+            py::arg("height"),
+            py::arg("threads") = 0,
+            "Unpack a MIPI RAW12 buffer of height rows, padded or not, to a uint16 image of height x width, "
+            "over threads threads (0 to choose from the buffer size).");
+    mIO.def(
+            "packMipiRaw10",
+            [](const py::array_t<uint16_t, py::array::c_style | py::array::forcecast> &image, int threads) {
+                return packMipi(image, threads, MIPI_RAW10);
+            },
+            py::arg("image"),
+            py::arg("threads") = 0,
+            "Pack a uint16 image of 10 bits values to unpadded MIPI RAW10 rows, a uint8 array of height x width * 5 / "
+            "4.");
+    mIO.def(
+            "packMipiRaw12",
+            [](const py::array_t<uint16_t, py::array::c_style | py::array::forcecast> &image, int threads) {
+                return packMipi(image, threads, MIPI_RAW12);
+            },
+            py::arg("image"),
+            py::arg("threads") = 0,
+            "Pack a uint16 image of 12 bits values to unpadded MIPI RAW12 rows, a uint8 array of height x width * 3 / "
+            "2.");
+}
+
+} // namespace io
+
+} // namespace cxximg
@@ -0,0 +1,647 @@
+#include "pybind11/numpy.h"
+#include "pybind11/pybind11.h"
+#include "pybind11/pytypes.h"
+
+#include <algorithm>
+#include <csetjmp>
+#include <cstdint>
+#include <cstdio>
+#include <cstring>
+#include <memory>
+#include <optional>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+// jpeglib.h needs the definitions of <cstdio>.
+#include "jpeglib.h"
+#include "png.h"
+#include "tiffio.h"
+
+namespace py = pybind11;
+
+namespace cxximg {
+
+namespace io {
+
+namespace {
+
+struct Region {
+    int x;
+    int y;
+    int width;
+    int height;
+};
+
+void checkRegion(const Region &roi, uint32_t width, uint32_t height) {
+    if (roi.x < 0 || roi.y < 0 || roi.width <= 0 || roi.height <= 0 ||
+        static_cast<uint32_t>(roi.x) + static_cast<uint32_t>(roi.width) > width ||
+        static_cast<uint32_t>(roi.y) + static_cast<uint32_t>(roi.height) > height) {
+        throw std::invalid_argument("Region (" + std::to_string(roi.x) + ", " + std::to_string(roi.y) + ", " +
+                                    std::to_string(roi.width) + ", " + std::to_string(roi.height) +
+                                    ") is outside of the image " + std::to_string(width) + "x" +
+                                    std::to_string(height));
+    }
+}
+
+std::vector<py::ssize_t> regionShape(const Region &roi, int channels) {
+    if (channels > 1) {
+        return {roi.height, roi.width, channels};
+    }
+    return {roi.height, roi.width};
+}
+
+// The array to decode into: the caller's one, checked against the decoded region, or a new one.
+py::array regionArray(const py::object &out, const py::dtype &dtype, const std::vector<py::ssize_t> &shape) {
+    if (out.is_none()) {
+        return py::array(dtype, shape);
+    }
+    if (!py::isinstance<py::array>(out)) {
+        throw std::invalid_argument("out must be a numpy array.");
+    }
+    auto array = py::reinterpret_borrow<py::array>(out);
+    const bool sameShape = array.ndim() == static_cast<py::ssize_t>(shape.size()) &&
+                           std::equal(shape.begin(), shape.end(), array.shape());
+    if (array.dtype().kind() != dtype.kind() || array.dtype().itemsize() != dtype.itemsize() || !sameShape) {
+        throw std::invalid_argument("out does not match the dtype or the shape of the decoded image.");
+    }
+    if (!array.writeable() || !(array.flags() & py::array::c_style)) {
+        throw std::invalid_argument("out must be a writeable C-contiguous array.");
+    }
+    return array;
+}
+
+struct TiffCloser {
+    void operator()(TIFF *tif) const { TIFFClose(tif); }
+};
+
+using TiffPtr = std::unique_ptr<TIFF, TiffCloser>;
+
+struct TiffLayout {
+    uint32_t width = 0;
+    uint32_t height = 0;
+    uint16_t samplesPerPixel = 1;
+    uint16_t bitsPerSample = 0;
+    uint16_t sampleFormat = SAMPLEFORMAT_UINT;
+};
+
+// Move to the full resolution image: IFD0, or the first SubIFD with NewSubFileType 0 (DNG with a preview in IFD0).
+bool selectMainImage(TIFF *tif) {
+    uint32_t subFileType = 0;
+    if (!TIFFGetField(tif, TIFFTAG_SUBFILETYPE, &subFileType) || subFileType == 0) {
+        return true;
+    }
+    uint16_t count = 0;
+    uint64_t *offsets = nullptr;
+    if (!TIFFGetField(tif, TIFFTAG_SUBIFD, &count, &offsets)) {
+        return false;
+    }
+    // The tag array belongs to the current directory, copy it before moving to another one.
+    const std::vector<uint64_t> subIfds(offsets, offsets + count);
+    for (const uint64_t offset : subIfds) {
+        if (TIFFSetSubDirectory(tif, offset) &&
+            (!TIFFGetField(tif, TIFFTAG_SUBFILETYPE, &subFileType) || subFileType == 0)) {
+            return true;
+        }
+    }
+    return false;
+}
+
+// Read the layout of the current directory, false when the decoded pixels would not be the stored samples
+// as they are: separate planes, packed or exotic sample sizes, color conversions, DNG linearization, or
+// compressions which are not always decodable by libtiff.
+bool readTiffLayout(TIFF *tif, TiffLayout &layout) {
+    uint16_t planarConfig = PLANARCONFIG_CONTIG;
+    uint16_t photometric = PHOTOMETRIC_MINISBLACK;
+    uint16_t compression = COMPRESSION_NONE;
+    TIFFGetField(tif, TIFFTAG_IMAGEWIDTH, &layout.width);
+    TIFFGetField(tif, TIFFTAG_IMAGELENGTH, &layout.height);
+    TIFFGetFieldDefaulted(tif, TIFFTAG_SAMPLESPERPIXEL, &layout.samplesPerPixel);
+    TIFFGetFieldDefaulted(tif, TIFFTAG_BITSPERSAMPLE, &layout.bitsPerSample);
+    TIFFGetFieldDefaulted(tif, TIFFTAG_SAMPLEFORMAT, &layout.sampleFormat);
+    TIFFGetFieldDefaulted(tif, TIFFTAG_PLANARCONFIG, &planarConfig);
+    TIFFGetField(tif, TIFFTAG_PHOTOMETRIC, &photometric);
+    TIFFGetFieldDefaulted(tif, TIFFTAG_COMPRESSION, &compression);
+
+    if (layout.samplesPerPixel > 1 && planarConfig != PLANARCONFIG_CONTIG) {
+        return false;
+    }
+    if (photometric != PHOTOMETRIC_MINISBLACK && photometric != PHOTOMETRIC_RGB && photometric != PHOTOMETRIC_CFA &&
+        photometric != PHOTOMETRIC_LINEARRAW) {
+        return false;
+    }
+    if (compression != COMPRESSION_NONE && compression != COMPRESSION_LZW && compression != COMPRESSION_DEFLATE &&
+        compression != COMPRESSION_ADOBE_DEFLATE && compression != COMPRESSION_PACKBITS) {
+        return false;
+    }
+    uint32_t *activeArea = nullptr;
+    uint16_t tableSize = 0;
+    uint16_t *linearizationTable = nullptr;
+    if (TIFFGetField(tif, TIFFTAG_ACTIVEAREA, &activeArea) ||
+        TIFFGetField(tif, TIFFTAG_LINEARIZATIONTABLE, &tableSize, &linearizationTable)) {
+        return false;
+    }
+    const bool isUint = layout.sampleFormat == SAMPLEFORMAT_UINT &&
+                        (layout.bitsPerSample == 8 || layout.bitsPerSample == 16);
+    const bool isFloat = layout.sampleFormat == SAMPLEFORMAT_IEEEFP && layout.bitsPerSample == 32;
+    return isUint || isFloat;
+}
+
+py::dtype tiffDtype(const TiffLayout &layout) {
+    if (layout.sampleFormat == SAMPLEFORMAT_IEEEFP) {
+        return py::dtype::of<float>();
+    }
+    return layout.bitsPerSample == 8 ? py::dtype::of<uint8_t>() : py::dtype::of<uint16_t>();
+}
+
+// Decode only the strips crossed by the region rows.
+void readTiffStrips(TIFF *tif, const Region &roi, size_t pixelBytes, uint8_t *out) {
+    uint32_t rowsPerStrip = 0;
+    TIFFGetFieldDefaulted(tif, TIFFTAG_ROWSPERSTRIP, &rowsPerStrip);
+    const size_t rowBytes = TIFFScanlineSize(tif);
+    const size_t outRowBytes = roi.width * pixelBytes;
+    std::vector<uint8_t> strip(TIFFStripSize(tif));
+
+    const uint32_t lastRow = roi.y + roi.height;
+    for (uint32_t stripRow = (roi.y / rowsPerStrip) * rowsPerStrip; stripRow < lastRow; stripRow += rowsPerStrip) {
+        if (TIFFReadEncodedStrip(tif, TIFFComputeStrip(tif, stripRow, 0), strip.data(), -1) < 0) {
+            throw std::runtime_error("TIFF error: cannot decode strip at row " + std::to_string(stripRow));
+        }
+        const uint32_t first = std::max<uint32_t>(stripRow, roi.y);
+        const uint32_t last = std::min<uint32_t>(stripRow + rowsPerStrip, lastRow);
+        for (uint32_t row = first; row < last; ++row) {
+            std::memcpy(out + (row - roi.y) * outRowBytes,
+                        strip.data() + (row - stripRow) * rowBytes + roi.x * pixelBytes,
+                        outRowBytes);
+        }
+    }
+}
+
+// Decode only the tiles crossed by the region.
+void readTiffTiles(TIFF *tif, const Region &roi, size_t pixelBytes, uint8_t *out) {
+    uint32_t tileWidth = 0;
+    uint32_t tileHeight = 0;
+    TIFFGetField(tif, TIFFTAG_TILEWIDTH, &tileWidth);
+    TIFFGetField(tif, TIFFTAG_TILELENGTH, &tileHeight);
+    const size_t tileRowBytes = TIFFTileRowSize(tif);
+    const size_t outRowBytes = roi.width * pixelBytes;
+    std::vector<uint8_t> tile(TIFFTileSize(tif));
+
+    const uint32_t lastRow = roi.y + roi.height;
+    const uint32_t lastColumn = roi.x + roi.width;
+    for (uint32_t tileY = (roi.y / tileHeight) * tileHeight; tileY < lastRow; tileY += tileHeight) {
+        for (uint32_t tileX = (roi.x / tileWidth) * tileWidth; tileX < lastColumn; tileX += tileWidth) {
+            if (TIFFReadEncodedTile(tif, TIFFComputeTile(tif, tileX, tileY, 0, 0), tile.data(), -1) < 0) {
+                throw std::runtime_error("TIFF error: cannot decode tile at " + std::to_string(tileX) + ", " +
+                                         std::to_string(tileY));
+            }
+            const uint32_t firstX = std::max<uint32_t>(tileX, roi.x);
+            const uint32_t lastX = std::min<uint32_t>(tileX + tileWidth, lastColumn);
+            const uint32_t firstY = std::max<uint32_t>(tileY, roi.y);
+            const uint32_t lastY = std::min<uint32_t>(tileY + tileHeight, lastRow);
+            for (uint32_t row = firstY; row < lastY; ++row) {
+                std::memcpy(out + (row - roi.y) * outRowBytes + (firstX - roi.x) * pixelBytes,
+                            tile.data() + (row - tileY) * tileRowBytes + (firstX - tileX) * pixelBytes,
+                            (lastX - firstX) * pixelBytes);
+            }
+        }
+    }
+}
+
+py::object readTiffRegion(const std::string &inputPath, int x, int y, int width, int height, const py::object &out) {
+    const Region roi{x, y, width, height};
+    TiffPtr tif;
+    TiffLayout layout;
+    bool supported = false;
+    {
+        const py::gil_scoped_release release;
+        tif.reset(TIFFOpen(inputPath.c_str(), "r"));
+        if (!tif) {
+            throw std::runtime_error("TIFF error: cannot open " + inputPath);
+        }
+        supported = selectMainImage(tif.get()) && readTiffLayout(tif.get(), layout);
+    }
+    if (!supported) {
+        return py::none();
+    }
+    checkRegion(roi, layout.width, layout.height);
+
+    py::array image = regionArray(out, tiffDtype(layout), regionShape(roi, layout.samplesPerPixel));
+    auto *pixels = static_cast<uint8_t *>(image.mutable_data());
+    const size_t pixelBytes = static_cast<size_t>(layout.samplesPerPixel) * layout.bitsPerSample / 8;
+    {
+        const py::gil_scoped_release release;
+        if (TIFFIsTiled(tif.get())) {
+            readTiffTiles(tif.get(), roi, pixelBytes, pixels);
+        } else {
+            readTiffStrips(tif.get(), roi, pixelBytes, pixels);
+        }
+    }
+    return std::move(image);
+}
+
+struct JpegErrorManager {
+    jpeg_error_mgr pub;
+    std::jmp_buf jump;
+    char message[JMSG_LENGTH_MAX];
+};
+
+void onJpegError(j_common_ptr cinfo) {
+    auto *err = reinterpret_cast<JpegErrorManager *>(cinfo->err);
+    (*cinfo->err->format_message)(cinfo, err->message);
+    std::longjmp(err->jump, 1);
+}
+
+struct JpegDecoder {
+    jpeg_decompress_struct cinfo{};
+    JpegErrorManager err{};
+    // Compressed data comes from the file when opened, from the data buffer otherwise.
+    FILE *file = nullptr;
+    std::vector<uint8_t> data;
+    // Abbreviated table stream shared by the strips of a TIFF (JPEGTables tag).
+    std::vector<uint8_t> tables;
+    // Components stored as RGB instead of YCbCr (TIFF photometric RGB).
+    bool rgb = false;
+    // DCT scaling 1 / scaleDenom, chosen from maxSize when maxSize is set.
+    int scaleDenom = 1;
+    int maxSize = 0;
+
+    JpegDecoder() = default;
+    JpegDecoder(const JpegDecoder &) = delete;
+    JpegDecoder &operator=(const JpegDecoder &) = delete;
+
+    ~JpegDecoder() {
+        jpeg_destroy_decompress(&cinfo);
+        if (file != nullptr) {
+            std::fclose(file);
+        }
+    }
+};
+
+// Smallest DCT scaling 1 / n bringing the longest side down to maxSize, 1 / 8 at most.
+int scaleDenomForSize(JDIMENSION width, JDIMENSION height, int maxSize) {
+    const JDIMENSION longest = std::max(width, height);
+    for (const int denom : {1, 2, 4, 8}) {
+        if ((longest + denom - 1) / denom <= static_cast<JDIMENSION>(maxSize)) {
+            return denom;
+        }
+    }
+    return 8;
+}
+
+// libjpeg reports its errors by longjmp to these functions, so they must not own any C++ object.
+bool startJpegDecompress(JpegDecoder &decoder) {
+    decoder.cinfo.err = jpeg_std_error(&decoder.err.pub);
+    decoder.err.pub.error_exit = onJpegError;
+    if (setjmp(decoder.err.jump)) {
+        return false;
+    }
+    jpeg_create_decompress(&decoder.cinfo);
+    if (!decoder.tables.empty()) {
+        jpeg_mem_src(&decoder.cinfo, decoder.tables.data(), static_cast<unsigned long>(decoder.tables.size()));
+        jpeg_read_header(&decoder.cinfo, FALSE);
+    }
+    if (decoder.file != nullptr) {
+        jpeg_stdio_src(&decoder.cinfo, decoder.file);
+    } else {
+        jpeg_mem_src(&decoder.cinfo, decoder.data.data(), static_cast<unsigned long>(decoder.data.size()));
+    }
+    jpeg_read_header(&decoder.cinfo, TRUE);
+    if (decoder.rgb) {
+        decoder.cinfo.jpeg_color_space = JCS_RGB;
+    }
+    decoder.cinfo.scale_num = 1;
+    decoder.cinfo.scale_denom = decoder.maxSize > 0 ? scaleDenomForSize(decoder.cinfo.image_width,
+                                                                        decoder.cinfo.image_height,
+                                                                        decoder.maxSize)
+                                                    : decoder.scaleDenom;
+    jpeg_start_decompress(&decoder.cinfo);
+    return true;
+}
+
+bool readJpegRows(JpegDecoder &decoder, const Region &roi, uint8_t *row, uint8_t *out) {
+    if (setjmp(decoder.err.jump)) {
+        return false;
+    }
+    const size_t pixelBytes = decoder.cinfo.output_components;
+    const size_t outRowBytes = roi.width * pixelBytes;
+    const auto lastRow = static_cast<JDIMENSION>(roi.y + roi.height);
+    while (decoder.cinfo.output_scanline < lastRow) {
+        const JDIMENSION index = decoder.cinfo.output_scanline;
+        JSAMPROW rowPointer = row;
+        jpeg_read_scanlines(&decoder.cinfo, &rowPointer, 1);
+        if (index >= static_cast<JDIMENSION>(roi.y)) {
+            std::memcpy(out + (index - roi.y) * outRowBytes, row + roi.x * pixelBytes, outRowBytes);
+        }
+    }
+    // The rows below the region are never decoded.
+    jpeg_abort_decompress(&decoder.cinfo);
+    return true;
+}
+
+// Decode the region of the (scaled) output of the decoder, or the whole output when there is no region.
+py::object decodeJpeg(JpegDecoder &decoder, const std::optional<Region> &region, const py::object &out) {
+    bool started = false;
+    {
+        const py::gil_scoped_release release;
+        started = startJpegDecompress(decoder);
+    }
+    if (!started) {
+        throw std::runtime_error(std::string("JPEG error: ") + decoder.err.message);
+    }
+    const Region roi = region.value_or(
+            Region{0, 0, static_cast<int>(decoder.cinfo.output_width), static_cast<int>(decoder.cinfo.output_height)});
+    checkRegion(roi, decoder.cinfo.output_width, decoder.cinfo.output_height);
+
+    const int components = decoder.cinfo.output_components;
+    py::array image = regionArray(out, py::dtype::of<uint8_t>(), regionShape(roi, components));
+    std::vector<uint8_t> row(static_cast<size_t>(decoder.cinfo.output_width) * components);
+    bool decoded = false;
+    {
+        const py::gil_scoped_release release;
+        decoded = readJpegRows(decoder, roi, row.data(), static_cast<uint8_t *>(image.mutable_data()));
+    }
+    if (!decoded) {
+        throw std::runtime_error(std::string("JPEG error: ") + decoder.err.message);
+    }
+    return std::move(image);
+}
+
+void openJpegFile(JpegDecoder &decoder, const std::string &inputPath) {
+    const py::gil_scoped_release release;
+    decoder.file = std::fopen(inputPath.c_str(), "rb");
+    if (decoder.file == nullptr) {
+        throw std::runtime_error("JPEG error: cannot open " + inputPath);
+    }
+}
+
+void checkScaleDenom(int scaleDenom) {
+    if (scaleDenom != 1 && scaleDenom != 2 && scaleDenom != 4 && scaleDenom != 8) {
+        throw std::invalid_argument("JPEG scaling must be 1 / 1, 1 / 2, 1 / 4 or 1 / 8.");
+    }
+}
+
+py::object readJpegRegion(const std::string &inputPath, int x, int y, int width, int height, const py::object &out) {
+    JpegDecoder decoder;
+    openJpegFile(decoder, inputPath);
+    return decodeJpeg(decoder, Region{x, y, width, height}, out);
+}
+
+py::object readJpegScaled(const std::string &inputPath, int scaleDenom, int maxSize, const py::object &out) {
+    checkScaleDenom(scaleDenom);
+    JpegDecoder decoder;
+    decoder.scaleDenom = scaleDenom;
+    decoder.maxSize = maxSize;
+    openJpegFile(decoder, inputPath);
+    return decodeJpeg(decoder, std::nullopt, out);
+}
+
+// Keep the current directory as preview when it is a wider single strip JPEG reduced-resolution image.
+void considerJpegPreview(TIFF *tif, uint32_t &bestWidth, JpegDecoder &decoder) {
+    uint32_t subFileType = 0;
+    uint16_t compression = COMPRESSION_NONE;
+    uint16_t photometric = PHOTOMETRIC_YCBCR;
+    uint32_t width = 0;
+    TIFFGetField(tif, TIFFTAG_SUBFILETYPE, &subFileType);
+    TIFFGetFieldDefaulted(tif, TIFFTAG_COMPRESSION, &compression);
+    TIFFGetField(tif, TIFFTAG_PHOTOMETRIC, &photometric);
+    TIFFGetField(tif, TIFFTAG_IMAGEWIDTH, &width);
+    if ((subFileType & FILETYPE_REDUCEDIMAGE) == 0 || compression != COMPRESSION_JPEG || TIFFIsTiled(tif) ||
+        TIFFNumberOfStrips(tif) != 1 || width <= bestWidth) {
+        return;
+    }
+    const tmsize_t size = TIFFRawStripSize(tif, 0);
+    if (size <= 0) {
+        return;
+    }
+    std::vector<uint8_t> data(size);
+    if (TIFFReadRawStrip(tif, 0, data.data(), size) != size) {
+        return;
+    }
+    uint32_t tablesSize = 0;
+    void *tables = nullptr;
+    if (TIFFGetField(tif, TIFFTAG_JPEGTABLES, &tablesSize, &tables) && tablesSize > 0) {
+        const auto *begin = static_cast<const uint8_t *>(tables);
+        decoder.tables.assign(begin, begin + tablesSize);
+    } else {
+        decoder.tables.clear();
+    }
+    decoder.data = std::move(data);
+    decoder.rgb = photometric == PHOTOMETRIC_RGB;
+    bestWidth = width;
+}
+
+// Look for the widest JPEG preview in the IFD chain and in the SubIFDs of IFD0.
+bool findJpegPreview(TIFF *tif, JpegDecoder &decoder) {
+    uint32_t bestWidth = 0;
+    std::vector<uint64_t> subIfds;
+    uint16_t count = 0;
+    uint64_t *offsets = nullptr;
+    if (TIFFGetField(tif, TIFFTAG_SUBIFD, &count, &offsets)) {
+        subIfds.assign(offsets, offsets + count);
+    }
+    do {
+        considerJpegPreview(tif, bestWidth, decoder);
+    } while (TIFFReadDirectory(tif));
+    for (const uint64_t offset : subIfds) {
+        if (TIFFSetSubDirectory(tif, offset)) {
+            considerJpegPreview(tif, bestWidth, decoder);
+        }
+    }
+    return bestWidth > 0;
+}
+
+py::object readDngPreview(const std::string &inputPath, int scaleDenom, int maxSize, const py::object &out) {
+    checkScaleDenom(scaleDenom);
+    JpegDecoder decoder;
+    decoder.scaleDenom = scaleDenom;
+    decoder.maxSize = maxSize;
+    bool found = false;
+    {
+        const py::gil_scoped_release release;
+        const TiffPtr tif(TIFFOpen(inputPath.c_str(), "r"));
+        if (!tif) {
+            throw std::runtime_error("TIFF error: cannot open " + inputPath);
+        }
+        found = findJpegPreview(tif.get(), decoder);
+    }
+    if (!found) {
+        return py::none();
+    }
+    return decodeJpeg(decoder, std::nullopt, out);
+}
+
+struct PngDecoder {
+    png_structp png = nullptr;
+    png_infop info = nullptr;
+    FILE *file = nullptr;
+    std::string message = "cannot create the PNG reader";
+
+    PngDecoder() = default;
+    PngDecoder(const PngDecoder &) = delete;
+    PngDecoder &operator=(const PngDecoder &) = delete;
+
+    ~PngDecoder() {
+        png_destroy_read_struct(&png, &info, nullptr);
+        if (file != nullptr) {
+            std::fclose(file);
+        }
+    }
+};
+
+void onPngError(png_structp png, png_const_charp message) {
+    static_cast<PngDecoder *>(png_get_error_ptr(png))->message = message;
+    png_longjmp(png, 1);
+}
+
+void onPngWarning(png_structp /*png*/, png_const_charp /*message*/) {
+}
+
+// libpng reports its errors by longjmp to these functions, so they must not own any C++ object. Only the
+// non-interlaced 8 and 16 bits gray, gray alpha, RGB and RGBA images are decoded row by row, as the image reader
+// stores them: supported is false for the other ones (palette, lower bit depths, transparency chunk, interlacing).
+bool startPngDecompress(PngDecoder &decoder, bool &supported) {
+    decoder.png = png_create_read_struct(PNG_LIBPNG_VER_STRING, &decoder, onPngError, onPngWarning);
+    if (decoder.png == nullptr) {
+        return false;
+    }
+    decoder.info = png_create_info_struct(decoder.png);
+    if (decoder.info == nullptr) {
+        return false;
+    }
+    if (setjmp(png_jmpbuf(decoder.png))) {
+        return false;
+    }
+    png_init_io(decoder.png, decoder.file);
+    png_read_info(decoder.png, decoder.info);
+    const int bitDepth = png_get_bit_depth(decoder.png, decoder.info);
+    const int colorType = png_get_color_type(decoder.png, decoder.info);
+    supported = (bitDepth == 8 || bitDepth == 16) && (colorType & PNG_COLOR_MASK_PALETTE) == 0 &&
+                png_get_interlace_type(decoder.png, decoder.info) == PNG_INTERLACE_NONE &&
+                png_get_valid(decoder.png, decoder.info, PNG_INFO_tRNS) == 0;
+    if (supported && bitDepth == 16) {
+        // PNG samples are big endian.
+        const uint16_t one = 1;
+        if (*reinterpret_cast<const uint8_t *>(&one) == 1) {
+            png_set_swap(decoder.png);
+        }
+    }
+    png_read_update_info(decoder.png, decoder.info);
+    return true;
+}
+
+bool readPngRows(PngDecoder &decoder, const Region &roi, size_t pixelBytes, uint8_t *row, uint8_t *out) {
+    if (setjmp(png_jmpbuf(decoder.png))) {
+        return false;
+    }
+    const size_t outRowBytes = roi.width * pixelBytes;
+    const bool wholeRows = roi.x == 0 && roi.width == static_cast<int>(png_get_image_width(decoder.png, decoder.info));
+    for (int index = 0; index < roi.y + roi.height; ++index) {
+        uint8_t *target = out + (index - roi.y) * outRowBytes;
+        if (index >= roi.y && wholeRows) {
+            // Rows as wide as the image are decoded straight into the output.
+            png_read_row(decoder.png, target, nullptr);
+            continue;
+        }
+        png_read_row(decoder.png, row, nullptr);
+        if (index >= roi.y) {
+            std::memcpy(target, row + roi.x * pixelBytes, outRowBytes);
+        }
+    }
+    // The rows below the region are never decoded.
+    return true;
+}
+
+py::object readPngRegion(const std::string &inputPath, int x, int y, int width, int height, const py::object &out) {
+    const Region roi{x, y, width, height};
+    PngDecoder decoder;
+    bool started = false;
+    bool supported = false;
+    {
+        const py::gil_scoped_release release;
+        decoder.file = std::fopen(inputPath.c_str(), "rb");
+        if (decoder.file == nullptr) {
+            throw std::runtime_error("PNG error: cannot open " + inputPath);
+        }
+        started = startPngDecompress(decoder, supported);
+    }
+    if (!started) {
+        throw std::runtime_error("PNG error: " + decoder.message);
+    }
+    if (!supported) {
+        return py::none();
+    }
+    checkRegion(roi, png_get_image_width(decoder.png, decoder.info), png_get_image_height(decoder.png, decoder.info));
+
+    const int channels = png_get_channels(decoder.png, decoder.info);
+    const bool wide = png_get_bit_depth(decoder.png, decoder.info) == 16;
+    py::array image = regionArray(
+            out, wide ? py::dtype::of<uint16_t>() : py::dtype::of<uint8_t>(), regionShape(roi, channels));
+    std::vector<uint8_t> row(png_get_rowbytes(decoder.png, decoder.info));
+    bool decoded = false;
+    {
+        const py::gil_scoped_release release;
+        decoded = readPngRows(decoder,
+                              roi,
+                              static_cast<size_t>(channels) * (wide ? 2 : 1),
+                              row.data(),
+                              static_cast<uint8_t *>(image.mutable_data()));
+    }
+    if (!decoded) {
+        throw std::runtime_error("PNG error: " + decoder.message);
+    }
+    return std::move(image);
+}
+
+} // namespace
+
+void initRegionIO(py::module &mIO) { // NOLINT(misc-use-internal-linkage)
+    mIO.def("readTiffRegion",
+            &readTiffRegion,
+            py::arg("inputPath"),
+            py::arg("x"),
+            py::arg("y"),
+            py::arg("width"),
+            py::arg("height"),
+            py::arg("out") = py::none(),
+            "Decode only the strips or tiles of a TIFF / DNG crossed by the region, into out when given, None when the "
+            "file layout is not supported (the full image must be decoded then).");
+    mIO.def("readJpegRegion",
+            &readJpegRegion,
+            py::arg("inputPath"),
+            py::arg("x"),
+            py::arg("y"),
+            py::arg("width"),
+            py::arg("height"),
+            py::arg("out") = py::none(),
+            "Decode the scanlines of a JPEG down to the last row of the region only, into out when given.");
+    mIO.def("readPngRegion",
+            &readPngRegion,
+            py::arg("inputPath"),
+            py::arg("x"),
+            py::arg("y"),
+            py::arg("width"),
+            py::arg("height"),
+            py::arg("out") = py::none(),
+            "Decode the rows of a PNG down to the last row of the region only, into out when given, None for palette, "
+            "interlaced, transparency chunk and below 8 bits images (the full image must be decoded then).");
+    mIO.def("readJpegScaled",
+            &readJpegScaled,
+            py::arg("inputPath"),
+            py::arg("scaleDenom") = 1,
+            py::arg("maxSize") = 0,
+            py::arg("out") = py::none(),
+            "Decode a JPEG with the DCT scaling 1 / scaleDenom (1, 2, 4 or 8) of libjpeg, or with the smallest one "
+            "bringing its longest side down to maxSize when maxSize is set, into out when given.");
+    mIO.def("readDngPreview",
+            &readDngPreview,
+            py::arg("inputPath"),
+            py::arg("scaleDenom") = 1,
+            py::arg("maxSize") = 0,
+            py::arg("out") = py::none(),
+            "Decode the widest JPEG compressed preview of a DNG as readJpegScaled does, None when there is none.");
+}
+
+} // namespace io
+
+} // namespace cxximg
@@ -6,12 +6,81 @@
 #include "pybind11/pybind11.h" // NOLINT
 #include "pybind11/stl.h"      // NOLINT(misc-include-cleaner)
 
+#include <algorithm>
+#include <cstddef>
 #include <cstdint>
 #include <cstring>
+#include <iterator>
+#include <stdexcept>
 #include <string>
 
 namespace py = pybind11;
 
+namespace {
+
+// LibRaw numbers the colors R = 0, G = 1, B = 2, and the green of the blue rows G2 = 3.
+struct BayerPattern {
+    const char *pixelType;
+    int colors[2][2];
+};
+
+constexpr BayerPattern BAYER_PATTERNS[] = {{"BAYER_RGGB", {{0, 1}, {3, 2}}},
+                                           {"BAYER_BGGR", {{2, 3}, {1, 0}}},
+                                           {"BAYER_GBRG", {{3, 2}, {0, 1}}},
+                                           {"BAYER_GRBG", {{1, 0}, {2, 3}}}};
+
+constexpr const char *BAYER_CDESCS[] = {"RGBG", "GRBG", "BGGR", "RGGB"};
+
+// cxx_image PixelType of the raw data with margins, decoded from the filters bitmask which gives the colors of the
+// 8x2 pixels block at the origin of the raw data (2 bits per pixel, as LibRaw::COLOR reads it): the bayer pixel type
+// of the 2x2 pattern, CUSTOM when the colors are not RGB (cdesc).
+py::object bayerPixelType(unsigned filters, const std::string &cdesc) {
+    if (filters < 1000) {
+        throw std::invalid_argument("Only 2x2 Bayer CFA is supported. libraw filters=" + std::to_string(filters));
+    }
+    int colors[4][4];
+    for (int y = 0; y < 4; ++y) {
+        for (int x = 0; x < 4; ++x) {
+            colors[y][x] = static_cast<int>(filters >> ((((y << 1) & 14) | (x & 1)) << 1) & 3);
+        }
+    }
+    for (int y = 0; y < 4; ++y) {
+        for (int x = 0; x < 4; ++x) {
+            if (colors[y][x] != colors[y % 2][x % 2]) {
+                throw std::invalid_argument("Invalid 4x4 Bayer pattern; sub-blocks are inconsistent.");
+            }
+        }
+    }
+    // cxx_libraw does not link cxx_image, its PixelType is found at runtime.
+    const py::object pixelType = py::module_::import("cxx_image").attr("PixelType");
+    if (std::find(std::begin(BAYER_CDESCS), std::end(BAYER_CDESCS), cdesc) == std::end(BAYER_CDESCS)) {
+        return pixelType.attr("CUSTOM");
+    }
+    for (const BayerPattern &pattern : BAYER_PATTERNS) {
+        if (colors[0][0] == pattern.colors[0][0] && colors[0][1] == pattern.colors[0][1] &&
+            colors[1][0] == pattern.colors[1][0] && colors[1][1] == pattern.colors[1][1]) {
+            return pixelType.attr(pattern.pixelType);
+        }
+    }
+    throw std::invalid_argument("Invalid Bayer pattern");
+}
+
+// Export of a Python buffer held for as long as LibRaw reads from it, so that the buffer can not be resized or
+// released meanwhile (a bytearray raises BufferError instead).
+class RawBuffer {
+public:
+    explicit RawBuffer(const py::buffer &data) : mInfo(data.request()) {}
+
+    [[nodiscard]] const void *data() const { return mInfo.ptr; }
+
+    [[nodiscard]] size_t size() const { return static_cast<size_t>(mInfo.size * mInfo.itemsize); }
+
+private:
+    py::buffer_info mInfo;
+};
+
+} // namespace
+
 void initTypes(py::module &mod) { // NOLINT(misc-use-internal-linkage)
 
     py::enum_<LibRaw_errors>(mod, "LibRaw_errors", "Libraw return error code")
@@ -21,7 +90,29 @@ void initTypes(py::module &mod) { // NOLINT(misc-use-internal-linkage)
                    "An unknown error has been encountered. This code should never be generated.")
             .value("LIBRAW_FILE_UNSUPPORTED",
                    LibRaw_errors::LIBRAW_FILE_UNSUPPORTED,
-                   "Unsupported file format (attempt to open a RAW file with a format unknown to the program).");
+                   "Unsupported file format (attempt to open a RAW file with a format unknown to the program).")
+            .value("LIBRAW_NO_THUMBNAIL",
+                   LibRaw_errors::LIBRAW_NO_THUMBNAIL,
+                   "Attempt to retrieve a thumbnail from a file containing no preview.")
+            .value("LIBRAW_UNSUPPORTED_THUMBNAIL",
+                   LibRaw_errors::LIBRAW_UNSUPPORTED_THUMBNAIL,
+                   "The format of the embedded thumbnail is not supported.");
+
+    py::enum_<LibRaw_thumbnail_formats>(mod, "ThumbnailFormat", "Format of the embedded thumbnail")
+            .value("LIBRAW_THUMBNAIL_UNKNOWN", LibRaw_thumbnail_formats::LIBRAW_THUMBNAIL_UNKNOWN, "Unknown format.")
+            .value("LIBRAW_THUMBNAIL_JPEG", LibRaw_thumbnail_formats::LIBRAW_THUMBNAIL_JPEG, "JPEG file content.")
+            .value("LIBRAW_THUMBNAIL_BITMAP",
+                   LibRaw_thumbnail_formats::LIBRAW_THUMBNAIL_BITMAP,
+                   "8 bits interleaved bitmap of theight x twidth x tcolors.")
+            .value("LIBRAW_THUMBNAIL_BITMAP16",
+                   LibRaw_thumbnail_formats::LIBRAW_THUMBNAIL_BITMAP16,
+                   "16 bits interleaved bitmap of theight x twidth x tcolors.")
+            .value("LIBRAW_THUMBNAIL_LAYER",
+                   LibRaw_thumbnail_formats::LIBRAW_THUMBNAIL_LAYER,
+                   "Bitmap stored as separate color layers (Foveon), not unpacked.")
+            .value("LIBRAW_THUMBNAIL_ROLLEI",
+                   LibRaw_thumbnail_formats::LIBRAW_THUMBNAIL_ROLLEI,
+                   "Rollei specific bitmap, not unpacked.");
 
     py::class_<libraw_image_sizes_t> rawImageSizes(mod, "RawImageSizes", py::is_final());
 
@@ -98,6 +189,23 @@ void initTypes(py::module &mod) { // NOLINT(misc-use-internal-linkage)
                                         sizeof(uint8_t)});
             });
 
+    py::class_<libraw_thumbnail_t> thumbnail(mod, "Thumbnail", py::is_final(), "Embedded thumbnail (preview)");
+    thumbnail.def(py::init<>())
+            .def_readwrite("tformat", &libraw_thumbnail_t::tformat, "ThumbnailFormat: format of the thumbnail data.")
+            .def_readwrite("twidth", &libraw_thumbnail_t::twidth, "ushort: thumbnail width.")
+            .def_readwrite("theight", &libraw_thumbnail_t::theight, "ushort: thumbnail height.")
+            .def_readwrite("tlength", &libraw_thumbnail_t::tlength, "unsigned: thumbnail data length in bytes.")
+            .def_readwrite("tcolors", &libraw_thumbnail_t::tcolors, "int: number of colors of a bitmap thumbnail.")
+            .def_property_readonly(
+                    "data",
+                    [](const libraw_thumbnail_t &thumb) -> py::bytes {
+                        if (thumb.thumb == nullptr) {
+                            return {};
+                        }
+                        return {thumb.thumb, thumb.tlength};
+                    },
+                    "bytes: copy of the thumbnail data unpacked by unpack_thumb, empty before.");
+
     py::class_<libraw_output_params_t> postProcessingParams(mod, "PostprocessingParams", py::is_final());
     postProcessingParams.def(py::init<>())
             .def_readwrite("bright", &libraw_output_params_t::bright, "float: Brightness (default 1.0).")
@@ -227,18 +335,54 @@ void initTypes(py::module &mod) { // NOLINT(misc-use-internal-linkage)
             .def_readwrite("color", &libraw_data_t::color, "Color Information")
             .def_readwrite("params", &libraw_data_t::params, "management of dcraw-style postprocessing")
             .def_readwrite("idata", &libraw_data_t::idata, "Main Parameters of the Image")
+            .def_readwrite("thumbnail", &libraw_data_t::thumbnail, "Embedded thumbnail, filled in by unpack_thumb")
             .def_readwrite("other", &libraw_data_t::other, "Other Parameters of the Image");
 
+    py::class_<RawBuffer>(mod,
+                          "RawBuffer",
+                          "Python buffer (bytes, bytearray, memoryview...) held exported until it is released, so that "
+                          "it can not be resized while LibRaw reads it")
+            .def(py::init<const py::buffer &>(), py::arg("data"));
+
     py::class_<LibRaw> libRaw(mod, "LibRaw", py::is_final(), "libraw processor class");
     libRaw.def(py::init<>())
             .def_readwrite("imgdata", &LibRaw::imgdata, "Main Data Structure of LibRaw")
             .def("open_file",
                  py::overload_cast<const char *>(&LibRaw::open_file),
+                 py::call_guard<py::gil_scoped_release>(),
                  "open raw image from file with filename")
+            .def(
+                    "open_buffer",
+                    [](LibRaw &self, const RawBuffer &buffer) {
+                        const py::gil_scoped_release release;
+                        return self.open_buffer(buffer.data(), buffer.size());
+                    },
+                    py::arg("buffer"),
+                    py::keep_alive<1, 2>(),
+                    "open raw image from a RawBuffer, the memory is not copied and the buffer is kept alive by the "
+                    "processor")
             .def("unpack",
                  &LibRaw::unpack,
+                 py::call_guard<py::gil_scoped_release>(),
                  "Unpacks the RAW files of the image, calculates the black level (not for all formats). The results "
                  "are placed in imgdata.image.")
+            .def("recycle",
+                 &LibRaw::recycle,
+                 "Frees the allocated data of the processor (raw data, thumbnail...), so that the memory is released "
+                 "before the processor is.")
+            .def("unpack_thumb",
+                 &LibRaw::unpack_thumb,
+                 py::call_guard<py::gil_scoped_release>(),
+                 "Unpacks the embedded thumbnail (preview) of the image, the raw data is not unpacked. The results are "
+                 "placed in imgdata.thumbnail.")
+            .def(
+                    "bayer_pattern",
+                    [](const LibRaw &self) {
+                        return bayerPixelType(self.imgdata.idata.filters, self.imgdata.idata.cdesc);
+                    },
+                    "Returns the cxx_image PixelType of the raw data with margins, decoded from imgdata.idata.filters "
+                    "for 2x2 bayer filters (filters >= 1000): a bayer pixel type, or CUSTOM when imgdata.idata.cdesc "
+                    "is not RGB. Raises ValueError for other filters, or 4x4 patterns which are not 2x2 ones.")
             .def("COLOR",
                  &LibRaw::COLOR,
                  "This call returns pixel color (color component number) in bayer pattern at row,col. The returned "
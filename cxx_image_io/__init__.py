@@ -46,17 +46,27 @@ from cxx_image import (DynamicMatrix, ExifMetadata, FileFormat, ImageLayout,
                        RgbColorSpace, SemanticLabel, UnorderdMapSemanticMasks)
 from cxx_image.io import ImageReader, ImageWriter
 # Then import cxx_libraw from .pyd file and utils interfaces.
-from cxx_libraw import LibRaw, RawData, RawImageSizes
+from cxx_libraw import LibRaw, RawBuffer, RawData, RawImageSizes
 
 from cxx_image_io.reader.base_reader import BaseImageReader
 from cxx_image_io.reader.cxx_image_reader import CxxImageReader
 from cxx_image_io.reader.cxx_libraw_reader import (LibRawImageReader,
                                                    read_image_libraw)
+from cxx_image_io.reader.factory import ImageReaderFactory
 # Exposure some class for unit tests
 from cxx_image_io.utils.io_cxx_libraw import (LibRaw_errors, LibRawParameters,
-                                              Metadata,
+                                              LibRawProcessorPool, Metadata,
                                               UnSupportedFileException)
 
 # Exposure the public APIs
-from .io import read_exif, read_image, write_exif, write_image
+from .async_io import read_image_async, read_images_async, write_image_async
+from .batch import ReadResult, read_images
+from .disk_cache import DiskImageCache
+from .frames import FrameSequence
+from .image_cache import CachedImageReader, DecodedImageCache
+from .io import (iter_rows, probe_image, read_exif, read_image,
+                 read_image_bytes, read_thumbnail, write_exif, write_image)
+from .lazy import LazyImage
+from .metadata_cache import MetadataCache
 from .utils.channels import merge_image_channels, split_image_channels
+from .utils.mipi import pack_mipi10, pack_mipi12, unpack_mipi10, unpack_mipi12
@@ -0,0 +1,129 @@
+import asyncio
+import functools
+from collections import deque
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import AsyncIterator, Iterable
+
+import numpy as np
+from cxx_image import ImageMetadata, io
+
+from .batch import ReadResult, _check_pool_size, _read_one
+from .io import read_image, write_image
+
+
+# Internal: run a blocking IO call, turning the sys.exit of the C++ helpers into an exception,
+# a SystemExit raised from an awaited future would stop the whole event loop.
+def _call_no_exit(fn, *args):
+    try:
+        return fn(*args)
+    except SystemExit as e:
+        raise RuntimeError(str(e)) from e
+
+
+async def _run_blocking(executor: Executor, limit: asyncio.Semaphore, fn, *args):
+    loop = asyncio.get_running_loop()
+    if limit is None:
+        return await loop.run_in_executor(executor, functools.partial(_call_no_exit, fn, *args))
+    # Callers wait on the event loop, not in the executor queue, so a cancelled request never reaches a worker.
+    async with limit:
+        return await loop.run_in_executor(executor, functools.partial(_call_no_exit, fn, *args))
+
+
+async def read_image_async(image_path: Path,
+                           metadata_path: Path = None,
+                           executor: Executor = None,
+                           limit: asyncio.Semaphore = None) -> (np.array, ImageMetadata):
+    """Coroutine version of read_image, the decoding runs on an executor and does not block the event loop.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    metadata_path : Path, optional
+        path to sidecar file for raw file case, by default None
+    executor : Executor, optional
+        executor running the decoding, by default the event loop default executor
+    limit : asyncio.Semaphore, optional
+        semaphore shared by the callers to bound the number of decodings in flight, by default None (unbounded)
+
+    Returns
+    -------
+    np.array
+        returned image in numpy array format
+        metadata
+
+    Raises
+    ------
+    RuntimeError
+        when the C++ reader fails, instead of the sys.exit of read_image
+    """
+    return await _run_blocking(executor, limit, read_image, image_path, metadata_path)
+
+
+async def write_image_async(output_path: Path,
+                            image_array: np.array,
+                            write_options: io.ImageWriter.Options,
+                            executor: Executor = None,
+                            limit: asyncio.Semaphore = None):
+    """Coroutine version of write_image, the encoding runs on an executor and does not block the event loop.
+
+    Parameters
+    ----------
+    output_path : Path
+        path to image file
+    image_array : np.array
+        numpy array image to write, it must not be modified until the coroutine returns
+    write_options : io.ImageWriter.Options
+        write options, see write_image
+    executor : Executor, optional
+        executor running the encoding, by default the event loop default executor
+    limit : asyncio.Semaphore, optional
+        semaphore shared by the callers to bound the number of encodings in flight, by default None (unbounded)
+
+    Raises
+    ------
+    RuntimeError
+        when the C++ writer fails, instead of the sys.exit of write_image
+    """
+    await _run_blocking(executor, limit, write_image, output_path, image_array, write_options)
+
+
+async def read_images_async(image_paths: Iterable[Path],
+                            metadata_paths: dict = None,
+                            executor: Executor = None,
+                            max_in_flight: int = None) -> AsyncIterator[ReadResult]:
+    """Async version of read_images: decode many files on an executor and yield the results in input order.
+
+    Parameters
+    ----------
+    image_paths : Iterable[Path]
+        paths to image files, consumed lazily so it can be a generator
+    metadata_paths : dict, optional
+        mapping from image path to its sidecar file, by default None
+    executor : Executor, optional
+        executor running the decoding, by default the event loop default executor
+    max_in_flight : int, optional
+        maximum number of files submitted but not yet yielded, by default twice the number of CPUs
+
+    Yields
+    ------
+    ReadResult
+        one result per input path, in input order, failures are reported in ReadResult.error
+    """
+    _, max_in_flight = _check_pool_size(None, max_in_flight)
+    loop = asyncio.get_running_loop()
+    metadata_paths = {Path(k): Path(v) for k, v in (metadata_paths or {}).items()}
+    pending = deque()
+    try:
+        for image_path in image_paths:
+            image_path = Path(image_path)
+            if len(pending) >= max_in_flight:
+                yield await pending.popleft()
+            pending.append(loop.run_in_executor(executor, _read_one, image_path, metadata_paths.get(image_path)))
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # The consumer may stop early, do not decode files nobody will look at.
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,173 @@
+import os
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from .reader.factory import ImageReaderFactory
+
+# Windows frees a shared memory block as soon as its last handle is closed, so process workers keep the
+# blocks they created open until the parent has attached them, see _init_shared_worker.
+_KEEP_WORKER_SEGMENTS = os.name == 'nt'
+_worker_segments = None
+
+
+class ReadResult:
+    """Outcome of decoding one file of a batch read.
+
+    A successful result unpacks like the return value of read_image prefixed by the path:
+    ``path, image, metadata = result``. When decoding failed, image and metadata are None
+    and the raised exception is kept in ``error``.
+    """
+    def __init__(self, path: Path, image=None, metadata=None, error: BaseException = None):
+        self.path = path
+        self.image = image
+        self.metadata = metadata
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __iter__(self):
+        return iter((self.path, self.image, self.metadata))
+
+    def __repr__(self):
+        if self.ok:
+            return 'ReadResult(path={0}, shape={1})'.format(self.path, getattr(self.image, 'shape', None))
+        return 'ReadResult(path={0}, error={1!r})'.format(self.path, self.error)
+
+
+# Internal worker: decode one file, never let an exception escape to the pool.
+def _read_one(image_path, metadata_path):
+    try:
+        reader = ImageReaderFactory.get_reader(image_path)
+        image, metadata = reader.read(image_path, metadata_path)
+        return ReadResult(image_path, image, metadata)
+    except (Exception, SystemExit) as e:
+        # read_image_cxx reports its failures with sys.exit, keep them per file as well.
+        return ReadResult(image_path, error=e)
+
+
+def _init_shared_worker(max_in_flight):
+    global _worker_segments
+    # A parent never holds more than max_in_flight results not yet attached, so a worker can safely
+    # close a block once it has created max_in_flight newer ones.
+    _worker_segments = deque(maxlen=max_in_flight)
+
+
+# Internal process worker: decode one file into a new shared memory block, return only its name,
+# the array layout and the serialized metadata, so the pixels are never pickled.
+def _read_one_shared(image_path, metadata_path):
+    result = _read_one(image_path, metadata_path)
+    if not result.ok:
+        return image_path, None, None, None, None, result.error
+    image = np.ascontiguousarray(result.image)
+    block = shared_memory.SharedMemory(create=True, size=max(image.nbytes, 1))
+    np.ndarray(image.shape, dtype=image.dtype, buffer=block.buf)[...] = image
+    payload = result.metadata.serialize() if result.metadata is not None else None
+    if _KEEP_WORKER_SEGMENTS and _worker_segments is not None:
+        _worker_segments.append(block)
+    else:
+        block.close()
+    return image_path, block.name, image.shape, image.dtype.str, payload, None
+
+
+# Internal parent side: map the block of a worker result and wrap a numpy array on it.
+def _attach_shared(shared_result):
+    image_path, name, shape, dtype, payload, error = shared_result
+    if error is not None:
+        return ReadResult(image_path, error=error)
+    block = shared_memory.SharedMemory(name=name)
+    # The name can be removed right away, the block is freed once unmapped. numpy only keeps a reference to the
+    # mapping, and the views on the array keep the array alive, so the block is closed when the array goes away.
+    block.unlink()
+    image = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    weakref.finalize(image, block.close)
+    return ReadResult(image_path, image, payload)
+
+
+# Internal parent side: free the block of a result nobody will consume.
+def _discard_shared(shared_result):
+    if shared_result[1] is not None:
+        block = shared_memory.SharedMemory(name=shared_result[1])
+        block.close()
+        block.unlink()
+
+
+def _check_pool_size(workers, max_in_flight):
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    assert workers > 0, "workers must be a positive int."
+    assert max_in_flight > 0, "max_in_flight must be a positive int."
+    return workers, max_in_flight
+
+
+def _ordered_results(executor, fn, image_paths, metadata_paths, max_in_flight, discard=None):
+    # Submit ahead while keeping at most max_in_flight decoded images alive, and yield in input order.
+    metadata_paths = {Path(k): Path(v) for k, v in (metadata_paths or {}).items()}
+    pending = deque()
+    try:
+        for image_path in image_paths:
+            image_path = Path(image_path)
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+            pending.append(executor.submit(fn, image_path, metadata_paths.get(image_path)))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # The consumer may stop early, do not decode files nobody will look at.
+        for future in pending:
+            if not future.cancel() and discard is not None:
+                future.add_done_callback(lambda f: discard(f.result()))
+
+
+def read_images(image_paths: Iterable[Path],
+                metadata_paths: dict = None,
+                workers: int = None,
+                max_in_flight: int = None,
+                mode: str = 'thread') -> Iterator[ReadResult]:
+    """Read many image files on a worker pool and stream the results in input order.
+
+    Parameters
+    ----------
+    image_paths : Iterable[Path]
+        paths to image files, consumed lazily so it can be a generator
+    metadata_paths : dict, optional
+        mapping from image path to its sidecar file, for files whose sidecar is not next to them, by default None
+    workers : int, optional
+        number of decoding threads, by default the number of CPUs
+    max_in_flight : int, optional
+        maximum number of files submitted but not yet yielded, bounds the memory of decoded images,
+        by default twice the number of workers
+    mode : str, optional
+        'thread' decodes on a thread pool, 'process' decodes on a process pool for the decoders which cannot run
+        without the GIL, by default 'thread'.
+        In 'process' mode the workers decode into shared memory blocks: ReadResult.image is a numpy array mapped
+        on the block without copy, and ReadResult.metadata is the serialized metadata dict.
+
+    Yields
+    ------
+    ReadResult
+        one result per input path, in input order, failures are reported in ReadResult.error
+    """
+    assert mode in ('thread', 'process'), "mode must be 'thread' or 'process'."
+    workers, max_in_flight = _check_pool_size(workers, max_in_flight)
+    if mode == 'thread':
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from _ordered_results(executor, _read_one, image_paths, metadata_paths, max_in_flight)
+        return
+
+    # Start the resource tracker before the workers so they share it with the parent: the blocks they create are
+    # then forgotten when the parent unlinks them, and still cleaned up at exit if a worker dies before.
+    if os.name != 'nt':
+        resource_tracker.ensure_running()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_shared_worker,
+                             initargs=(max_in_flight, )) as executor:
+        for shared_result in _ordered_results(executor, _read_one_shared, image_paths, metadata_paths, max_in_flight,
+                                              _discard_shared):
+            yield _attach_shared(shared_result)
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .metadata_cache import _is_cacheable, _metadata_from_dict
+
+
+# Internal function to write a file under a temporary name and rename it, so that readers never see it partially.
+def _write_atomic(path, write):
+    temporary_path = path.with_name('{0}.{1}.{2}.tmp'.format(path.name, os.getpid(), threading.get_ident()))
+    try:
+        with open(temporary_path, 'wb') as f:
+            write(f)
+        os.replace(temporary_path, path)
+    finally:
+        if temporary_path.exists():
+            temporary_path.unlink()
+
+
+class DiskImageCache:
+    """On-disk cache of decoded images, in a directory of .npy files with their serialized metadata.
+
+    Reading an image again with the same options loads its pixels with numpy as a read-only memmap, instead of
+    decoding the file: a camera RAW or DNG file is decoded once, and the next epochs of a training only read the .npy
+    file. An image is decoded again when its file or its sidecar changes (modification time or size). The least
+    recently used images are removed when the .npy files exceed ``max_bytes``. ``hits``, ``misses`` and ``evictions``
+    count the lookups and the images removed since the cache was opened.
+
+    The directory can be shared by threads and processes, the files are written under a temporary name and renamed,
+    and an entry is named after the stamp of its file, so a lookup never mixes the files of two decodes.
+    Images whose metadata has vignetting, color shading, face detection or semantic masks are not cached.
+    """
+    def __init__(self, directory: Path, max_bytes: int):
+        assert max_bytes > 0, "max_bytes must be positive."
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.nbytes = sum(path.stat().st_size for path in self.directory.glob('*.npy'))
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of the lookups which found their image, 0 before the first lookup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    # Internal function to get the name prefix of the entries of a key, whatever their stamp.
+    @staticmethod
+    def _key_name(key):
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    # Internal function to get the .npy and .json paths of a key and a stamp. An entry is never rewritten with
+    # another stamp, so a reader can not see the .json of a stamp next to the .npy of another one.
+    def _paths(self, key, stamp):
+        name = '{0}-{1}'.format(self._key_name(key), hashlib.sha1(repr(tuple(stamp)).encode()).hexdigest()[:16])
+        return self.directory / (name + '.npy'), self.directory / (name + '.json')
+
+    def get(self, key, stamp):
+        """Get the (image, metadata) cached for key, None when it is not cached or was cached for another stamp."""
+        image_path, metadata_path = self._paths(key, stamp)
+        try:
+            # The .json is published after the .npy, its presence tells that the entry is complete.
+            payload = json.loads(metadata_path.read_text())
+            image = np.load(image_path, mmap_mode='r')
+            # Mark the entry as recently used.
+            os.utime(image_path)
+        except (OSError, ValueError):
+            # Not cached, cached for another stamp, or removed by another process.
+            image = None
+        with self._lock:
+            if image is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return image, _metadata_from_dict(payload['metadata'])
+
+    def put(self, key, stamp, image: np.ndarray, metadata):
+        """Store a decoded image and its metadata, and remove the least recently used ones beyond max_bytes.
+
+        Returns
+        -------
+        np.ndarray
+            the image, read-only as the cached images, or unchanged when it is not cached
+        """
+        serialized = metadata.serialize()
+        if image.dtype.hasobject or image.nbytes > self.max_bytes or not _is_cacheable(serialized):
+            return image
+        image.setflags(write=False)
+        image_path, metadata_path = self._paths(key, stamp)
+        # The entries of the previous stamps of the file, and the one rewritten, leave the budget.
+        removed = sum(
+            self._remove(path, path.with_suffix('.json'))
+            for path in self.directory.glob(self._key_name(key) + '-*.npy'))
+        _write_atomic(image_path, lambda f: np.save(f, image, allow_pickle=False))
+        _write_atomic(metadata_path, lambda f: f.write(json.dumps({'metadata': serialized}).encode()))
+        with self._lock:
+            self.nbytes += image_path.stat().st_size - removed
+            if self.nbytes > self.max_bytes:
+                self._evict()
+        return image
+
+    # Internal function to remove an entry, and return the size of its .npy file.
+    @staticmethod
+    def _remove(image_path, metadata_path):
+        size = 0
+        try:
+            size = image_path.stat().st_size
+            image_path.unlink()
+        except OSError:
+            pass
+        try:
+            metadata_path.unlink()
+        except OSError:
+            pass
+        return size
+
+    # Internal function to remove the least recently used entries until the directory fits in max_bytes.
+    def _evict(self):
+        entries = []
+        for image_path in self.directory.glob('*.npy'):
+            try:
+                stat = image_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, image_path))
+        # Other processes may have added or removed entries.
+        self.nbytes = sum(size for _, size, _ in entries)
+        for _, _, image_path in sorted(entries):
+            if self.nbytes <= self.max_bytes:
+                break
+            self.nbytes -= self._remove(image_path, image_path.with_suffix('.json'))
+            self.evictions += 1
+
+    def __len__(self):
+        return len(list(self.directory.glob('*.npy')))
+
+    def clear(self):
+        """Remove all the cached images, and reset the counters."""
+        with self._lock:
+            for image_path in self.directory.glob('*.npy'):
+                self._remove(image_path, image_path.with_suffix('.json'))
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def __repr__(self):
+        return 'DiskImageCache(directory={0}, nbytes={1}, max_bytes={2}, hit_rate={3:.2f})'.format(
+            self.directory, self.nbytes, self.max_bytes, self.hit_rate)
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import numpy as np
+
+from .utils.io_cxx_image import map_frames_cxx
+
+
+class FrameSequence:
+    """Random access to the frames of a capture dump made of concatenated plain raw frames (yuv, nv12, plain16...).
+
+    The layout of one frame comes from the sidecar fileInfo, as for read_image. The file is mapped, so that
+    ``frames[i]`` only reads the pages of frame i. A frame has the shape of the image returned by read_image,
+    and a slice of frames an extra leading dimension. Frames are read-only views of the file.
+    """
+    def __init__(self, image_path: Path, metadata_path: Path = None):
+        self._frames, self.metadata = map_frames_cxx(image_path, metadata_path)
+        self.image_path = image_path
+        assert self._frames is not None, \
+            "Frame sequences are only supported for plain raw files with a planar or interleaved layout."
+
+    @property
+    def frame_shape(self) -> tuple:
+        return self._frames.shape[1:]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._frames.dtype
+
+    def __len__(self):
+        return self._frames.shape[0]
+
+    def __getitem__(self, index) -> np.ndarray:
+        return self._frames[index]
+
+    def __iter__(self):
+        return iter(self._frames)
+
+    def __repr__(self):
+        return 'FrameSequence(path={0}, frames={1}, frame_shape={2})'.format(self.image_path, len(self),
+                                                                             self.frame_shape)
@@ -0,0 +1,172 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .metadata_cache import _is_cacheable, _metadata_from_dict
+from .reader.base_reader import BaseImageReader
+
+
+# Internal function to get the number of bytes kept alive by an image, those of the array it is a view of if any.
+def _footprint(image):
+    base = image
+    while isinstance(base.base, np.ndarray):
+        base = base.base
+    return max(base.nbytes, image.nbytes)
+
+
+class DecodedImageCache:
+    """In-memory LRU cache of decoded images, bounded by the size in bytes of their pixels.
+
+    The images are returned read-only, the same array being given to every caller: copy it before modifying it.
+    A view of a larger array, as a visible crop, is stored as a compact copy so that the full decode is released.
+    The metadata is stored serialized, each caller gets its own copy. An image is decoded again when its file or its
+    sidecar changes (modification time or size). ``hits``, ``misses`` and ``evictions`` count the lookups and the
+    images dropped to stay within ``max_bytes`` since the cache was created.
+    Images whose metadata has vignetting, color shading, face detection or semantic masks are not cached.
+    """
+    def __init__(self, max_bytes: int):
+        assert max_bytes > 0, "max_bytes must be positive."
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of the lookups which found their image, 0 before the first lookup."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key, stamp):
+        """Get the (image, metadata) cached for key, None when it is not cached or was cached for another stamp."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != stamp:
+                # The file changed since it was decoded.
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            image, payload = entry[1], entry[2]
+        return image, _metadata_from_dict(payload)
+
+    def put(self, key, stamp, image: np.ndarray, metadata):
+        """Cache a decoded image, made read-only, and evict the least recently used ones beyond max_bytes.
+
+        Returns
+        -------
+        np.ndarray
+            the cached image, read-only, or the image unchanged when it is not cached
+        """
+        serialized = metadata.serialize()
+        if image.nbytes > self.max_bytes or not _is_cacheable(serialized):
+            return image
+        if _footprint(image) > image.nbytes:
+            image = image.copy()
+        image.setflags(write=False)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (stamp, image, serialized)
+            self.nbytes += image.nbytes
+            while self.nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return image
+
+    def _remove(self, key):
+        _, image, _ = self._entries.pop(key)
+        self.nbytes -= image.nbytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Drop all the cached images, and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def __repr__(self):
+        return 'DecodedImageCache(images={0}, nbytes={1}, max_bytes={2}, hit_rate={3:.2f})'.format(
+            len(self), self.nbytes, self.max_bytes, self.hit_rate)
+
+
+# Internal function to get the (mtime_ns, size) of the sidecar of an image file, empty when it has none.
+def _sidecar_stamp(image_path, metadata_path):
+    sidecar = metadata_path if metadata_path is not None else image_path.with_suffix('.json')
+    try:
+        stat = sidecar.stat()
+    except OSError:
+        return ()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class CachedImageReader(BaseImageReader):
+    """Reader decoding images with another reader, and keeping them in a DecodedImageCache or a DiskImageCache.
+
+    Reads into out or with mmap are not cached: out belongs to the caller, and a mapped file is not decoded.
+    The other methods are delegated to the wrapped reader.
+    """
+    def __init__(self, reader: BaseImageReader, cache):
+        self.reader = reader
+        self.cache = cache
+
+    def can_read(self, image_path: Path) -> bool:
+        return self.reader.can_read(image_path)
+
+    def read(self, image_path: Path, metadata_path: Path = None, **options):
+        """
+        Return the cached image when its file and its sidecar did not change, otherwise read it with the wrapped reader
+        and cache it.
+
+        Parameters
+        ----------
+        image_path : Path
+            path to image file
+        metadata_path : Path, optional
+            path to sidecar file, by default None
+        **options
+            read options set by read_image (roi, scale, crop...), forwarded to the wrapped reader
+
+        Returns
+        -------
+        (np.ndarray, metadata)
+            image, read-only when it is cached, and its metadata
+        """
+        if options.get('mmap') or options.get('out') is not None:
+            return self.reader.read(image_path, metadata_path, **options)
+        try:
+            stat = image_path.stat()
+        except OSError:
+            # Let the reader report the missing file.
+            return self.reader.read(image_path, metadata_path, **options)
+        key = (str(image_path.resolve()), metadata_path, tuple(sorted(options.items())))
+        # The sidecar describes raw buffers, a change of it changes the decoded image as well.
+        stamp = (stat.st_mtime_ns, stat.st_size) + _sidecar_stamp(image_path, metadata_path)
+        cached = self.cache.get(key, stamp)
+        if cached is not None:
+            return cached
+        image, metadata = self.reader.read(image_path, metadata_path, **options)
+        return self.cache.put(key, stamp, image, metadata), metadata
+
+    def probe(self, image_path: Path, metadata_path: Path = None):
+        return self.reader.probe(image_path, metadata_path)
+
+    def read_bytes(self, data, file_name: Path, metadata=None):
+        return self.reader.read_bytes(data, file_name, metadata)
+
+    def read_exif(self, image_path: Path):
+        return self.reader.read_exif(image_path)
+
+    def iter_rows(self, image_path: Path, metadata_path: Path = None, rows_per_chunk: int = 256):
+        return self.reader.iter_rows(image_path, metadata_path, rows_per_chunk)
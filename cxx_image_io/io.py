@@ -4,9 +4,15 @@ from pathlib import Path
 
 import numpy as np
 from cxx_image import (ExifMetadata, ImageDouble, ImageFloat, ImageInt,
-                       ImageMetadata, ImageUint8, ImageUint16, io, parser)
+                       ImageMetadata, ImageUint8, ImageUint16, io)
 
+from .disk_cache import DiskImageCache
+from .image_cache import CachedImageReader, DecodedImageCache
+from .lazy import LazyImage
+from .metadata_cache import MetadataCache
 from .reader.factory import ImageReaderFactory
+from .reader.signature import CXX_FORMATS, TIFF, sniff_image_bytes
+from .utils.region import fill_binned_file_info, fill_region_file_info
 
 # Internal Mapping from numpy dtypes to corresponding C++ Image<T> classes
 _numpy_array_image_convert_vector = {
@@ -18,7 +24,20 @@ _numpy_array_image_convert_vector = {
 }
 
 
-def read_image(image_path: Path, metadata_path: Path = None) -> (np.array, ImageMetadata):
+def read_image(image_path: Path,
+               metadata_path: Path = None,
+               mmap: bool = False,
+               roi: tuple = None,
+               out: np.ndarray = None,
+               scale: float = None,
+               max_size: int = None,
+               lazy: bool = False,
+               crop: str = None,
+               compact: bool = False,
+               binning: int = None,
+               metadata_cache: MetadataCache = None,
+               image_cache: DecodedImageCache = None,
+               disk_cache: DiskImageCache = None) -> (np.array, ImageMetadata):
     """Generic API to read different types of image files and return a numpy array,
 
     Parameters
@@ -27,6 +46,146 @@ def read_image(image_path: Path, metadata_path: Path = None) -> (np.array, Image
         path to image file
     metadata_path : Path, optional
         path to sidecar file for raw file case, the API will find automatically .json next to raw file, by default None,
+    mmap : bool, optional
+        return a read-only numpy.memmap backed by the file for uncompressed raw files described by a sidecar
+        (plain, yuv, nv12) and CFA files, the pages are only read when accessed. Other files are read as usual,
+        by default False
+    roi : tuple, optional
+        region of interest (x, y, w, h) in pixels, only this region is decoded when the format allows it
+        (TIFF / DNG strips and tiles, JPEG and 8 / 16 bits non-interlaced PNG rows, plain, CFA and MIPI raw rows),
+        otherwise the image is decoded and cropped, by default None
+    out : np.ndarray, optional
+        preallocated writeable C-contiguous array to decode the image into, it must have the shape and the dtype
+        given by probe_image (or the roi shape), so that reading many same-sized images reuses the same memory.
+        The returned array is out, by default None. Only TIFF / DNG with samples stored as decoded, JPEG,
+        8 / 16 bits non-interlaced PNG without palette, plain, CFA and MIPI raw files are decoded straight into it:
+        BMP, YUV 420, NV12 and the other PNG and TIFF files are decoded into a new image then copied into out
+    scale : float, optional
+        JPEG and DNG only, downscale factor 1, 1/2, 1/4 or 1/8 applied by libjpeg in the DCT domain while decoding,
+        several times faster than a full decode for thumbnails and previews. A DNG gives its embedded JPEG preview,
+        by default None
+    max_size : int, optional
+        JPEG and DNG only, pick the smallest of these downscales whose longest side fits in max_size pixels
+        (1/8 at most), by default None
+    lazy : bool, optional
+        only read the file header and return a LazyImage instead of the numpy array, the pixels are decoded
+        with the other options on first access to LazyImage.pixels or numpy conversion. Can not be used with scale
+        or max_size. The metadata is the one of the header until then, it is updated in place on decoding (camera
+        RAW files get their calibration data), by default False
+    crop : str, optional
+        camera RAW files only, 'visible' to return a view of the visible area of the raw data, without the margins
+        given by metadata.libRawParameters, the roi is then relative to the visible area, by default None
+    compact : bool, optional
+        camera RAW files only, copy the visible area and free the raw data with margins, by default False
+    binning : int, optional
+        camera RAW files only, average binning x binning pixels of each CFA channel (after roi), which returns the
+        (4, h, w) planes of the channels in the order of the bayer pattern of metadata.fileInfo.pixelType, with
+        binning ** 2 times fewer pixels in total, for previews and exposure statistics. The raw data is unpacked as a
+        whole then binned with NumPy, see read_image_libraw, by default None
+    metadata_cache : MetadataCache, optional
+        cache of the file metadata: with lazy, the header is only read when the file is not cached or changed.
+        Otherwise the metadata of the whole image is stored apart from the probed one, see MetadataCache.get_metadata,
+        by default None
+    image_cache : DecodedImageCache, optional
+        in-memory cache of the decoded images: an image read again with the same options is returned from the cache
+        until its file changes, as a read-only array. Not used with mmap or out, by default None
+    disk_cache : DiskImageCache, optional
+        on-disk cache of the decoded images: an image read again with the same options is loaded from a .npy file
+        as a read-only memmap until its file changes, instead of being decoded. Checked after image_cache when both
+        are set, not used with mmap or out, by default None
+
+    Returns
+    -------
+    np.array
+        returned image in numpy array format, a LazyImage when lazy is set
+        metadata, with fileInfo width, height and bayer pixelType of the region when roi is set
+    """
+    reader = ImageReaderFactory.get_reader(image_path)
+    if disk_cache is not None:
+        reader = CachedImageReader(reader, disk_cache)
+    if image_cache is not None:
+        reader = CachedImageReader(reader, image_cache)
+    # Only forward the options which are set, so readers without them keep working.
+    options = {'mmap': True} if mmap else {}
+    if roi is not None:
+        options['roi'] = tuple(roi)
+    if out is not None:
+        options['out'] = out
+    if scale is not None:
+        options['scale'] = scale
+    if max_size is not None:
+        options['max_size'] = max_size
+    if crop is not None:
+        options['crop'] = crop
+    if compact:
+        options['compact'] = True
+    if binning is not None:
+        options['binning'] = binning
+    if lazy:
+        # The size of a downscaled image is only known once decoded.
+        assert scale is None and max_size is None, "lazy can not be used with scale or max_size."
+        metadata = _probe_cached(reader, image_path, metadata_path, metadata_cache)
+        if crop is not None or compact:
+            # The readers of the other files reject crop and compact on decoding, which is too late for the metadata.
+            assert hasattr(metadata, 'libRawParameters'), "crop and compact are only supported for camera RAW files."
+            # The visible area of camera RAW files, as read_image_libraw returns it.
+            params = metadata.libRawParameters
+            fill_region_file_info(
+                metadata.fileInfo,
+                (params.leftMargin, params.topMargin, params.rawWidthVisible, params.rawHeightVisible))
+        if roi is not None:
+            fill_region_file_info(metadata.fileInfo, roi)
+        if binning is not None:
+            fill_binned_file_info(metadata.fileInfo, binning)
+        return LazyImage(reader, image_path, metadata_path, metadata, options), metadata
+    image, metadata = reader.read(image_path, metadata_path, **options)
+    if metadata_cache is not None and not options.keys() - {'mmap', 'out'}:
+        # The other options change the metadata of the returned image.
+        metadata_cache.put_metadata(image_path, metadata, metadata_path, decoded=True)
+    return image, metadata
+
+
+# Internal function to probe a file, or get its metadata from the cache when it did not change.
+def _probe_cached(reader, image_path, metadata_path, metadata_cache):
+    if metadata_cache is None:
+        return reader.probe(image_path, metadata_path)
+    metadata = metadata_cache.get_metadata(image_path, metadata_path)
+    if metadata is None:
+        metadata = reader.probe(image_path, metadata_path)
+        metadata_cache.put_metadata(image_path, metadata, metadata_path)
+    return metadata
+
+
+# Internal Mapping from the format recognized in the content to the extension selecting the C++ reader.
+_format_extensions = {'jpeg': '.jpg', 'png': '.png', 'bmp': '.bmp', 'dng': '.dng', TIFF: '.tif'}
+
+
+# Internal function to make the file name of an image held in memory, its extension selects the reader.
+def _memory_file_name(format_hint, image_format):
+    if image_format in CXX_FORMATS:
+        # The C++ readers of these formats are picked by extension, a hint naming another format would fail.
+        return Path('memory' + _format_extensions[image_format])
+    if format_hint:
+        suffix = Path(format_hint).suffix or '.' + format_hint.lstrip('.')
+    else:
+        suffix = _format_extensions.get(image_format, '')
+    return Path('memory' + suffix)
+
+
+def read_image_bytes(data, format_hint: str = None, metadata=None) -> (np.array, ImageMetadata):
+    """Generic API to read an image file held in memory (e.g. downloaded from an object store), without writing it
+       to disk. The bytes are given to the C++ readers through a memory stream, or to LibRaw open_buffer.
+
+    Parameters
+    ----------
+    data : bytes-like or file-like object
+        content of the image file: bytes, bytearray, memoryview, contiguous numpy array,
+        or an object with a read() method returning it
+    format_hint : str, optional
+        file extension or file name, like 'nef', '.RAWMIPI12' or 'image.nv12', used when the content has no
+        signature (raw buffers, some camera RAW formats), by default None
+    metadata : ImageMetadata or Path, optional
+        image metadata, or path to a sidecar file, describing raw buffers (plain, MIPI, yuv, nv12), by default None
 
     Returns
     -------
@@ -34,17 +193,92 @@ def read_image(image_path: Path, metadata_path: Path = None) -> (np.array, Image
         returned image in numpy array format
         metadata
     """
+    if hasattr(data, 'read'):
+        data = data.read()
+    assert memoryview(data).contiguous, "data must be a contiguous bytes-like object."
+    image_format = sniff_image_bytes(data)
+    file_name = _memory_file_name(format_hint, image_format)
+    reader = ImageReaderFactory.get_bytes_reader(image_format, file_name, metadata is not None)
+    return reader.read_bytes(data, file_name, metadata)
+
+
+def iter_rows(image_path: Path, metadata_path: Path = None, rows_per_chunk: int = 256):
+    """Generic API to read an image file by successive horizontal bands, to stream statistics or transcoding over
+       images too large to be held in memory. TIFF / DNG strips and tiles, plain and MIPI raw rows are read band
+       by band, so that the peak memory is bounded by the band size. The other files are decoded as a whole.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    metadata_path : Path, optional
+        path to sidecar file for raw file case, the API will find automatically .json next to raw file, by default None,
+    rows_per_chunk : int, optional
+        number of rows of each band, the last one may be shorter, by default 256
+
+    Returns
+    -------
+    Iterator[np.array]
+        bands of the image in numpy array format, of shape (rows, width) or (rows, width, channels)
+    """
+    reader = ImageReaderFactory.get_reader(image_path)
+    return reader.iter_rows(image_path, metadata_path, rows_per_chunk)
+
+
+def probe_image(image_path: Path, metadata_path: Path = None, metadata_cache: MetadataCache = None) -> ImageMetadata:
+    """Generic API to read the image information of different types of image files without decoding the pixels.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    metadata_path : Path, optional
+        path to sidecar file for raw file case, the API will find automatically .json next to raw file, by default None,
+    metadata_cache : MetadataCache, optional
+        cache of the file metadata, the header is only read when the file is not cached or changed, by default None
+
+    Returns
+    -------
+    ImageMetadata
+        metadata with fileInfo (width, height, pixelType, pixelPrecision, imageLayout, pixelRepresentation) filled in,
+        the same as the one returned by read_image. For camera RAW files, only fileInfo and exifMetadata are filled in:
+        the calibration data (black and white levels, color matrix) and white balance need read_image
+    """
     reader = ImageReaderFactory.get_reader(image_path)
-    return reader.read(image_path, metadata_path)
+    return _probe_cached(reader, image_path, metadata_path, metadata_cache)
+
+
+def read_thumbnail(image_path: Path, decode: bool = True):
+    """Generic API to read the thumbnail (preview) embedded in a camera RAW file, without unpacking the raw data.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to a camera RAW file (CR2, NEF, ARW, DNG...)
+    decode : bool, optional
+        decode a JPEG thumbnail to a numpy array, or return the content of the JPEG file to store or serve it as is,
+        by default True. Bitmap thumbnails are always returned as numpy arrays.
+
+    Returns
+    -------
+    np.array or bytes
+        thumbnail of shape (height, width, colors), bytes of the JPEG file when decode is False
+    """
+    assert isinstance(image_path, Path), "Image path must be pathlib.Path type."
+    assert image_path.exists(), "Image file {0} not found".format(str(image_path))
+    return ImageReaderFactory.LIBRAW_READER.read_thumbnail(image_path, decode)
 
 
-def read_exif(image_path: Path) -> ExifMetadata:
-    """Read the exif data from image
+def read_exif(image_path: Path, metadata_cache: MetadataCache = None) -> ExifMetadata:
+    """Read the exif data from image, camera RAW files (CR2, NEF...) included. Only the file header is read, the
+       pixels are not decoded, so that large collections of files can be catalogued quickly.
 
     Parameters
     ----------
     image_path : Path
         path to image file
+    metadata_cache : MetadataCache, optional
+        cache of the exif data, the file is only read when it is not cached or changed, by default None
 
     Returns
     -------
@@ -53,11 +287,14 @@ def read_exif(image_path: Path) -> ExifMetadata:
     """
     assert isinstance(image_path, Path), "Image path must be pathlib.Path type."
     assert image_path.exists(), "Image file {0} not found".format(str(image_path))
-    # By binding parser.readMetadata C++ code, we need to privode explicitely None as metadata path
-    # In the case of tif, jpg, we don't need sidecar.
-    metadata = parser.readMetadata(str(image_path), None)
-    image_reader = io.makeReader(str(image_path), metadata)
-    return image_reader.readExif()
+    if metadata_cache is not None:
+        cached, exif = metadata_cache.get_exif(image_path)
+        if cached:
+            return exif
+    exif = ImageReaderFactory.get_reader(image_path).read_exif(image_path)
+    if metadata_cache is not None:
+        metadata_cache.put_exif(image_path, exif)
+    return exif
 
 
 def write_image(output_path: Path, image_array: np.array, write_options: io.ImageWriter.Options):
@@ -0,0 +1,64 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from .reader.base_reader import BaseImageReader
+
+# Internal sections of the metadata updated from the decoded image.
+_metadata_sections = ('fileInfo', 'exifMetadata', 'shootingParams', 'calibrationData', 'cameraControls',
+                      'semanticMasks')
+
+
+class LazyImage:
+    """Image whose metadata is read from the file header and whose pixels are decoded on first access.
+
+    The pixels are decoded by ``pixels`` or by any numpy conversion (``np.asarray(image)``), then kept, so
+    the file is decoded at most once. Filtering stages which only look at ``metadata`` never decode it.
+
+    Until then, ``metadata`` only holds what the header gives: camera RAW files have no calibration data (black
+    level...) before their raw data is unpacked. It is updated in place with the metadata of the decoded image, so
+    that the metadata returned by read_image is updated too.
+    """
+    def __init__(self, reader: BaseImageReader, image_path: Path, metadata_path: Path, metadata, options: dict):
+        self.image_path = image_path
+        self.metadata = metadata
+        self._reader = reader
+        self._metadata_path = metadata_path
+        self._options = options
+        self._pixels = None
+        self._lock = threading.Lock()
+
+    @property
+    def decoded(self) -> bool:
+        return self._pixels is not None
+
+    @property
+    def pixels(self) -> np.ndarray:
+        """Decoded pixels, read_image decodes the file on first access."""
+        if self._pixels is None:
+            with self._lock:
+                # Another thread may have decoded it while this one was waiting.
+                if self._pixels is None:
+                    pixels, metadata = self._reader.read(self.image_path, self._metadata_path, **self._options)
+                    self._update_metadata(metadata)
+                    self._pixels = pixels
+        return self._pixels
+
+    # Internal function to replace the metadata read from the header by the one of the decoded image, in place.
+    def _update_metadata(self, decoded):
+        if decoded is None:
+            return
+        for section in _metadata_sections:
+            setattr(self.metadata, section, getattr(decoded, section))
+
+    def __array__(self, dtype=None, copy=None):
+        pixels = self.pixels
+        if dtype is not None and np.dtype(dtype) != pixels.dtype:
+            return pixels.astype(dtype)
+        return np.array(pixels, copy=True) if copy else pixels
+
+    def __repr__(self):
+        file_info = self.metadata.fileInfo
+        return 'LazyImage(path={0}, size={1}x{2}, decoded={3})'.format(self.image_path, file_info.width,
+                                                                       file_info.height, self.decoded)
@@ -0,0 +1,224 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from cxx_image import (ExifMetadata, FileFormat, ImageLayout, ImageMetadata,
+                       Matrix3, PixelRepresentation, PixelType, RgbColorSpace)
+
+from .utils.io_cxx_libraw import LibRawParameters, Metadata
+
+# Internal Mappings from the enum names written by serialize() to the enum values, per FileInfo field.
+_file_info_enums = {
+    name: {
+        member_name.lower(): member
+        for member_name, member in enum.__members__.items()
+    }
+    for name, enum in (('fileFormat', FileFormat), ('imageLayout', ImageLayout), ('pixelType', PixelType),
+                       ('pixelRepresentation', PixelRepresentation))
+}
+
+_color_spaces = {name.lower(): member for name, member in RgbColorSpace.__members__.items()}
+
+# Internal Mapping from the exif fields serialized as [numerator, denominator] to their rational type.
+_exif_rationals = {
+    'exposureTime': ExifMetadata.Rational,
+    'fNumber': ExifMetadata.Rational,
+    'focalLength': ExifMetadata.Rational,
+    'brightnessValue': ExifMetadata.SRational,
+    'exposureBiasValue': ExifMetadata.SRational
+}
+
+# Internal fields which can not be rebuilt from their serialized form, metadata holding them is not cached.
+_uncached_fields = [
+    ('calibrationData', 'vignetting'),
+    ('cameraControls', 'colorShading'),
+    ('cameraControls', 'faceDetection'),
+]
+
+# Number of writes between two commits, so that a scan does not wait for the disk after each file.
+COMMIT_INTERVAL = 256
+
+
+# Internal function to rebuild the ExifMetadata serialized by ExifMetadata.serialize().
+def _exif_from_dict(payload):
+    exif = ExifMetadata()
+    for name, value in payload.items():
+        if name in _exif_rationals:
+            value = _exif_rationals[name](*value)
+        setattr(exif, name, value)
+    return exif
+
+
+# Internal function to rebuild the metadata serialized by ImageMetadata.serialize() or Metadata.serialize().
+def _metadata_from_dict(payload):
+    if 'LibRawParams' in payload:
+        params = payload['LibRawParams']
+        metadata = Metadata(
+            LibRawParameters(params['rawWidth'], params['rawHeight'], params['rawWidthVisible'],
+                             params['rawHeightVisible'], params['topMargin'], params['leftMargin']))
+    else:
+        metadata = ImageMetadata()
+    for name, value in payload['fileInfo'].items():
+        setattr(metadata.fileInfo, name, _file_info_enums[name][value] if name in _file_info_enums else value)
+    metadata.exifMetadata = _exif_from_dict(payload['exifMetadata'])
+    for name, value in payload['shootingParams'].items():
+        setattr(metadata.shootingParams, name, ImageMetadata.ROI(*value) if name == 'zoom' else value)
+    if 'whiteBalance' in payload['cameraControls']:
+        metadata.cameraControls.whiteBalance = ImageMetadata.WhiteBalance(*payload['cameraControls']['whiteBalance'])
+    for name, value in payload['calibrationData'].items():
+        if name == 'colorMatrix':
+            value = Matrix3(value)
+        elif name == 'colorMatrixTarget':
+            value = _color_spaces[value]
+        setattr(metadata.calibrationData, name, value)
+    return metadata
+
+
+# Internal function to check that the metadata serialized in payload can be rebuilt as a whole.
+def _is_cacheable(payload):
+    return not payload['semanticMasks'] and not any(field in payload[section] for section, field in _uncached_fields)
+
+
+# Internal function to get the identity (path, size, mtime_ns) of a file, the file changed when it differs.
+def _file_stamp(path):
+    stat = path.stat()
+    return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+
+class MetadataCache:
+    """On-disk cache of the metadata of image files, in a SQLite database.
+
+    The metadata and the exif data of a file are stored in their serialized form, with the size and the modification
+    time of the file (and of its sidecar), and are parsed again only when the file changes. Scanning a large
+    collection a second time reads them from the database instead of the files. ``hits`` and ``misses`` count the
+    lookups since the cache was opened.
+
+    The database can be shared by threads. Writes are committed by batches, close the cache (or use it as a context
+    manager) to commit the last ones.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS metadata (path TEXT NOT NULL, kind TEXT NOT NULL, '
+                                 'size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sidecar TEXT NOT NULL, '
+                                 'payload TEXT NOT NULL, PRIMARY KEY (path, kind))')
+        self._connection.commit()
+
+    # Internal function to get the row key of a file and the stamp of its sidecar if any, None for a missing file.
+    @staticmethod
+    def _keys(image_path, metadata_path):
+        sidecar = metadata_path if metadata_path is not None else image_path.with_suffix('.json')
+        try:
+            sidecar_stamp = json.dumps(_file_stamp(sidecar)) if sidecar.is_file() else ''
+            return _file_stamp(image_path), sidecar_stamp
+        except OSError:
+            return None
+
+    def _get(self, kind, image_path, metadata_path):
+        keys = self._keys(image_path, metadata_path)
+        if keys is None:
+            return None
+        (path, size, mtime_ns), sidecar = keys
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT payload FROM metadata WHERE path = ? AND kind = ? AND size = ? AND mtime_ns = ? '
+                'AND sidecar = ?', (path, kind, size, mtime_ns, sidecar)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def _put(self, kind, image_path, metadata_path, payload):
+        keys = self._keys(image_path, metadata_path)
+        if keys is None:
+            return
+        (path, size, mtime_ns), sidecar = keys
+        with self._lock:
+            self._connection.execute('INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?)',
+                                     (path, kind, size, mtime_ns, sidecar, json.dumps(payload)))
+            self._writes += 1
+            if self._writes % COMMIT_INTERVAL == 0:
+                self._connection.commit()
+
+    def get_metadata(self, image_path: Path, metadata_path: Path = None, decoded: bool = False):
+        """Get the cached metadata of an image file.
+
+        Parameters
+        ----------
+        image_path : Path
+            path to image file
+        metadata_path : Path, optional
+            path to its sidecar file, by default None, the .json file next to the image if any
+        decoded : bool, optional
+            get the metadata stored from a read_image of the whole file instead of the one of probe_image,
+            by default False
+
+        Returns
+        -------
+        ImageMetadata
+            metadata as stored by put_metadata, or None when the file is not cached or changed since
+        """
+        payload = self._get('decoded' if decoded else 'probe', image_path, metadata_path)
+        return None if payload is None else _metadata_from_dict(payload)
+
+    def put_metadata(self, image_path: Path, metadata, metadata_path: Path = None, decoded: bool = False):
+        """Store the metadata of an image file, as returned by probe_image, or by read_image when decoded is set.
+
+        The two are stored apart since they differ for some files: the metadata of a decoded camera RAW file has
+        its calibration data, and the one of a MIPI raw file describes the unpacked image.
+        Metadata with vignetting, color shading, face detection or semantic masks is not stored.
+        """
+        payload = metadata.serialize()
+        if _is_cacheable(payload):
+            self._put('decoded' if decoded else 'probe', image_path, metadata_path, payload)
+
+    def get_exif(self, image_path: Path):
+        """Get the cached exif data of an image file.
+
+        Returns
+        -------
+        (bool, ExifMetadata)
+            whether the file is cached and did not change since, and its exif data, None for files without exif
+        """
+        payload = self._get('exif', image_path, None)
+        if payload is None:
+            return False, None
+        return True, None if payload['exif'] is None else _exif_from_dict(payload['exif'])
+
+    def put_exif(self, image_path: Path, exif):
+        """Store the exif data of an image file, as returned by read_exif, None for files without exif."""
+        self._put('exif', image_path, None, {'exif': None if exif is None else exif.serialize()})
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM metadata').fetchone()[0]
+
+    def clear(self):
+        """Remove all the cached entries, and reset the counters."""
+        with self._lock:
+            self._connection.execute('DELETE FROM metadata')
+            self._connection.commit()
+            self.hits = self.misses = 0
+
+    def close(self):
+        """Commit the pending writes and close the database."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return 'MetadataCache(path={0}, hits={1}, misses={2})'.format(self.path, self.hits, self.misses)
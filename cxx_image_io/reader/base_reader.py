@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Iterator
 
 import numpy as np
 
@@ -12,6 +13,13 @@ class BaseImageReader(ABC):
     Each reader must implement:
     - can_read: determine whether reader supports the given file
     - read:     load image + metadata and return numpy array + metadata object
+
+    Readers may implement:
+    - probe:    load only the metadata, with fileInfo filled in, without decoding the pixels
+    - read_bytes: load image + metadata from the content of a file held in memory
+
+    read_exif takes the exif data from probe, and iter_rows yields the image by horizontal bands, by default from
+    a decode of the whole image.
     """
     @abstractmethod
     def can_read(self, image_path: Path) -> bool:
@@ -31,7 +39,17 @@ class BaseImageReader(ABC):
         raise NotImplementedError("can_read must be implemented in subclasses")
 
     @abstractmethod
-    def read(self, image_path: Path, metadata_path: Path = None) -> (np.ndarray, object):
+    def read(self,
+             image_path: Path,
+             metadata_path: Path = None,
+             mmap: bool = False,
+             roi: tuple = None,
+             out: np.ndarray = None,
+             scale: float = None,
+             max_size: int = None,
+             crop: str = None,
+             compact: bool = False,
+             binning: int = None) -> (np.ndarray, object):
         """
         Read the image and metadata.
 
@@ -41,6 +59,22 @@ class BaseImageReader(ABC):
             File to load.
         metadata_path : Path, optional
             Path to metadata sidecar file.
+        mmap : bool, optional
+            Map the file instead of reading it when the format allows it.
+        roi : tuple, optional
+            Region of interest (x, y, w, h) to read instead of the whole image.
+        out : np.ndarray, optional
+            Array with the shape and the dtype of the image to decode into.
+        scale : float, optional
+            Downscale factor (1, 1/2, 1/4 or 1/8) applied while decoding, when the format allows it.
+        max_size : int, optional
+            Maximal size of the longest side of the image downscaled while decoding, when the format allows it.
+        crop : str, optional
+            'visible' to return a view of the image without the sensor margins, for camera RAW files.
+        compact : bool, optional
+            Copy the visible area and free the full raw data, for camera RAW files.
+        binning : int, optional
+            Average binning x binning pixels of each CFA channel into 4 planes, for camera RAW files.
 
         Returns
         -------
@@ -50,3 +84,88 @@ class BaseImageReader(ABC):
             Metadata object (ImageMetadata or Metadata depending on backend)
         """
         raise NotImplementedError("read must be implemented in subclasses")
+
+    def probe(self, image_path: Path, metadata_path: Path = None) -> object:
+        """
+        Read the metadata from the file header only.
+        Readers without header parsing do not support it.
+
+        Parameters
+        ----------
+        image_path : Path
+            File to probe.
+        metadata_path : Path, optional
+            Path to metadata sidecar file.
+
+        Returns
+        -------
+        object
+            Metadata object with fileInfo filled in, as returned by read.
+        """
+        raise NotImplementedError("probe must be implemented in subclasses")
+
+    def read_bytes(self, data, file_name: Path, metadata=None) -> (np.ndarray, object):
+        """
+        Read the image and metadata from the content of a file held in memory.
+        Readers of files only do not support it.
+
+        Parameters
+        ----------
+        data : bytes-like
+            Content of the image file.
+        file_name : Path
+            File name made from the format hint, the file does not exist.
+        metadata : ImageMetadata or Path, optional
+            Image metadata, or path to a sidecar file, for raw buffers.
+
+        Returns
+        -------
+        np.ndarray
+            Loaded image in numpy array.
+        object
+            Metadata object (ImageMetadata or Metadata depending on backend)
+        """
+        raise NotImplementedError("read_bytes must be implemented in subclasses")
+
+    def read_exif(self, image_path: Path) -> object:
+        """
+        Read the exif data from the file header only.
+        This default implementation takes it from the metadata returned by probe.
+
+        Parameters
+        ----------
+        image_path : Path
+            File to load.
+
+        Returns
+        -------
+        ExifMetadata
+            Exif data of the image.
+        """
+        return self.probe(image_path).exifMetadata
+
+    def iter_rows(self,
+                  image_path: Path,
+                  metadata_path: Path = None,
+                  rows_per_chunk: int = 256) -> Iterator[np.ndarray]:
+        """
+        Yield the image by successive horizontal bands of rows_per_chunk rows, the last one may be shorter.
+        This default implementation decodes the whole image first, readers able to decode a band alone override it.
+
+        Parameters
+        ----------
+        image_path : Path
+            File to load.
+        metadata_path : Path, optional
+            Path to metadata sidecar file.
+        rows_per_chunk : int, optional
+            Number of rows of each band.
+
+        Returns
+        -------
+        Iterator[np.ndarray]
+            Bands of the image in numpy array.
+        """
+        image, _ = self.read(image_path, metadata_path)
+        for y in range(0, image.shape[0], rows_per_chunk):
+            yield image[y:y + rows_per_chunk]
@@ -1,6 +1,11 @@
 from pathlib import Path
 
-from cxx_image_io.utils.io_cxx_image import read_image_cxx
+import numpy as np
+
+from cxx_image_io.utils.io_cxx_image import (iter_rows_cxx, probe_image_cxx,
+                                             read_exif_cxx,
+                                             read_image_bytes_cxx,
+                                             read_image_cxx)
 
 from .base_reader import BaseImageReader
 
@@ -11,22 +16,88 @@ class CxxImageReader(BaseImageReader):
 
     This reader handles formats supported by your C++ image library, including:
     JPEG, PNG, TIFF, BMP, YUV, NV12, CFA, DNG, etc.
+
+    A reader made with image_format decodes the files as this format whatever their extension, for the files whose
+    content was recognized by sniff_image_format.
     """
 
     SUPPORTED_EXT = {'.yuv', '.nv12', '.bmp', '.jpg', '.jpeg', '.png', '.cfa', '.dng', '.tif', '.tiff'}
 
+    def __init__(self, image_format: str = None):
+        self.image_format = image_format
+
     def can_read(self, image_path: Path) -> bool:
         """
         Check if the file extension is supported by the C++ backend.
         """
         return image_path.suffix.lower() in self.SUPPORTED_EXT
 
-    def read(self, image_path: Path, metadata_path: Path = None):
+    def read(self,
+             image_path: Path,
+             metadata_path: Path = None,
+             mmap: bool = False,
+             roi: tuple = None,
+             out: np.ndarray = None,
+             scale: float = None,
+             max_size: int = None,
+             crop: str = None,
+             compact: bool = False,
+             binning: int = None):
         """
         Delegate image reading to the existing read_image_cxx() function.
+        crop, compact and binning are not supported, only camera RAW files have margins and raw CFA data.
+
+        Returns
+        -------
+        (np.ndarray, metadata)
+        """
+        assert crop is None and not compact, "crop and compact are only supported for camera RAW files."
+        assert binning is None, "binning is only supported for camera RAW files."
+        return read_image_cxx(image_path,
+                              metadata_path,
+                              mmap=mmap,
+                              roi=roi,
+                              out=out,
+                              scale=scale,
+                              max_size=max_size,
+                              image_format=self.image_format)
+
+    def iter_rows(self, image_path: Path, metadata_path: Path = None, rows_per_chunk: int = 256):
+        """
+        Delegate band reading to iter_rows_cxx().
+
+        Returns
+        -------
+        Iterator[np.ndarray]
+        """
+        return iter_rows_cxx(image_path, metadata_path, rows_per_chunk, self.image_format)
+
+    def probe(self, image_path: Path, metadata_path: Path = None):
+        """
+        Delegate header reading to probe_image_cxx().
+
+        Returns
+        -------
+        metadata
+        """
+        return probe_image_cxx(image_path, metadata_path, self.image_format)
+
+    def read_exif(self, image_path: Path):
+        """
+        Delegate exif reading to read_exif_cxx().
+
+        Returns
+        -------
+        ExifMetadata
+        """
+        return read_exif_cxx(image_path, self.image_format)
+
+    def read_bytes(self, data, file_name: Path, metadata=None):
+        """
+        Delegate reading from memory to read_image_bytes_cxx().
 
         Returns
         -------
         (np.ndarray, metadata)
         """
-        return read_image_cxx(image_path, metadata_path)
+        return read_image_bytes_cxx(data, file_name, metadata)
@@ -1,7 +1,16 @@
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+import numpy as np
+
 from cxx_image_io.utils.io_cxx_libraw import (LibRaw, LibRaw_errors,
-                                              read_image_libraw)
+                                              LibRawProcessorPool,
+                                              probe_image_libraw,
+                                              read_exif_libraw,
+                                              read_image_bytes_libraw,
+                                              read_image_libraw,
+                                              read_thumbnail_libraw)
 
 from .base_reader import BaseImageReader
 
@@ -12,9 +21,22 @@ class LibRawImageReader(BaseImageReader):
 
     This reader handles various RAW camera formats:
     CR2, NEF, ARW, RAF, ORF, RW2, DNG, and more.
+
+    A processor opened by can_read to check an unknown file is kept for the following read or probe
+    of the same file, so that the file is opened and parsed only once.
+
+    With a LibRawProcessorPool, the other reads reuse the processors of the pool. The returned images are then
+    copied out of the raw data, which is freed when the processor is recycled.
     """
 
     SUPPORTED_RAW_EXT = {'.cr2', '.nef', '.arw', '.orf', '.rw2', '.kdc', '.raw', '.pef', '.srw', '.dcr'}
+    # Maximum number of opened processors waiting for their read, each one holds an open file.
+    MAX_OPENED = 4
+
+    def __init__(self, pool: LibRawProcessorPool = None):
+        self.pool = pool
+        self._opened = OrderedDict()
+        self._lock = threading.Lock()
 
     def can_read(self, image_path: Path) -> bool:
         """
@@ -24,18 +46,105 @@ class LibRawImageReader(BaseImageReader):
 
     def _can_open(self, image_path: Path) -> bool:
         """
-        Check if LibRaw is capable of opening this file.
+        Check if LibRaw is capable of opening this file, and keep the opened processor for the read.
         """
         processor = LibRaw()
         ret = processor.open_file(str(image_path))
-        return ret == LibRaw_errors.LIBRAW_SUCCESS
+        if ret != LibRaw_errors.LIBRAW_SUCCESS:
+            return False
+        self._keep_opened(image_path, processor)
+        return True
+
+    @staticmethod
+    def _file_key(image_path: Path):
+        # The processor is only reused for the same file in the same state.
+        try:
+            stat = image_path.stat()
+        except OSError:
+            return None
+        return image_path, stat.st_mtime_ns, stat.st_size
+
+    def _keep_opened(self, image_path: Path, processor: LibRaw):
+        key = self._file_key(image_path)
+        if key is None or self.MAX_OPENED <= 0:
+            return
+        with self._lock:
+            self._opened[key] = processor
+            while len(self._opened) > self.MAX_OPENED:
+                self._opened.popitem(last=False)
+
+    def _take_opened(self, image_path: Path):
+        key = self._file_key(image_path)
+        with self._lock:
+            return self._opened.pop(key, None)
+
+    def read(self,
+             image_path: Path,
+             metadata_path: Path = None,
+             mmap: bool = False,
+             roi: tuple = None,
+             out: np.ndarray = None,
+             scale: float = None,
+             max_size: int = None,
+             crop: str = None,
+             compact: bool = False,
+             binning: int = None):
+        """
+        Delegate reading to read_image_libraw(), with the processor opened by can_read if any.
+        mmap is ignored, camera RAW files are compressed or packed and always decoded.
+        roi is cropped out of the unpacked raw data, which is copied into out when given.
+        scale and max_size are not supported, the raw data has no DCT to downscale in.
+        crop='visible' returns a view without margins, compact a copy of the visible area.
+        binning averages binning x binning pixels of each CFA channel into 4 planes.
+
+        Returns
+        -------
+        (np.ndarray, metadata)
+        """
+        assert scale is None and max_size is None, "scale and max_size are only supported for JPEG and DNG images."
+        opened = self._take_opened(image_path)
+        if opened is None and self.pool is not None:
+            return self.pool.read(image_path, roi=roi, out=out, crop=crop, compact=compact, binning=binning)
+        return read_image_libraw(image_path, opened, roi=roi, out=out, crop=crop, compact=compact, binning=binning)
+
+    def probe(self, image_path: Path, metadata_path: Path = None):
+        """
+        Delegate header reading to probe_image_libraw(), with the processor opened by can_read if any.
+
+        Returns
+        -------
+        metadata
+        """
+        return probe_image_libraw(image_path, self._take_opened(image_path))
+
+    def read_exif(self, image_path: Path):
+        """
+        Delegate exif reading to read_exif_libraw(), with the processor opened by can_read if any.
+        Only the header is parsed by open_file, the raw data is not unpacked.
+
+        Returns
+        -------
+        ExifMetadata
+        """
+        return read_exif_libraw(image_path, self._take_opened(image_path))
+
+    def read_thumbnail(self, image_path: Path, decode: bool = True):
+        """
+        Delegate thumbnail reading to read_thumbnail_libraw(), with the processor opened by can_read if any.
+
+        Returns
+        -------
+        np.ndarray or bytes
+        """
+        return read_thumbnail_libraw(image_path, self._take_opened(image_path), decode=decode)
 
-    def read(self, image_path: Path, metadata_path: Path = None):
+    def read_bytes(self, data, file_name: Path, metadata=None):
         """
-        Delegate reading to read_image_libraw().
+        Delegate reading from memory to read_image_bytes_libraw(), LibRaw opens the buffer itself.
+        metadata is ignored, camera RAW files describe themselves.
 
         Returns
         -------
         (np.ndarray, metadata)
         """
-        return read_image_libraw(image_path)
+        return read_image_bytes_libraw(data)
@@ -1,8 +1,11 @@
+import functools
 from pathlib import Path
 
 from .base_reader import BaseImageReader
 from .cxx_image_reader import CxxImageReader
-from .cxx_libraw_reader import LibRawImageReader
+from .cxx_libraw_reader import LibRawImageReader, LibRawProcessorPool
+from .signature import (CAMERA_TIFF, CXX_FORMATS, RAW_FORMATS,
+                        sniff_image_format)
 
 """
 Factory class responsible for selecting the appropriate image reader.
@@ -12,33 +15,119 @@ Reader selection priority:
     2. LibRawImageReader  handles RAW formats
 """
 
+# Number of routing decisions remembered, one per file path.
+DECISION_CACHE_SIZE = 65536
+
 
 class ImageReaderFactory:
     """
     Factory responsible for selecting the appropriate image reader
     based on the predefined multi-stage rules:
 
-    1. If extension is in the deterministic C++ list => use Cxx reader.
-    2. Otherwise try LibRaw.
-    3. If LibRaw fails => fallback to Cxx reader again (RAW + sidecar).
+    1. If the file content has a conclusive signature => use the reader of that format.
+    2. If extension is in the deterministic C++ list => use Cxx reader.
+    3. If the content is a TIFF with a camera Make (NEF, ARW...) => use LibRaw reader.
+    4. If a .json sidecar is next to the file => use Cxx reader (plain or MIPI raw buffer).
+    5. Otherwise try LibRaw, by extension then by opening the file.
+    6. If LibRaw fails => fallback to Cxx reader again.
+
+    The decision is cached per path, and recomputed when the file modification time or size changes, or when a
+    sidecar is added next to the file or removed.
+    set_libraw_pool makes the camera RAW files of read_image and read_images decoded with a LibRawProcessorPool.
+
+    Images held in memory follow the same stages with the file name given as format hint, see get_bytes_reader.
     """
 
     CXX_READER = CxxImageReader()
+    # C++ readers of the files recognized by their content, which decode them whatever their extension.
+    CXX_FORMAT_READERS = {image_format: CxxImageReader(image_format) for image_format in CXX_FORMATS}
     LIBRAW_READER = LibRawImageReader()
 
+    @classmethod
+    def set_libraw_pool(cls, pool: LibRawProcessorPool = None):
+        """
+        Read the camera RAW files with the processors of pool, None to go back to a new processor per file.
+        The process workers of read_images only get the pool when they are forked after this call.
+        """
+        cls.LIBRAW_READER = LibRawImageReader(pool=pool)
+        # The cached decisions hold the previous reader.
+        cls._select_reader_cached.cache_clear()
+
     @classmethod
     def get_reader(cls, image_path: Path) -> BaseImageReader:
         """
-        Select an appropriate reader for the given file following three-step logic.
+        Select an appropriate reader for the given file following the multi-stage logic.
         """
+        try:
+            stat = image_path.stat()
+        except OSError:
+            # Let the selected reader report the missing file.
+            return cls._select_reader(image_path)
+        # Adding or removing a sidecar changes the decision of stage 4, not the stat of the file.
+        has_sidecar = image_path.with_suffix('.json').exists()
+        return cls._select_reader_cached(image_path, stat.st_mtime_ns, stat.st_size, has_sidecar)
+
+    @classmethod
+    @functools.lru_cache(maxsize=DECISION_CACHE_SIZE)
+    def _select_reader_cached(cls, image_path: Path, mtime_ns: int, size: int, has_sidecar: bool) -> BaseImageReader:
+        return cls._select_reader(image_path)
 
-        # Stage 1: Deterministic extension → always prefer C++ backend
+    @classmethod
+    def _select_reader(cls, image_path: Path) -> BaseImageReader:
+        image_format = sniff_image_format(image_path)
+
+        # Stage 1: Conclusive content signature, it wins over a wrong extension
+        if image_format in CXX_FORMATS:
+            return cls.CXX_FORMAT_READERS[image_format]
+        if image_format in RAW_FORMATS:
+            return cls.LIBRAW_READER
+
+        # Stage 2: Deterministic extension → always prefer C++ backend
         if cls.CXX_READER.can_read(image_path):
             return cls.CXX_READER
 
-        # Stage 2: Try LibRaw
+        # Stage 3: TIFF based camera RAW
+        if image_format == CAMERA_TIFF:
+            return cls.LIBRAW_READER
+
+        # Stage 4: RAW buffers described by a sidecar → C++
+        if image_path.with_suffix('.json').exists():
+            return cls.CXX_READER
+
+        # Stage 5: Try LibRaw
         if cls.LIBRAW_READER.can_read(image_path):
             return cls.LIBRAW_READER
 
-        # Stage 3: Fallback: special RAW files requiring sidecar → C++
+        # Stage 6: Fallback → C++
+        return cls.CXX_READER
+
+    @classmethod
+    def get_bytes_reader(cls, image_format: str, file_name: Path, has_metadata: bool) -> BaseImageReader:
+        """
+        Select an appropriate reader for an image held in memory, from the format recognized in its content
+        (sniff_image_bytes) and the file name made from the format hint.
+        """
+        # Stage 1: Conclusive content signature
+        if image_format in CXX_FORMATS:
+            return cls.CXX_READER
+        if image_format in RAW_FORMATS:
+            return cls.LIBRAW_READER
+
+        # Stage 2: Deterministic extension → always prefer C++ backend
+        if cls.CXX_READER.can_read(file_name):
+            return cls.CXX_READER
+
+        # Stage 3: TIFF based camera RAW
+        if image_format == CAMERA_TIFF:
+            return cls.LIBRAW_READER
+
+        # Stage 4: RAW buffers described by a sidecar → C++
+        if has_metadata:
+            return cls.CXX_READER
+
+        # Stage 5: RAW extension, or no hint at all: only LibRaw may still recognize the content
+        if not file_name.suffix or file_name.suffix.lower() in cls.LIBRAW_READER.SUPPORTED_RAW_EXT:
+            return cls.LIBRAW_READER
+
+        # Stage 6: Fallback → C++
         return cls.CXX_READER
@@ -0,0 +1,145 @@
+import struct
+from pathlib import Path
+from typing import Optional
+
+"""
+Content sniffing of image files from their first bytes.
+
+Only the header (and for TIFF based files the first IFD) is read, which is enough to tell apart the
+formats decoded by the C++ backend from the camera RAW formats decoded by LibRaw.
+"""
+
+# Number of bytes read to recognize a file, the TIFF IFD0 is read separately when it lies further.
+HEADER_SIZE = 1024
+
+# Formats decoded by the C++ backend whatever the file extension.
+CXX_FORMATS = {'jpeg', 'png', 'bmp', 'dng'}
+# Camera RAW formats recognized by a signature of their own.
+RAW_FORMATS = {'cr2', 'cr3', 'orf', 'rw2', 'raf', 'mrw', 'x3f'}
+# TIFF container with a camera Make and no DNGVersion in IFD0: NEF, ARW, PEF, SRW, DCR... also possibly a
+# TIFF exported by a camera, so the file extension still has the last word.
+CAMERA_TIFF = 'camera_tiff'
+# TIFF container without any marker of a camera RAW.
+TIFF = 'tiff'
+
+_TIFF_TAG_MAKE = 0x010F
+_TIFF_TAG_DNG_VERSION = 0xC612
+
+_MAGICS = [
+    (0, b'\xff\xd8\xff', 'jpeg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'png'),
+    (0, b'IIRO', 'orf'),
+    (0, b'IIRS', 'orf'),
+    (0, b'MMOR', 'orf'),
+    # Panasonic RW2 and the Leica files made by Panasonic share the same header.
+    (0, b'IIU\x00', 'rw2'),
+    (0, b'FUJIFILMCCD-RAW', 'raf'),
+    (0, b'\x00MRM', 'mrw'),
+    (0, b'FOVb', 'x3f'),
+    (4, b'ftypcrx ', 'cr3'),
+]
+
+
+# Internal function to read size bytes at offset, shorter at the end of the file.
+def _read_at(f, offset, size):
+    f.seek(offset)
+    return f.read(size)
+
+
+# Internal function to look for camera markers in IFD0 of a TIFF container.
+def _sniff_tiff(f, header):
+    if header[8:10] == b'CR':
+        return 'cr2'
+    endian = '<' if header[:2] == b'II' else '>'
+    (ifd_offset, ) = struct.unpack(endian + 'I', header[4:8])
+    count_bytes = _read_at(f, ifd_offset, 2)
+    if len(count_bytes) < 2:
+        return TIFF
+    (count, ) = struct.unpack(endian + 'H', count_bytes)
+    entries = _read_at(f, ifd_offset + 2, 12 * count)
+    has_make = False
+    for i in range(len(entries) // 12):
+        tag, tag_type, value_count = struct.unpack(endian + 'HHI', entries[12 * i:12 * i + 8])
+        if tag == _TIFF_TAG_DNG_VERSION:
+            return 'dng'
+        if tag == _TIFF_TAG_MAKE and tag_type == 2:  # ASCII
+            # The Make string is stored in the entry itself up to 4 bytes, at an offset otherwise.
+            if value_count <= 4:
+                make = entries[12 * i + 8:12 * i + 8 + value_count]
+            else:
+                (value_offset, ) = struct.unpack(endian + 'I', entries[12 * i + 8:12 * i + 12])
+                make = _read_at(f, value_offset, value_count)
+            has_make = len(make.strip(b'\x00 ')) > 0
+    return CAMERA_TIFF if has_make else TIFF
+
+
+# Internal file-like view on a memory buffer, the bytes are not copied.
+class _BufferFile:
+    def __init__(self, data):
+        self._data = memoryview(data).cast('B')
+        self._pos = 0
+
+    def seek(self, offset):
+        self._pos = offset
+
+    def read(self, size):
+        chunk = self._data[self._pos:self._pos + size].tobytes()
+        self._pos += len(chunk)
+        return chunk
+
+
+# Internal function to recognize the format from the content of a file of file_size bytes.
+def _sniff(f, file_size):
+    header = f.read(HEADER_SIZE)
+    for offset, magic, image_format in _MAGICS:
+        if header[offset:offset + len(magic)] == magic:
+            return image_format
+    if header[:4] in (b'II*\x00', b'MM\x00*'):
+        return _sniff_tiff(f, header)
+    # 'BM' alone is too weak for raw buffers, the BMP header also holds the file size.
+    if header[:2] == b'BM' and len(header) >= 6:
+        (bmp_size, ) = struct.unpack('<I', header[2:6])
+        if bmp_size == file_size:
+            return 'bmp'
+    return None
+
+
+def sniff_image_format(image_path: Path) -> Optional[str]:
+    """Recognize the format of an image file from its content.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+
+    Returns
+    -------
+    Optional[str]
+        a format of CXX_FORMATS or RAW_FORMATS, CAMERA_TIFF or TIFF, None when the content is not recognized
+        (e.g. plain or MIPI raw buffers described by a sidecar) or the file cannot be read.
+    """
+    try:
+        with open(image_path, 'rb') as f:
+            return _sniff(f, image_path.stat().st_size)
+    except (OSError, struct.error):
+        return None
+
+
+def sniff_image_bytes(data) -> Optional[str]:
+    """Recognize the format of an image file held in memory, as sniff_image_format does.
+
+    Parameters
+    ----------
+    data : bytes-like
+        content of the image file (bytes, bytearray, memoryview, numpy array...)
+
+    Returns
+    -------
+    Optional[str]
+        a format of CXX_FORMATS or RAW_FORMATS, CAMERA_TIFF or TIFF, None when the content is not recognized.
+    """
+    view = memoryview(data)
+    try:
+        return _sniff(_BufferFile(view), view.nbytes)
+    except struct.error:
+        return None
@@ -1,9 +1,19 @@
 import logging
+import mmap as mmap_module
 import sys
 from pathlib import Path
 
 import numpy as np
-from cxx_image import ImageMetadata, PixelRepresentation, io, parser
+from cxx_image import (ImageLayout, ImageMetadata, PixelRepresentation,
+                       PixelType, io, parser)
+
+from .io_sidecar_raw import (_pixel_representation_dtypes, map_plain_frames,
+                             map_plain_image, read_raw_region)
+from .out_array import check_out, copy_into
+from .region import check_roi, crop_image, fill_region_file_info
+
+# Internal Mapping from pixel type to the number of channels of the decoded array, the other types have one channel.
+_pixel_type_channels = {PixelType.GRAY_ALPHA: 2, PixelType.RGB: 3, PixelType.RGBA: 4, PixelType.YUV: 3}
 
 
 # internal function to fill the image critical information to metadata that could be used otherwhere.
@@ -17,7 +27,139 @@ def _fill_medatata(image, metadata):
     return metadata
 
 
-def read_image_cxx(image_path: Path, metadata_path: Path = None) -> (np.array, ImageMetadata):
+# Internal function to adjust the fileInfo filled in for the whole image to the region of interest.
+def _fill_region_metadata(metadata, roi):
+    fill_region_file_info(metadata.fileInfo, roi)
+    return metadata
+
+
+# Internal function to check the image and sidecar paths.
+def _check_paths(image_path, metadata_path):
+    assert isinstance(image_path, Path), "Image path must be pathlib.Path type."
+    assert image_path.exists(), "Image file {0} not found".format(str(image_path))
+
+    if metadata_path:
+        assert isinstance(metadata_path, Path), "Metadata path must be pathlib.Path type."
+        assert metadata_path.exists(), "Metadata file {0} not found".format(str(metadata_path))
+
+
+# Internal Mapping from the format recognized in the content to the extensions selecting its C++ reader.
+_format_extensions = {'jpeg': ('.jpg', '.jpeg'), 'png': ('.png', ), 'bmp': ('.bmp', ), 'dng': ('.dng', )}
+
+
+# Internal function to make the C++ reader of a file, which io.makeReader picks by extension. A file whose content
+# was recognized as image_format with another extension is mapped and read as a stream named for its format.
+def _open_reader(image_path, metadata, image_format):
+    extensions = _format_extensions.get(image_format)
+    if extensions is None or image_path.suffix.lower() in extensions:
+        return io.makeReader(str(image_path), metadata)
+    with open(image_path, 'rb') as f:
+        mapped = mmap_module.mmap(f.fileno(), 0, access=mmap_module.ACCESS_READ)
+    # The reader keeps the stream, and the stream keeps the mapping, alive.
+    return io.makeReaderFromStream(str(image_path.with_suffix(extensions[0])), io.MemoryStream(mapped), metadata)
+
+
+# Internal function to parse the sidecar and make the reader, only the file header is parsed here.
+def _make_reader(image_path, metadata_path, image_format=None):
+    metadata = parser.readMetadata(str(image_path), metadata_path)
+    image_reader = _open_reader(image_path, metadata, image_format)
+    # Currently don't find a good way to supported completely the std::optional by binding C++ function.
+    # So create explicitily an ImageMetadata object when metadata is None.
+    metadata = ImageMetadata() if metadata is None else metadata
+    metadata = image_reader.readMetadata(metadata)
+    return image_reader, metadata
+
+
+# Internal function to check a region of interest against the image layout parsed by the reader.
+def _check_region(image_reader, roi):
+    check_roi(roi, image_reader.width(), image_reader.height())
+    # Chroma planes of YUV 420 and NV12 are stacked below the luma plane, a region of rows is not a region of pixels.
+    assert image_reader.imageLayout() not in (ImageLayout.YUV_420, ImageLayout.NV12), \
+        "roi is not supported for YUV 420 and NV12 images."
+
+
+# Internal function to decode the whole image with the read function of its pixel representation.
+def _decode(image_reader, metadata):
+    pixel_repr = image_reader.pixelRepresentation()
+    if pixel_repr == PixelRepresentation.UINT8:
+        image = image_reader.read8u()
+    elif pixel_repr == PixelRepresentation.UINT16:
+        image = image_reader.read16u()
+    else:
+        image = image_reader.readf()
+    return image, _fill_medatata(image, metadata)
+
+
+# Internal function to get the shape of the array read_image_cxx returns, from the layout parsed by the reader.
+def _image_shape(image_reader, roi):
+    if roi is None and image_reader.imageLayout() in (ImageLayout.YUV_420, ImageLayout.NV12):
+        return 3 * image_reader.height() // 2, image_reader.width()
+    width, height = (image_reader.width(), image_reader.height()) if roi is None else roi[2:]
+    channels = _pixel_type_channels.get(image_reader.pixelType(), 1)
+    return (height, width, channels) if channels > 1 else (height, width)
+
+
+# Internal Mapping from the downscale factor to the denominator of the DCT scaling of libjpeg.
+_jpeg_scale_denoms = {1: 1, 0.5: 2, 0.25: 4, 0.125: 8}
+
+
+# Internal function to check the downscale options, and get the DCT scaling denominator and the maximal size.
+def _check_scale(image_reader, scale, max_size, roi, mmap):
+    assert scale is None or max_size is None, "scale and max_size can not be used together."
+    assert roi is None, "roi can not be used with scale or max_size."
+    assert not mmap, "mmap can not be used with scale or max_size."
+    assert isinstance(image_reader, (io.JpegReader, io.DngReader)), \
+        "scale and max_size are only supported for JPEG and DNG images."
+    if max_size is not None:
+        assert isinstance(max_size, (int, np.integer)) and max_size > 0, "max_size must be a positive integer."
+        return 1, int(max_size)
+    assert scale in _jpeg_scale_denoms, "scale must be 1, 1/2, 1/4 or 1/8."
+    return _jpeg_scale_denoms[scale], 0
+
+
+# Internal function to fill the fileInfo of a downscaled 8 bits JPEG (or DNG preview) decode.
+def _fill_preview_metadata(metadata, image):
+    metadata.fileInfo.width = image.shape[1]
+    metadata.fileInfo.height = image.shape[0]
+    metadata.fileInfo.pixelType = PixelType.RGB if image.ndim == 3 else PixelType.GRAYSCALE
+    metadata.fileInfo.imageLayout = ImageLayout.INTERLEAVED
+    metadata.fileInfo.pixelPrecision = 8
+    metadata.fileInfo.pixelRepresentation = PixelRepresentation.UINT8
+    return metadata
+
+
+# Internal function to decode a JPEG, or the JPEG preview of a DNG, downscaled in the DCT domain.
+def _read_scaled(image_path, image_reader, scale_denom, max_size, out):
+    if isinstance(image_reader, io.JpegReader):
+        return io.readJpegScaled(str(image_path), scale_denom, max_size, out=out)
+    image = io.readDngPreview(str(image_path), scale_denom, max_size, out=out)
+    if image is None:
+        raise RuntimeError('no JPEG preview found in DNG file')
+    return image
+
+
+# Internal function to decode only the region of interest, into out when given.
+# None when the file must be decoded as a whole.
+def _read_region(image_path, image_reader, roi, out=None):
+    if isinstance(image_reader, (io.TiffReader, io.DngReader)):
+        # None as well for the TIFF layouts which are not stored as decoded (planar, packed samples, ...).
+        return io.readTiffRegion(str(image_path), *roi, out=out)
+    if isinstance(image_reader, io.JpegReader):
+        return io.readJpegRegion(str(image_path), *roi, out=out)
+    if isinstance(image_reader, io.PngReader):
+        # None as well for palette, interlaced and below 8 bits images.
+        return io.readPngRegion(str(image_path), *roi, out=out)
+    return read_raw_region(image_path, image_reader, roi, out)
+
+
+def read_image_cxx(image_path: Path,
+                   metadata_path: Path = None,
+                   mmap: bool = False,
+                   roi: tuple = None,
+                   out: np.ndarray = None,
+                   scale: float = None,
+                   max_size: int = None,
+                   image_format: str = None) -> (np.array, ImageMetadata):
     """Read different types of image files and return a numpy array,
        Supported image types: plain raw, packed raw 10 and 12 bits, cfa, jpg, png, tiff, bmp.
 
@@ -27,38 +169,261 @@ def read_image_cxx(image_path: Path, metadata_path: Path = None) -> (np.array, I
         path to image file
     metadata_path : Path, optional
         path to sidecar file for raw file case, the API will find automatically .json next to raw file, by default None,
+    mmap : bool, optional
+        map the pixels of plain raw files described by a sidecar and of CFA files instead of reading them, see
+        map_plain_image, the other files are read as usual, by default False
+    roi : tuple, optional
+        region of interest (x, y, w, h) in pixels, only this region is returned, by default None.
+        TIFF / DNG files decode only the strips or tiles crossed by the region, JPEG and 8 / 16 bits non-interlaced
+        PNG files stop decoding after its last row, plain, CFA and MIPI raw files read and unpack only its rows. The
+        other files are decoded as a whole and cropped. Not supported for YUV 420 and NV12 images.
+    out : np.ndarray, optional
+        writeable C-contiguous array to decode the image (or the region) into, it must have the shape and the dtype
+        of the returned image, by default None. TIFF / DNG with samples stored as decoded, JPEG, 8 / 16 bits
+        non-interlaced PNG without palette, plain, CFA and MIPI raw files are decoded straight into it. BMP, YUV 420,
+        NV12 and the other PNG and TIFF files are decoded by readInto into a new image then copied, which saves
+        nothing. Can not be used with mmap.
+    scale : float, optional
+        JPEG and DNG only, decode the image downscaled by 1, 1/2, 1/4 or 1/8 with the DCT scaling of libjpeg, which
+        skips most of the inverse DCT work. A DNG gives its widest JPEG compressed preview instead of the raw data.
+        The output size is ceil(size * scale). Can not be used with roi or mmap, by default None
+    max_size : int, optional
+        JPEG and DNG only, as scale with the smallest downscale bringing the longest side down to max_size pixels,
+        1/8 at most. Can not be used with scale, by default None
+    image_format : str, optional
+        format recognized in the content by sniff_image_format, the file is decoded as this format when its
+        extension is another one (e.g. a JPEG saved as .nef), by default None
 
     Returns
     -------
     np.array
-        returned image in numpy array format
-        metadata
+        returned image in numpy array format, a read-only np.memmap for a mapped file, out when given
+        metadata, with width, height and bayer pixelType of the region when roi is set,
+        of the 8 bits downscaled image when scale or max_size is set
 
     """
-    assert isinstance(image_path, Path), "Image path must be pathlib.Path type."
-    assert image_path.exists(), "Image file {0} not found".format(str(image_path))
-
-    if metadata_path:
-        assert isinstance(metadata_path, Path), "Metadata path must be pathlib.Path type."
-        assert metadata_path.exists(), "Metadata file {0} not found".format(str(metadata_path))
+    _check_paths(image_path, metadata_path)
     try:
-        metadata = parser.readMetadata(str(image_path), metadata_path)
-        image_reader = io.makeReader(str(image_path), metadata)
-        # Currently don't find a good way to supported completely the std::optional by binding C++ function.
-        # So create explicitily an ImageMetadata object when metadata is None.
-        metadata = ImageMetadata() if metadata is None else metadata
-        metadata = image_reader.readMetadata(metadata)
+        image_reader, metadata = _make_reader(image_path, metadata_path, image_format)
         pixel_repr = image_reader.pixelRepresentation()
-        if pixel_repr == PixelRepresentation.UINT8:
-            image = image_reader.read8u()
-        elif pixel_repr == PixelRepresentation.UINT16:
-            image = image_reader.read16u()
-        else:
-            image = image_reader.readf()
-
         metadata.fileInfo.pixelRepresentation = pixel_repr
-        metadata = _fill_medatata(image, metadata)
+        if scale is not None or max_size is not None:
+            scale_denom, max_size = _check_scale(image_reader, scale, max_size, roi, mmap)
+            image = _read_scaled(image_path, image_reader, scale_denom, max_size, out)
+            return image, _fill_preview_metadata(metadata, image)
+        if roi is not None:
+            _check_region(image_reader, roi)
+        if out is not None:
+            assert not mmap, "out can not be used with mmap."
+            check_out(out, _image_shape(image_reader, roi), _pixel_representation_dtypes[pixel_repr])
+        if mmap:
+            mapped = map_plain_image(image_path, image_reader)
+            if mapped is not None:
+                metadata = _fill_medatata(image_reader, metadata)
+                if roi is None:
+                    return mapped, metadata
+                x, y, w, h = roi
+                return mapped[y:y + h, x:x + w], _fill_region_metadata(metadata, roi)
+        if roi is not None or out is not None:
+            # The whole image is read as a region covering it when decoding into out.
+            whole = (0, 0, image_reader.width(), image_reader.height())
+            region = _read_region(image_path, image_reader, whole if roi is None else roi, out)
+            if region is not None:
+                metadata = _fill_medatata(image_reader, metadata)
+                return region, metadata if roi is None else _fill_region_metadata(metadata, roi)
+            if roi is None:
+                image_reader.readInto(out)
+                return out, _fill_medatata(image_reader, metadata)
+
+        image, metadata = _decode(image_reader, metadata)
+        if roi is not None:
+            region = crop_image(np.array(image, copy=False), roi)
+            return region if out is None else copy_into(out, region), _fill_region_metadata(metadata, roi)
         return np.array(image, copy=False), metadata
+    except AssertionError:
+        raise
     except Exception as e:
         logging.error('Exception occurred in reading image from file {0}: {1}'.format(image_path, e))
         sys.exit("Exception caught in reading image, check the error log.")
+
+
+def read_image_bytes_cxx(data, file_name: Path, metadata=None) -> (np.array, ImageMetadata):
+    """Read an image file held in memory and return a numpy array, the bytes are decoded without being copied.
+
+    Parameters
+    ----------
+    data : bytes-like
+        content of the image file (bytes, bytearray, memoryview...)
+    file_name : Path
+        file name whose extension selects the C++ reader, the file does not need to exist
+    metadata : ImageMetadata or Path, optional
+        image metadata, or path to a sidecar file, describing raw buffers, by default None
+
+    Returns
+    -------
+    np.array
+        returned image in numpy array format
+        metadata
+    """
+    if isinstance(metadata, Path):
+        assert metadata.exists(), "Metadata file {0} not found".format(str(metadata))
+    try:
+        if isinstance(metadata, Path):
+            metadata = parser.readMetadata(str(file_name), str(metadata))
+        # The reader keeps the stream, and the stream keeps the buffer, alive.
+        image_reader = io.makeReaderFromStream(str(file_name), io.MemoryStream(data), metadata)
+        metadata = ImageMetadata() if metadata is None else metadata
+        metadata = image_reader.readMetadata(metadata)
+        metadata.fileInfo.pixelRepresentation = image_reader.pixelRepresentation()
+        image, metadata = _decode(image_reader, metadata)
+        return np.array(image, copy=False), metadata
+    except Exception as e:
+        logging.error('Exception occurred in reading image from memory as {0}: {1}'.format(file_name, e))
+        sys.exit("Exception caught in reading image, check the error log.")
+
+
+# Internal function to tell whether a band of rows of the image can be read alone: TIFF / DNG strips and tiles,
+# plain and MIPI raw rows. JPEG rows can not be decoded without the rows above them.
+def _reads_bands(image_reader):
+    return isinstance(
+        image_reader,
+        (io.TiffReader, io.DngReader, io.PlainReader, io.CfaReader, io.MipiRaw10Reader, io.MipiRaw12Reader))
+
+
+# Internal generator of the bands of rows_per_chunk rows of the image.
+def _iter_bands(image_path, image_reader, rows_per_chunk):
+    width, height = image_reader.width(), image_reader.height()
+    try:
+        for y in range(0, height, rows_per_chunk):
+            band = None
+            if _reads_bands(image_reader):
+                band = _read_region(image_path, image_reader, (0, y, width, min(rows_per_chunk, height - y)))
+            if band is None:
+                # The file is decoded as a whole, the following bands are views of it.
+                image, _ = _decode(image_reader, ImageMetadata())
+                image = np.array(image, copy=False)
+                for y_band in range(y, height, rows_per_chunk):
+                    yield image[y_band:y_band + rows_per_chunk]
+                return
+            yield band
+    except Exception as e:
+        logging.error('Exception occurred in reading rows from file {0}: {1}'.format(image_path, e))
+        sys.exit("Exception caught in reading image, check the error log.")
+
+
+def iter_rows_cxx(image_path: Path, metadata_path: Path = None, rows_per_chunk: int = 256, image_format: str = None):
+    """Read an image file by successive horizontal bands, only one band is held in memory at a time.
+
+    TIFF / DNG files decode only the strips or tiles of each band, plain, CFA and MIPI raw files read and unpack only
+    its rows. The other files (JPEG, PNG, BMP, compressed DNG...) are decoded as a whole and yielded by bands.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    metadata_path : Path, optional
+        path to sidecar file for raw file case, the API will find automatically .json next to raw file, by default None,
+    rows_per_chunk : int, optional
+        number of rows of each band, the last one may be shorter, by default 256
+    image_format : str, optional
+        format recognized in the content by sniff_image_format, the file is decoded as this format when its
+        extension is another one (e.g. a JPEG saved as .nef), by default None
+
+    Returns
+    -------
+    Iterator[np.array]
+        bands of the image, of shape (rows_per_chunk, width) or (rows_per_chunk, width, channels)
+    """
+    assert isinstance(rows_per_chunk, (int, np.integer)) and rows_per_chunk > 0, \
+        "rows_per_chunk must be a positive integer."
+    _check_paths(image_path, metadata_path)
+    try:
+        image_reader, _ = _make_reader(image_path, metadata_path, image_format)
+    except Exception as e:
+        logging.error('Exception occurred in reading rows from file {0}: {1}'.format(image_path, e))
+        sys.exit("Exception caught in reading image, check the error log.")
+    # Chroma planes of YUV 420 and NV12 are stacked below the luma plane, their rows are not rows of pixels.
+    assert image_reader.imageLayout() not in (ImageLayout.YUV_420, ImageLayout.NV12), \
+        "iter_rows is not supported for YUV 420 and NV12 images."
+    return _iter_bands(image_path, image_reader, int(rows_per_chunk))
+
+
+def probe_image_cxx(image_path: Path, metadata_path: Path = None, image_format: str = None) -> ImageMetadata:
+    """Read only the header of an image file, the pixels are not decoded.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    metadata_path : Path, optional
+        path to sidecar file for raw file case, the API will find automatically .json next to raw file, by default None,
+    image_format : str, optional
+        format recognized in the content by sniff_image_format, the file is decoded as this format when its
+        extension is another one (e.g. a JPEG saved as .nef), by default None
+
+    Returns
+    -------
+    ImageMetadata
+        metadata with fileInfo filled in as read_image_cxx does
+    """
+    _check_paths(image_path, metadata_path)
+    try:
+        image_reader, metadata = _make_reader(image_path, metadata_path, image_format)
+        metadata.fileInfo.pixelRepresentation = image_reader.pixelRepresentation()
+        # The reader exposes the same layout accessors as the decoded image.
+        return _fill_medatata(image_reader, metadata)
+    except Exception as e:
+        logging.error('Exception occurred in probing image file {0}: {1}'.format(image_path, e))
+        sys.exit("Exception caught in probing image, check the error log.")
+
+
+def map_frames_cxx(image_path: Path, metadata_path: Path = None) -> (np.memmap, ImageMetadata):
+    """Map a plain raw file made of concatenated frames of the layout described by its sidecar, see map_plain_frames.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    metadata_path : Path, optional
+        path to sidecar file, the API will find automatically .json next to raw file, by default None,
+
+    Returns
+    -------
+    np.memmap
+        read-only array of shape (frames, *frame shape) backed by the file, None when the file is not a plain file
+        or has a planar multi-channel layout
+    ImageMetadata
+        metadata of one frame, with fileInfo filled in as read_image_cxx does
+    """
+    _check_paths(image_path, metadata_path)
+    try:
+        image_reader, metadata = _make_reader(image_path, metadata_path)
+        metadata.fileInfo.pixelRepresentation = image_reader.pixelRepresentation()
+        metadata = _fill_medatata(image_reader, metadata)
+    except Exception as e:
+        logging.error('Exception occurred in reading frames from file {0}: {1}'.format(image_path, e))
+        sys.exit("Exception caught in reading image, check the error log.")
+    return map_plain_frames(image_path, image_reader), metadata
+
+
+def read_exif_cxx(image_path: Path, image_format: str = None):
+    """Read the exif data of an image file with the C++ readers (TIFF, DNG, JPEG...).
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    image_format : str, optional
+        format recognized in the content by sniff_image_format, the file is decoded as this format when its
+        extension is another one (e.g. a JPEG saved as .nef), by default None
+
+    Returns
+    -------
+    ExifMetadata
+        returned exif data
+    """
+    # By binding parser.readMetadata C++ code, we need to privode explicitely None as metadata path
+    # In the case of tif, jpg, we don't need sidecar.
+    metadata = parser.readMetadata(str(image_path), None)
+    image_reader = _open_reader(image_path, metadata, image_format)
+    return image_reader.readExif()
@@ -1,16 +1,16 @@
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 import numpy as np
 from cxx_image import (ExifMetadata, ImageLayout, ImageMetadata, Matrix3,
                        PixelRepresentation, PixelType)
-from cxx_libraw import LibRaw, LibRaw_errors
+from cxx_libraw import LibRaw, LibRaw_errors, RawBuffer, ThumbnailFormat
 
-
-# Get the color type of a pixel at (y,x) in the raw image data.
-def _raw_color(libRaw, y, x):
-    top_margin = libRaw.imgdata.sizes.top_margin
-    left_margin = libRaw.imgdata.sizes.left_margin
-    return libRaw.COLOR(y - top_margin, x - left_margin)
+from .io_cxx_image import read_image_bytes_cxx
+from .out_array import copy_into
+from .region import (bin_bayer, check_roi, crop_image, fill_binned_file_info,
+                     fill_region_file_info)
 
 
 # Convert LibRaw flip value to EXIF orientation value.
@@ -19,49 +19,30 @@ def _libraw_flip_to_exif_orientation(flip):
     return conv_dict[flip]
 
 
+# Internal cache of the pixel type per filters bitmask and color description, which give the same CFA for every file.
+_pixel_type_cache = {}
+
+
 def _parse_pixelType(libRaw):
     """
-    Parse the 2×2 Bayer pattern from libRaw object and return the 2×2 pattern.
+    Get the pixel type of the raw data with margins from the libRaw object, PixelType.CUSTOM for a non RGB CFA.
 
-    Only 2×2 Bayer CFA patterns are supported.
+    Only 2×2 Bayer CFA patterns are supported. The pattern is decoded from the filters bitmask by the binding, once
+    per filters and color description.
     """
-
-    filters = libRaw.imgdata.idata.filters
+    idata = libRaw.imgdata.idata
+    filters = idata.filters
 
     # Only support 2×2 Bayer filters encoded by libraw (filters >= 1000)
     if filters < 1000:
         raise NotImplementedError(f"Only 2×2 Bayer CFA is supported. libraw filters={filters}")
 
-    # libraw encodes 2×2 pattern by a 4×4 repeating block
-    n = 4
-    pattern = np.empty((n, n), dtype=np.uint8)
-
-    for y in range(n):
-        for x in range(n):
-            pattern[y, x] = _raw_color(libRaw, y, x)
-
-    # Reduce 4×4 repeating pattern → 2×2 CFA pattern
-    top_left = pattern[:2, :2]
-
-    if not (np.all(top_left == pattern[:2, 2:]) and np.all(top_left == pattern[2:, :2])
-            and np.all(top_left == pattern[2:, 2:])):
-        raise ValueError("Invalid 4×4 Bayer pattern; sub-blocks are inconsistent.")
-
-    return top_left
-
-
-# Internal function to convert 2x2 bayer pattern to PixelType
-def _bayer_pattern_to_pixel_type(pattern):
-    patterns = {
-        PixelType.BAYER_RGGB: np.array([[0, 1], [3, 2]]),
-        PixelType.BAYER_BGGR: np.array([[2, 3], [1, 0]]),
-        PixelType.BAYER_GBRG: np.array([[3, 2], [0, 1]]),
-        PixelType.BAYER_GRBG: np.array([[1, 0], [2, 3]]),
-    }
-    for key, value in patterns.items():
-        if np.array_equal(pattern, value):
-            return key
-    raise ValueError("Invalid Bayer pattern")
+    key = (filters, idata.cdesc)
+    pixel_type = _pixel_type_cache.get(key)
+    if pixel_type is None:
+        # ValueError for a 4×4 pattern which is not a 2×2 one.
+        pixel_type = _pixel_type_cache[key] = libRaw.bayer_pattern()
+    return pixel_type
 
 
 # Internal fill metadata fileInfo function
@@ -79,11 +60,7 @@ def _fill_file_info(libRaw, metadata):
     metadata.fileInfo.pixelPrecision = libRaw.imgdata.color.raw_bps
     metadata.fileInfo.imageLayout = ImageLayout.PLANAR
 
-    raw_pattern = _parse_pixelType(libRaw)
-    if raw_pattern.shape == (2, 2) and libRaw.imgdata.idata.cdesc in ('RGBG', 'GRBG', 'BGGR', 'RGGB'):
-        metadata.fileInfo.pixelType = _bayer_pattern_to_pixel_type(raw_pattern)
-    else:
-        metadata.fileInfo.pixelType = PixelType.CUSTOM
+    metadata.fileInfo.pixelType = _parse_pixelType(libRaw)
 
     return metadata
 
@@ -143,14 +120,17 @@ def _fill_exif_metadata(libRaw, metadata):
     return metadata
 
 
+# Internal function to get the LibRawParameters of the raw data sizes.
+def _libraw_parameters(libRaw):
+    sizes = libRaw.imgdata.rawdata.sizes
+    return LibRawParameters(sizes.raw_width, sizes.raw_height, sizes.width, sizes.height, sizes.top_margin,
+                            sizes.left_margin)
+
+
 # Convert LibRawdata to Metadata object.
 def _convert_LibRawdata_to_Metadata(libRaw):
     assert isinstance(libRaw, LibRaw), "libRaw must be LibRaw type."
-    libRawParameters = LibRawParameters(libRaw.imgdata.rawdata.sizes.raw_width,
-                                        libRaw.imgdata.rawdata.sizes.raw_height, libRaw.imgdata.rawdata.sizes.width,
-                                        libRaw.imgdata.rawdata.sizes.height, libRaw.imgdata.rawdata.sizes.top_margin,
-                                        libRaw.imgdata.rawdata.sizes.left_margin)
-    metadata = Metadata(libRawParameters)
+    metadata = Metadata(_libraw_parameters(libRaw))
 
     metadata = _fill_file_info(libRaw, metadata)
 
@@ -161,6 +141,16 @@ def _convert_LibRawdata_to_Metadata(libRaw):
     return metadata
 
 
+# Internal function to build the metadata known from the header only: fileInfo and exif data. The calibration data
+# is left unset, LibRaw computes the black level of many formats from the masked pixels during unpack.
+def _convert_header_to_Metadata(libRaw):
+    metadata = Metadata(_libraw_parameters(libRaw))
+
+    metadata = _fill_file_info(libRaw, metadata)
+
+    return _fill_exif_metadata(libRaw, metadata)
+
+
 class Metadata(ImageMetadata):
     def __init__(self, LibRawParameters):
         super().__init__()
@@ -211,7 +201,38 @@ class UnSupportedFileException(Exception):
         super().__init__(message)
 
 
-def read_image_libraw(image_path: Path) -> (np.array, Metadata):
+# Internal function to open the file with a new processor, unless a processor already opened on it is given.
+def _open_processor(image_path, processor):
+    if processor is not None:
+        return processor
+    processor = LibRaw()
+    ret_open = processor.open_file(str(image_path))
+    if ret_open != LibRaw_errors.LIBRAW_SUCCESS:
+        raise UnSupportedFileException('Unsupported libRaw file type.')
+    return processor
+
+
+# Internal function to get the area (x, y, w, h) of the raw data with margin to return.
+def _raw_area(sizes, roi, visible):
+    if visible:
+        area = (sizes.left_margin, sizes.top_margin, sizes.width, sizes.height)
+    else:
+        area = (0, 0, sizes.raw_width, sizes.raw_height)
+    if roi is None:
+        return area
+    # roi is relative to the area returned without it.
+    check_roi(roi, area[2], area[3])
+    x, y, w, h = roi
+    return area[0] + x, area[1] + y, w, h
+
+
+def read_image_libraw(image_path: Path,
+                      processor: LibRaw = None,
+                      roi: tuple = None,
+                      out: np.ndarray = None,
+                      crop: str = None,
+                      compact: bool = False,
+                      binning: int = None) -> (np.array, Metadata):
     """Read different types of raw files and return a numpy array,
        Supported image types: all the support file type by libraw
 
@@ -219,19 +240,224 @@ def read_image_libraw(image_path: Path) -> (np.array, Metadata):
     ----------
     image_path : Path
         path to image file
+    processor : LibRaw, optional
+        processor on which open_file already succeeded for image_path, it is used instead of opening the file again,
+        by default None
+    roi : tuple, optional
+        region of interest (x, y, w, h) in pixels of the raw data with margin, or of the visible area with crop or
+        compact, only this region is returned, by default None. The raw data is unpacked as a whole and cropped.
+    out : np.ndarray, optional
+        writeable C-contiguous array with the shape and the dtype of the returned image, the raw data is copied into
+        it, by default None
+    crop : str, optional
+        'visible' to return a view of the visible area of the raw data, without the margins given by
+        metadata.libRawParameters, by default None. The view is not copied and keeps the whole raw data alive.
+    compact : bool, optional
+        copy the visible area (or the roi in it) and free the raw data of LibRaw, so that the margins are not kept
+        in memory with the image, by default False
+    binning : int, optional
+        average binning x binning pixels of each CFA channel of the returned area, which gives the (4, h, w) planes of
+        the channels, see bin_bayer. This is a NumPy fallback after unpack: the peak memory holds the whole raw data
+        and the planes, then the raw data of LibRaw is freed as with compact and only the planes are kept,
+        by default None
 
     Returns
     -------
     np.array
-        returned image in numpy array format
+        returned image in numpy array format, out when given
+        metadata, with fileInfo width, height and bayer pixelType of the returned area, the size of a plane and the
+        PLANAR layout with binning
 
     """
-    iProcessor = LibRaw()
-    ret_open = iProcessor.open_file(str(image_path))
+    assert crop in (None, 'visible'), "crop must be None or 'visible'."
+    iProcessor = _open_processor(image_path, processor)
+    area = _raw_area(iProcessor.imgdata.sizes, roi, crop == 'visible' or compact)
     iProcessor.unpack()
-    if ret_open != LibRaw_errors.LIBRAW_SUCCESS:
-        raise UnSupportedFileException('Unsupported libRaw file type.')
     raw_with_margin = np.array(iProcessor.imgdata.rawdata, copy=False)
 
     metadata = _convert_LibRawdata_to_Metadata(iProcessor)
-    return raw_with_margin, metadata
+    if area != (0, 0, raw_with_margin.shape[1], raw_with_margin.shape[0]):
+        fill_region_file_info(metadata.fileInfo, area)
+    x, y, w, h = area
+    image = raw_with_margin[y:y + h, x:x + w]
+    if binning is not None:
+        # Raw data without a 2x2 bayer pattern gets a CUSTOM pixel type.
+        assert metadata.fileInfo.pixelType != PixelType.CUSTOM, "binning is only supported for bayer raw data."
+        image = bin_bayer(image, binning)
+        fill_binned_file_info(metadata.fileInfo, binning)
+    if out is not None:
+        image = copy_into(out, image)
+    elif binning is None and (roi is not None or compact):
+        image = crop_image(raw_with_margin, area)
+    if compact or binning is not None:
+        # The image no longer refers to the raw data.
+        del raw_with_margin
+        iProcessor.recycle()
+    return image, metadata
+
+
+class LibRawProcessorPool:
+    """Per-thread LibRaw processors, reused from one read to the next instead of building a new processor per file.
+
+    A processor is recycled when it is given back, which frees the raw data of the file it read: the images
+    returned by read never refer to it, they are copied out of the raw data when needed.
+    """
+    def __init__(self):
+        self._local = threading.local()
+
+    @contextmanager
+    def processor(self):
+        """Context manager lending the idle processor of the calling thread, a new one when it is already lent."""
+        processor = getattr(self._local, 'idle', None)
+        self._local.idle = None
+        if processor is None:
+            processor = LibRaw()
+        try:
+            yield processor
+        finally:
+            processor.recycle()
+            self._local.idle = processor
+
+    def read(self,
+             image_path: Path,
+             roi: tuple = None,
+             out: np.ndarray = None,
+             crop: str = None,
+             compact: bool = False,
+             binning: int = None) -> (np.array, Metadata):
+        """Read a raw file as read_image_libraw does, with a processor of the pool.
+
+        Returns
+        -------
+        np.array
+            returned image in numpy array format, which owns its pixels, out when given
+            metadata
+        """
+        with self.processor() as processor:
+            if processor.open_file(str(image_path)) != LibRaw_errors.LIBRAW_SUCCESS:
+                raise UnSupportedFileException('Unsupported libRaw file type.')
+            image, metadata = read_image_libraw(image_path,
+                                                processor,
+                                                roi=roi,
+                                                out=out,
+                                                crop=crop,
+                                                compact=compact,
+                                                binning=binning)
+            if image is not out and not image.flags.owndata:
+                # The raw data is freed when the processor is recycled.
+                image = np.array(image, copy=True)
+        return image, metadata
+
+
+def read_image_bytes_libraw(data) -> (np.array, Metadata):
+    """Read a raw file held in memory and return a numpy array, as read_image_libraw does.
+
+    Parameters
+    ----------
+    data : bytes-like
+        content of the raw file, it is not copied and stays exported (a bytearray can not be resized) as long as
+        the processor lives
+
+    Returns
+    -------
+    np.array
+        returned image in numpy array format
+    """
+    processor = LibRaw()
+    ret_open = processor.open_buffer(RawBuffer(data))
+    if ret_open != LibRaw_errors.LIBRAW_SUCCESS:
+        raise UnSupportedFileException('Unsupported libRaw file type.')
+    return read_image_libraw(None, processor)
+
+
+def probe_image_libraw(image_path: Path, processor: LibRaw = None) -> Metadata:
+    """Read only the header of a raw file, the raw data is not unpacked.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    processor : LibRaw, optional
+        processor on which open_file already succeeded for image_path, by default None
+
+    Returns
+    -------
+    Metadata
+        metadata with fileInfo and exifMetadata filled in as read_image_libraw does, calibrationData and
+        cameraControls are left unset since the black level is only known once the raw data is unpacked
+
+    """
+    iProcessor = _open_processor(image_path, processor)
+    # rawdata.sizes is only copied from the sizes parsed by open_file during unpack.
+    iProcessor.imgdata.rawdata.sizes = iProcessor.imgdata.sizes
+    return _convert_header_to_Metadata(iProcessor)
+
+
+def read_exif_libraw(image_path: Path, processor: LibRaw = None) -> ExifMetadata:
+    """Read the exif data of a raw file from its header only, the raw data is not unpacked.
+
+    Unlike probe_image_libraw, the CFA of the raw data is not parsed, so that files without a 2x2 bayer pattern
+    (X-Trans, Foveon...) have their exif data too.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    processor : LibRaw, optional
+        processor on which open_file already succeeded for image_path, by default None
+
+    Returns
+    -------
+    ExifMetadata
+        exif data filled in as read_image_libraw does
+    """
+    iProcessor = _open_processor(image_path, processor)
+    iProcessor.imgdata.rawdata.sizes = iProcessor.imgdata.sizes
+    metadata = _fill_exif_metadata(iProcessor, Metadata(_libraw_parameters(iProcessor)))
+    return metadata.exifMetadata
+
+
+# Internal Mapping from the bitmap thumbnail formats to the dtype of their samples.
+_thumbnail_bitmap_dtypes = {
+    ThumbnailFormat.LIBRAW_THUMBNAIL_BITMAP: np.uint8,
+    ThumbnailFormat.LIBRAW_THUMBNAIL_BITMAP16: np.uint16
+}
+
+
+# Internal function to convert an unpacked bitmap thumbnail to an array of theight x twidth x tcolors.
+def _thumbnail_bitmap(thumbnail):
+    image = np.frombuffer(thumbnail.data, dtype=_thumbnail_bitmap_dtypes[thumbnail.tformat])
+    return image.reshape(thumbnail.theight, thumbnail.twidth, thumbnail.tcolors)
+
+
+def read_thumbnail_libraw(image_path: Path, processor: LibRaw = None, decode: bool = True):
+    """Read the thumbnail (preview) embedded in a raw file, the raw data is not unpacked.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    processor : LibRaw, optional
+        processor on which open_file already succeeded for image_path, by default None
+    decode : bool, optional
+        decode a JPEG thumbnail to a numpy array, or return the content of the JPEG file, by default True
+
+    Returns
+    -------
+    np.array or bytes
+        thumbnail in numpy array format (height x width x colors), bytes of the JPEG file when decode is False
+
+    """
+    iProcessor = _open_processor(image_path, processor)
+    ret_unpack = iProcessor.unpack_thumb()
+    if ret_unpack != LibRaw_errors.LIBRAW_SUCCESS:
+        raise UnSupportedFileException('No supported thumbnail in file {0}.'.format(image_path))
+    thumbnail = iProcessor.imgdata.thumbnail
+    if thumbnail.tformat in _thumbnail_bitmap_dtypes:
+        return _thumbnail_bitmap(thumbnail)
+    if thumbnail.tformat != ThumbnailFormat.LIBRAW_THUMBNAIL_JPEG:
+        raise UnSupportedFileException('Unsupported thumbnail format {0}.'.format(thumbnail.tformat))
+    if not decode:
+        return thumbnail.data
+    image, _ = read_image_bytes_cxx(thumbnail.data, Path('thumbnail.jpg'))
+    return image
@@ -0,0 +1,178 @@
+from pathlib import Path
+
+import numpy as np
+from cxx_image import ImageLayout, PixelRepresentation, PixelType, io
+
+from .mipi import _mipi_groups, _mipi_unpackers
+
+# Internal Mapping from pixel representation to the numpy dtype of the pixels stored in a plain raw file.
+_pixel_representation_dtypes = {
+    PixelRepresentation.UINT8: np.dtype('uint8'),
+    PixelRepresentation.UINT16: np.dtype('uint16'),
+    PixelRepresentation.FLOAT: np.dtype('float32')
+}
+
+# Internal size of the header of a CFA file, followed by the 16 bits little endian pixels, row by row.
+_CFA_HEADER_SIZE = 128
+
+# Internal Mapping from pixel type to the number of interleaved channels, the other types have one channel.
+_interleaved_channels = {PixelType.GRAY_ALPHA: 2, PixelType.RGB: 3, PixelType.RGBA: 4}
+
+
+# Internal function to get the shape of a plain frame as decoded by read_image_cxx, without row padding.
+# None for planar multi-channel layouts, which are not stored as decoded.
+def _plain_frame_shape(image_reader):
+    width, height = image_reader.width(), image_reader.height()
+    image_layout = image_reader.imageLayout()
+    if image_layout in (ImageLayout.YUV_420, ImageLayout.NV12):
+        # Luma and chroma planes are stacked in 3 / 2 rows.
+        return 3 * height // 2, width
+    channels = _interleaved_channels.get(image_reader.pixelType(), 1)
+    if channels > 1 and image_layout != ImageLayout.INTERLEAVED:
+        return None
+    return (height, width, channels) if channels > 1 else (height, width)
+
+
+# Internal function to map the pixels of a CFA file after its fixed size header, None when the file size does not
+# match the layout of the header.
+def _map_cfa_image(image_path, image_reader):
+    width, height = image_reader.width(), image_reader.height()
+    if image_path.stat().st_size != _CFA_HEADER_SIZE + width * height * 2:
+        return None
+    return np.memmap(image_path, dtype='<u2', mode='r', offset=_CFA_HEADER_SIZE, shape=(height, width))
+
+
+def map_plain_image(image_path: Path, image_reader: io.ImageReader) -> np.memmap:
+    """Map the pixels of a plain raw file described by a sidecar, or of a CFA file, instead of reading them.
+
+    The layout comes from the reader made on the file (from the sidecar, or from the CFA header), the array has the
+    same shape as the one decoded by read_image_cxx. Rows padded to a width alignment are mapped as well, with the
+    matching row stride.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    image_reader : io.ImageReader
+        reader made on the file by io.makeReader
+
+    Returns
+    -------
+    np.memmap
+        read-only array backed by the file, None when the file cannot be mapped (not a plain or CFA file, planar
+        multi-channel layout, or a file size which does not match the layout), to be read as usual then.
+    """
+    if isinstance(image_reader, io.CfaReader):
+        return _map_cfa_image(image_path, image_reader)
+    if not isinstance(image_reader, io.PlainReader):
+        return None
+    shape = _plain_frame_shape(image_reader)
+    if shape is None:
+        return None
+    dtype = _pixel_representation_dtypes[image_reader.pixelRepresentation()]
+    file_size = image_path.stat().st_size
+
+    if image_reader.imageLayout() in (ImageLayout.YUV_420, ImageLayout.NV12):
+        # Only unpadded files are mapped.
+        if file_size != shape[0] * shape[1] * dtype.itemsize:
+            return None
+        return np.memmap(image_path, dtype=dtype, mode='r', shape=shape)
+
+    height, row_samples = shape[0], int(np.prod(shape[1:]))
+    row_size = row_samples * dtype.itemsize
+    if height <= 0 or file_size % height or file_size // height < row_size or (file_size // height) % dtype.itemsize:
+        return None
+    rows = np.memmap(image_path, dtype=dtype, mode='r', shape=(height, file_size // height // dtype.itemsize))
+    return rows[:, :row_samples].reshape(shape)
+
+
+def map_plain_frames(image_path: Path, image_reader: io.ImageReader) -> np.memmap:
+    """Map a plain raw file made of concatenated frames of the layout described by its sidecar.
+
+    Frames are not padded, each one has the shape of the image decoded by read_image_cxx, and the file holds a whole
+    number of them.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    image_reader : io.ImageReader
+        reader made on the file by io.makeReader
+
+    Returns
+    -------
+    np.memmap
+        read-only array of shape (frames, *frame shape) backed by the file, None when the file is not a plain file
+        or has a planar multi-channel layout
+    """
+    if not isinstance(image_reader, io.PlainReader):
+        return None
+    shape = _plain_frame_shape(image_reader)
+    if shape is None:
+        return None
+    dtype = _pixel_representation_dtypes[image_reader.pixelRepresentation()]
+    frame_size = int(np.prod(shape)) * dtype.itemsize
+    file_size = image_path.stat().st_size
+    assert frame_size > 0 and file_size > 0 and file_size % frame_size == 0, \
+        "File size {0} is not a whole number of frames of {1} bytes.".format(file_size, frame_size)
+    return np.memmap(image_path, dtype=dtype, mode='r', shape=(file_size // frame_size, ) + shape)
+
+
+# Internal function to copy the pixels of a region into an array of its own, or into the caller's one.
+def _store(pixels, out):
+    if out is None:
+        return np.array(pixels)
+    np.copyto(out, pixels, casting='no')
+    return out
+
+
+# Internal Mapping from MIPI reader type name to the bit depth of its pixels.
+_mipi_reader_bits = {'MipiRaw10Reader': 10, 'MipiRaw12Reader': 12}
+
+
+def read_raw_region(image_path: Path, image_reader: io.ImageReader, roi, out: np.ndarray = None) -> np.ndarray:
+    """Read a region of interest of a plain or MIPI packed raw file described by a sidecar, or of a CFA file.
+
+    Only the rows of the region are read from the file, and for MIPI files only the pixel groups crossed by the
+    region are unpacked.
+
+    Parameters
+    ----------
+    image_path : Path
+        path to image file
+    image_reader : io.ImageReader
+        reader made on the file by io.makeReader
+    roi : tuple
+        region of interest (x, y, w, h) in pixels, inside the image
+    out : np.ndarray, optional
+        array with the shape and the dtype of the region to read the pixels into, by default None
+
+    Returns
+    -------
+    np.ndarray
+        pixels of the region (out when given), None when the file cannot be read by rows, to be decoded as a whole
+        then.
+    """
+    x, y, w, h = roi
+    if isinstance(image_reader, (io.PlainReader, io.CfaReader)):
+        mapped = map_plain_image(image_path, image_reader)
+        if mapped is None or image_reader.imageLayout() in (ImageLayout.YUV_420, ImageLayout.NV12):
+            return None
+        return _store(mapped[y:y + h, x:x + w], out)
+
+    bits = next((bits for name, bits in _mipi_reader_bits.items() if isinstance(image_reader, getattr(io, name, ()))),
+                None)
+    if bits is None:
+        return None
+    group_pixels, group_bytes = _mipi_groups[bits]
+    width, height = image_reader.width(), image_reader.height()
+    file_size = image_path.stat().st_size
+    # Rows may be padded, as for the plain files the row stride comes from the file size.
+    if width % group_pixels or file_size % height or file_size // height < width // group_pixels * group_bytes:
+        return None
+    rows = np.memmap(image_path, dtype=np.uint8, mode='r', shape=(height, file_size // height))
+    first, last = x // group_pixels, -(-(x + w) // group_pixels)
+    # Only the groups crossed by the region are copied out of the file, then unpacked by the C++ code.
+    groups = np.ascontiguousarray(rows[y:y + h, first * group_bytes:last * group_bytes])
+    pixels = _mipi_unpackers[bits](groups, (last - first) * group_pixels, h, 0)
+    return _store(pixels[:, x - first * group_pixels:x - first * group_pixels + w], out)
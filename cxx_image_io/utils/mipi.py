@@ -0,0 +1,109 @@
+import numpy as np
+from cxx_image import io
+
+# Internal Mapping from the MIPI bit depth to the number of pixels and of bytes of a packed group.
+_mipi_groups = {10: (4, 5), 12: (2, 3)}
+
+# Internal Mapping from the MIPI bit depth to the C++ unpacking function.
+_mipi_unpackers = {10: io.unpackMipiRaw10, 12: io.unpackMipiRaw12}
+
+
+# Internal function to check the size of an image to unpack, the buffer size is checked against it by the C++ code.
+def _check_unpack(data, width, height, bits):
+    assert memoryview(data).contiguous, "data must be a contiguous bytes-like object."
+    assert width > 0 and height > 0, "width and height must be positive."
+    assert width % _mipi_groups[bits][0] == 0, \
+        "MIPI RAW{0} width must be a multiple of {1}.".format(bits, _mipi_groups[bits][0])
+
+
+# Internal function to check an image to pack.
+def _check_pack(image, bits):
+    assert isinstance(image, np.ndarray) and image.ndim == 2, "image must be a 2D numpy array."
+    assert image.shape[1] % _mipi_groups[bits][0] == 0, \
+        "MIPI RAW{0} width must be a multiple of {1}.".format(bits, _mipi_groups[bits][0])
+
+
+def unpack_mipi10(data, width: int, height: int, threads: int = 0) -> np.ndarray:
+    """Unpack MIPI RAW10 data (4 pixels in 5 bytes), for example received from a socket or a capture card dump.
+
+    Parameters
+    ----------
+    data : bytes-like
+        packed rows, padded to an alignment or not, the row stride is the data size divided by height
+    width : int
+        image width in pixels, a multiple of 4
+    height : int
+        image height in pixels
+    threads : int, optional
+        number of threads unpacking bands of rows, 0 to choose from the data size, by default 0
+
+    Returns
+    -------
+    np.ndarray
+        uint16 image of shape (height, width)
+    """
+    _check_unpack(data, width, height, 10)
+    return io.unpackMipiRaw10(data, width, height, threads)
+
+
+def unpack_mipi12(data, width: int, height: int, threads: int = 0) -> np.ndarray:
+    """Unpack MIPI RAW12 data (2 pixels in 3 bytes), for example received from a socket or a capture card dump.
+
+    Parameters
+    ----------
+    data : bytes-like
+        packed rows, padded to an alignment or not, the row stride is the data size divided by height
+    width : int
+        image width in pixels, a multiple of 2
+    height : int
+        image height in pixels
+    threads : int, optional
+        number of threads unpacking bands of rows, 0 to choose from the data size, by default 0
+
+    Returns
+    -------
+    np.ndarray
+        uint16 image of shape (height, width)
+    """
+    _check_unpack(data, width, height, 12)
+    return io.unpackMipiRaw12(data, width, height, threads)
+
+
+def pack_mipi10(image: np.ndarray, threads: int = 0) -> np.ndarray:
+    """Pack an image of 10 bits values to MIPI RAW10 rows (4 pixels in 5 bytes), as written by the MIPI RAW10 writer.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        image of shape (height, width), width a multiple of 4, converted to uint16 if needed,
+        the bits above the 10 low ones are dropped
+    threads : int, optional
+        number of threads packing bands of rows, 0 to choose from the image size, by default 0
+
+    Returns
+    -------
+    np.ndarray
+        uint8 array of shape (height, width * 5 / 4), without row padding
+    """
+    _check_pack(image, 10)
+    return io.packMipiRaw10(image, threads)
+
+
+def pack_mipi12(image: np.ndarray, threads: int = 0) -> np.ndarray:
+    """Pack an image of 12 bits values to MIPI RAW12 rows (2 pixels in 3 bytes), as written by the MIPI RAW12 writer.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        image of shape (height, width), width a multiple of 2, converted to uint16 if needed,
+        the bits above the 12 low ones are dropped
+    threads : int, optional
+        number of threads packing bands of rows, 0 to choose from the image size, by default 0
+
+    Returns
+    -------
+    np.ndarray
+        uint8 array of shape (height, width * 3 / 2), without row padding
+    """
+    _check_pack(image, 12)
+    return io.packMipiRaw12(image, threads)
@@ -0,0 +1,40 @@
+import numpy as np
+
+
+def check_out(out: np.ndarray, shape: tuple, dtype: np.dtype):
+    """Check that a caller-provided array can receive an image of the given shape and dtype.
+
+    Parameters
+    ----------
+    out : np.ndarray
+        array to decode the image into
+    shape : tuple
+        shape of the image as read_image returns it
+    dtype : np.dtype
+        dtype of the image as read_image returns it
+    """
+    assert isinstance(out, np.ndarray), "out must be numpy array."
+    assert out.dtype == dtype, "out dtype {0} does not match the image dtype {1}".format(out.dtype, np.dtype(dtype))
+    assert out.shape == tuple(shape), "out shape {0} does not match the image shape {1}".format(
+        out.shape, tuple(shape))
+    assert out.flags.writeable and out.flags.c_contiguous, "out must be a writeable C-contiguous array."
+
+
+def copy_into(out: np.ndarray, image: np.ndarray) -> np.ndarray:
+    """Copy a decoded image into a caller-provided array, checked first.
+
+    Parameters
+    ----------
+    out : np.ndarray
+        array to copy the image into
+    image : np.ndarray
+        decoded image
+
+    Returns
+    -------
+    np.ndarray
+        out
+    """
+    check_out(out, image.shape, image.dtype)
+    np.copyto(out, image, casting='no')
+    return out
@@ -0,0 +1,179 @@
+import numpy as np
+from cxx_image import ImageLayout, PixelType
+
+# Internal Mapping from bayer pixel type to its 2x2 pattern, read row by row.
+_bayer_patterns = {
+    PixelType.BAYER_RGGB: 'RGGB',
+    PixelType.BAYER_BGGR: 'BGGR',
+    PixelType.BAYER_GRBG: 'GRBG',
+    PixelType.BAYER_GBRG: 'GBRG'
+}
+
+# Internal Mapping from quad bayer pixel type to the pattern of its 2x2 blocks of same color pixels.
+_quad_bayer_patterns = {
+    PixelType.QUADBAYER_RGGB: 'RGGB',
+    PixelType.QUADBAYER_BGGR: 'BGGR',
+    PixelType.QUADBAYER_GRBG: 'GRBG',
+    PixelType.QUADBAYER_GBRG: 'GBRG'
+}
+
+
+# Internal function to get the 2x2 pattern seen from the cell (dx, dy) of the pattern.
+def _shift_pattern(pattern, dx, dy):
+    rows = [pattern[:2], pattern[2:]]
+    rows = rows[dy % 2:] + rows[:dy % 2]
+    return ''.join(row[dx % 2:] + row[:dx % 2] for row in rows)
+
+
+def check_roi(roi, width: int, height: int):
+    """Check that a region of interest (x, y, w, h) is not empty and lies in an image of width x height pixels.
+
+    Parameters
+    ----------
+    roi : tuple
+        region of interest (x, y, w, h) in pixels
+    width : int
+        image width
+    height : int
+        image height
+    """
+    assert len(roi) == 4, "roi must be a tuple (x, y, w, h)."
+    x, y, w, h = roi
+    assert all(isinstance(v, (int, np.integer)) for v in roi), "roi values must be integers."
+    assert x >= 0 and y >= 0, "roi origin must not be negative."
+    assert w > 0 and h > 0, "roi must not be empty."
+    assert x + w <= width and y + h <= height, "roi {0} is outside of the image {1}x{2}".format(
+        tuple(roi), width, height)
+
+
+def shift_pixel_type(pixel_type: PixelType, x: int, y: int) -> PixelType:
+    """Get the pixel type of a region starting at (x, y) of an image.
+
+    The pattern of a bayer image changes with the parity of the region origin. A quad bayer image keeps a quad bayer
+    pattern only for an even origin, the region gets a CUSTOM pixel type otherwise.
+
+    Parameters
+    ----------
+    pixel_type : PixelType
+        pixel type of the whole image
+    x : int
+        column of the region origin
+    y : int
+        row of the region origin
+
+    Returns
+    -------
+    PixelType
+        pixel type of the region
+    """
+    if pixel_type in _bayer_patterns:
+        pattern = _shift_pattern(_bayer_patterns[pixel_type], x, y)
+        return next(key for key, value in _bayer_patterns.items() if value == pattern)
+    if pixel_type in _quad_bayer_patterns:
+        if x % 2 or y % 2:
+            return PixelType.CUSTOM
+        pattern = _shift_pattern(_quad_bayer_patterns[pixel_type], x // 2, y // 2)
+        return next(key for key, value in _quad_bayer_patterns.items() if value == pattern)
+    return pixel_type
+
+
+def crop_image(image: np.ndarray, roi) -> np.ndarray:
+    """Copy a region of interest (x, y, w, h) out of a decoded image, the full image can be released afterwards.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        decoded image of shape (h, w) or (h, w, c)
+    roi : tuple
+        region of interest (x, y, w, h) in pixels
+
+    Returns
+    -------
+    np.ndarray
+        contiguous copy of the region
+    """
+    x, y, w, h = roi
+    return np.array(image[y:y + h, x:x + w], copy=True)
+
+
+def fill_region_file_info(file_info, roi):
+    """Adjust the fileInfo of an image to a region of interest (x, y, w, h) read out of it.
+
+    Parameters
+    ----------
+    file_info : ImageMetadata.FileInfo
+        fileInfo of the whole image
+    roi : tuple
+        region of interest (x, y, w, h) in pixels
+
+    Returns
+    -------
+    ImageMetadata.FileInfo
+        the same fileInfo with the size and the pixel type of the region
+    """
+    x, y, w, h = roi
+    file_info.width = w
+    file_info.height = h
+    file_info.pixelType = shift_pixel_type(file_info.pixelType, x, y)
+    return file_info
+
+
+def bin_bayer(image: np.ndarray, binning: int) -> np.ndarray:
+    """Bin a bayer image into the planes of its 4 CFA channels: average binning x binning pixels of the same color.
+
+    The pixels of each CFA channel are averaged in blocks of 2 * binning x 2 * binning pixels of the image, the rows
+    and columns which do not fill a whole block at the bottom and on the right are dropped. The planes are in the
+    order of the pixels of a 2x2 bayer cell (top left, top right, bottom left, bottom right), e.g. R, Gr, Gb, B for
+    BAYER_RGGB.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        bayer image of shape (h, w)
+    binning : int
+        number of pixels of each channel averaged along each axis
+
+    Returns
+    -------
+    np.ndarray
+        planes of shape (4, h // (2 * binning), w // (2 * binning)), with the dtype of image
+    """
+    assert isinstance(binning, (int, np.integer)) and binning >= 1, "binning must be a positive integer."
+    assert image.ndim == 2, "binning is only supported for bayer images."
+    block = 2 * binning
+    height, width = image.shape[0] // block, image.shape[1] // block
+    assert height > 0 and width > 0, "image {0}x{1} is smaller than a {2}x{2} block.".format(
+        image.shape[1], image.shape[0], block)
+    cells = image[:height * block, :width * block].reshape(height, binning, 2, width, binning, 2)
+    if not np.issubdtype(image.dtype, np.integer):
+        means = cells.mean(axis=(1, 4), dtype=np.float64).astype(image.dtype)
+    else:
+        count = binning * binning
+        means = cells.sum(axis=(1, 4), dtype=np.uint32 if image.dtype.itemsize <= 2 else np.uint64)
+        means += count // 2
+        means //= count
+        means = means.astype(image.dtype)
+    # (height, 2, width, 2) cells to the planes of the 4 positions of the cell.
+    return np.ascontiguousarray(means.transpose(1, 3, 0, 2)).reshape(4, height, width)
+
+
+def fill_binned_file_info(file_info, binning: int):
+    """Adjust the fileInfo of a bayer image to the CFA planes binned out of it by bin_bayer.
+
+    Parameters
+    ----------
+    file_info : ImageMetadata.FileInfo
+        fileInfo of the image
+    binning : int
+        number of pixels of each channel averaged along each axis
+
+    Returns
+    -------
+    ImageMetadata.FileInfo
+        the same fileInfo with the size of a plane and the PLANAR layout, its bayer pixel type is kept and gives the
+        color of each plane
+    """
+    file_info.width = file_info.width // (2 * binning)
+    file_info.height = file_info.height // (2 * binning)
+    file_info.imageLayout = ImageLayout.PLANAR
+    return file_info
@@ -13,3 +13,8 @@ def raw_file():
 @pytest.fixture
 def jpg_file():
     return test_images_dir / 'rgb_8bit.jpg'
+
+
+@pytest.fixture
+def images_dir():
+    return test_images_dir
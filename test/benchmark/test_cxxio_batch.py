@@ -0,0 +1,37 @@
+from multiprocessing import Pool
+
+import pytest
+
+from cxx_image_io import read_image, read_images
+
+pytestmark = pytest.mark.nrt
+
+WORKERS = 4
+
+
+def _read_pixels(image_path):
+    # ImageMetadata cannot be pickled, a naive pool can only send the pixels back.
+    return read_image(image_path)[0]
+
+
+@pytest.fixture(scope='module')
+def raw_paths(images_dir):
+    return sorted(images_dir.glob('RAW_*'))
+
+
+def test_cxxio_read_raw_pool_map(benchmark, raw_paths):
+    # Baseline: every decoded image is pickled back to the parent.
+    benchmark.group = 'batch read: RAW set'
+    with Pool(WORKERS) as pool:
+        benchmark(pool.map, _read_pixels, raw_paths)
+
+
+def test_cxxio_read_raw_images_process(benchmark, raw_paths):
+    # Decoded images come back through shared memory, only their layout and metadata are pickled.
+    benchmark.group = 'batch read: RAW set'
+
+    def read_batch():
+        for result in read_images(raw_paths, workers=WORKERS, mode='process'):
+            assert result.ok, result.error
+
+    benchmark(read_batch)
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from cxx_image_io import read_image
+
+pytestmark = pytest.mark.nrt
+
+RAW_FILES = ['RAW_CANON_EOS_1DX.CR2', 'RAW_NIKON_D3X.NEF', 'RAW_PANASONIC_LX3.RW2', 'RAW_SONY_RX100.ARW']
+
+
+# Internal exposure statistic computed on the returned image, whose cost follows its number of pixels.
+def _mean_level(image_path, **options):
+    image, _ = read_image(image_path, **options)
+    return np.mean(image, dtype=np.float64)
+
+
+@pytest.mark.parametrize("binning", [None, 2, 4])
+@pytest.mark.parametrize("file_name", RAW_FILES)
+def test_cxxio_raw_binning(benchmark, images_dir, file_name, binning):
+    image_path = images_dir / file_name
+    options = {'crop': 'visible'}
+    if binning is not None:
+        options['binning'] = binning
+    benchmark.group = 'raw binning: {0}'.format(file_name)
+    benchmark.extra_info['pixels'] = read_image(image_path, **options)[0].size
+    benchmark(_mean_level, image_path, **options)
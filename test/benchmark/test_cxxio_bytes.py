@@ -0,0 +1,39 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from cxx_image_io import read_image, read_image_bytes
+
+pytestmark = pytest.mark.nrt
+
+IMAGE_FILES = [
+    'RAW_CANON_EOS_1DX.CR2', 'RAW_NIKON_D3X.NEF', 'RAW_SONY_RX100.ARW', 'bayer_12bits.dng', 'bayer_16bit.tif',
+    'gray_16bit.png', 'rgb_8bit.bmp', 'rgb_8bit.jpg', 'rgb_8bit.png', 'rgb_8bit.tif'
+]
+
+
+def _read_through_temp_file(data, suffix):
+    # What callers did before read_image_bytes: write the download to disk to read it back.
+    fd, name = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return read_image(Path(name))
+    finally:
+        os.remove(name)
+
+
+@pytest.mark.parametrize("file_name", IMAGE_FILES)
+def test_cxxio_read_bytes(benchmark, images_dir, file_name):
+    benchmark.group = 'bytes vs temp file: {0}'.format(file_name)
+    image_path = images_dir / file_name
+    benchmark(read_image_bytes, image_path.read_bytes(), image_path.suffix)
+
+
+@pytest.mark.parametrize("file_name", IMAGE_FILES)
+def test_cxxio_read_temp_file(benchmark, images_dir, file_name):
+    benchmark.group = 'bytes vs temp file: {0}'.format(file_name)
+    image_path = images_dir / file_name
+    benchmark(_read_through_temp_file, image_path.read_bytes(), image_path.suffix)
@@ -0,0 +1,33 @@
+import pytest
+
+from cxx_image_io import DiskImageCache, read_image
+
+pytestmark = pytest.mark.nrt
+
+# Internal compressed files, whose decoding dominates a training epoch.
+_epoch_images = ['RAW_CANON_EOS_1DX.CR2', 'RAW_NIKON_D3X.NEF', 'bayer_12bits.dng']
+
+
+# Internal epoch of a training, reading every image and touching its pixels.
+def _epoch(image_paths, cache):
+    for image_path in image_paths:
+        image, _ = read_image(image_path, disk_cache=cache)
+        image.sum()
+
+
+def test_cxxio_epoch_uncached(benchmark, images_dir):
+    image_paths = [images_dir / file_name for file_name in _epoch_images]
+    benchmark.group = 'disk cache: epoch of camera RAW and DNG files'
+    benchmark(_epoch, image_paths, None)
+
+
+def test_cxxio_epoch_cached(benchmark, images_dir, tmp_path):
+    # The first epoch fills the cache, the rounds only load .npy files.
+    image_paths = [images_dir / file_name for file_name in _epoch_images]
+    benchmark.group = 'disk cache: epoch of camera RAW and DNG files'
+    cache = DiskImageCache(tmp_path / 'cache', 1 << 32)
+    _epoch(image_paths, cache)
+    cache.hits = cache.misses = 0
+    benchmark(_epoch, image_paths, cache)
+    benchmark.extra_info['hit_rate'] = cache.hit_rate
+    assert cache.misses == 0
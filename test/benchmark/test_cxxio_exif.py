@@ -0,0 +1,26 @@
+import pytest
+
+from cxx_image_io import probe_image, read_exif, read_image
+
+pytestmark = pytest.mark.nrt
+
+RAW_FILES = ['RAW_CANON_EOS_1DX.CR2', 'RAW_NIKON_D3X.NEF', 'RAW_PANASONIC_LX3.RW2', 'RAW_SONY_RX100.ARW']
+
+
+@pytest.mark.parametrize("file_name", RAW_FILES)
+def test_cxxio_read_exif(benchmark, images_dir, file_name):
+    # Only the header is parsed, this should be orders of magnitude faster than the full read below.
+    benchmark.group = 'raw exif: {0}'.format(file_name)
+    benchmark(read_exif, images_dir / file_name)
+
+
+@pytest.mark.parametrize("file_name", RAW_FILES)
+def test_cxxio_probe_exif(benchmark, images_dir, file_name):
+    benchmark.group = 'raw exif: {0}'.format(file_name)
+    benchmark(lambda image_path: probe_image(image_path).exifMetadata, images_dir / file_name)
+
+
+@pytest.mark.parametrize("file_name", RAW_FILES)
+def test_cxxio_read_image_exif(benchmark, images_dir, file_name):
+    benchmark.group = 'raw exif: {0}'.format(file_name)
+    benchmark(lambda image_path: read_image(image_path)[1].exifMetadata, images_dir / file_name)
@@ -0,0 +1,24 @@
+import pytest
+
+from cxx_image_io import DecodedImageCache, read_image
+
+pytestmark = pytest.mark.nrt
+
+# Internal images reopened by a review tool, a camera RAW file and a large JPEG.
+_reviewed_images = ['RAW_CANON_EOS_1DX.CR2', 'rgb_8bit.jpg']
+
+
+@pytest.mark.parametrize('file_name', _reviewed_images)
+def test_cxxio_reopen_uncached(benchmark, images_dir, file_name):
+    benchmark.group = 'image cache: reopen {0}'.format(file_name)
+    benchmark(read_image, images_dir / file_name)
+
+
+@pytest.mark.parametrize('file_name', _reviewed_images)
+def test_cxxio_reopen_cached(benchmark, images_dir, file_name):
+    # The image is decoded once, the rounds get it from the cache.
+    benchmark.group = 'image cache: reopen {0}'.format(file_name)
+    cache = DecodedImageCache(1 << 30)
+    benchmark(read_image, images_dir / file_name, image_cache=cache)
+    benchmark.extra_info['hit_rate'] = cache.hit_rate
+    assert cache.misses == 1
@@ -0,0 +1,28 @@
+import pytest
+
+from cxx_image_io import LibRaw_errors
+from cxx_image_io.utils import io_cxx_libraw
+from cxx_image_io.utils.io_cxx_libraw import (LibRaw,
+                                              _convert_LibRawdata_to_Metadata)
+
+pytestmark = pytest.mark.nrt
+
+RAW_FILES = ['RAW_CANON_EOS_1DX.CR2', 'RAW_NIKON_D3X.NEF', 'RAW_PANASONIC_LX3.RW2', 'RAW_SONY_RX100.ARW']
+
+
+# Internal conversion with an empty pixel type cache, as for the first file of a camera.
+def _convert_uncached(processor):
+    io_cxx_libraw._pixel_type_cache.clear()
+    return _convert_LibRawdata_to_Metadata(processor)
+
+
+@pytest.mark.parametrize("cached", [False, True])
+@pytest.mark.parametrize("file_name", RAW_FILES)
+def test_cxxio_libraw_metadata(benchmark, images_dir, file_name, cached):
+    # Only the conversion of the LibRaw data to Metadata is timed, the file is opened and unpacked once.
+    processor = LibRaw()
+    assert processor.open_file(str(images_dir / file_name)) == LibRaw_errors.LIBRAW_SUCCESS
+    processor.unpack()
+    benchmark.group = 'libraw metadata: {0}'.format(file_name)
+    benchmark.extra_info['cached'] = cached
+    benchmark(_convert_LibRawdata_to_Metadata if cached else _convert_uncached, processor)
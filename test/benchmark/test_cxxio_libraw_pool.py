@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cxx_image_io import LibRawImageReader, LibRawProcessorPool
+
+pytestmark = pytest.mark.nrt
+
+# Number of decodes per benchmark round, so that the steady state dominates the first allocations.
+BATCH_SIZE = 16
+
+RAW_FILES = ['RAW_CANON_EOS_1DX.CR2', 'RAW_NIKON_D3X.NEF', 'RAW_PANASONIC_LX3.RW2', 'RAW_SONY_RX100.ARW']
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("pooled", [False, True])
+@pytest.mark.parametrize("file_name", RAW_FILES)
+def test_cxxio_libraw_pool(benchmark, images_dir, file_name, pooled, workers):
+    # Without a pool, each read builds and frees a LibRaw processor; with it, processors are recycled.
+    image_path = images_dir / file_name
+    reader = LibRawImageReader(pool=LibRawProcessorPool() if pooled else None)
+    benchmark.group = 'libraw pool: {0}, {1} workers'.format(file_name, workers)
+    benchmark.extra_info['pooled'] = pooled
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def read_batch():
+            for _ in executor.map(reader.read, [image_path] * BATCH_SIZE):
+                pass
+
+        benchmark(read_batch)
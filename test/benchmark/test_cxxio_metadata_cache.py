@@ -0,0 +1,42 @@
+import pytest
+
+from cxx_image_io import MetadataCache, probe_image, read_exif
+
+pytestmark = pytest.mark.nrt
+
+
+# Internal list of the images of the directory, the sidecar files only describe them.
+def _image_paths(images_dir):
+    return sorted(path for path in images_dir.iterdir() if path.suffix != '.json')
+
+
+# Internal scan of a collection, as a cataloguing job does.
+def _scan(image_paths, cache):
+    for image_path in image_paths:
+        probe_image(image_path, metadata_cache=cache)
+        read_exif(image_path, metadata_cache=cache)
+
+
+def test_cxxio_scan_cold(benchmark, images_dir, tmp_path):
+    # Each round starts from an empty database, every file is parsed and stored.
+    image_paths = _image_paths(images_dir)
+    benchmark.group = 'metadata cache: scan of test/images'
+    rounds = iter(range(1000))
+
+    def empty_cache():
+        return (image_paths, MetadataCache(tmp_path / 'cold_{0}.db'.format(next(rounds)))), {}
+
+    benchmark.pedantic(_scan, setup=empty_cache, rounds=10)
+
+
+def test_cxxio_scan_warm(benchmark, images_dir, tmp_path):
+    # The database is filled once, the rounds only read it back.
+    image_paths = _image_paths(images_dir)
+    benchmark.group = 'metadata cache: scan of test/images'
+    with MetadataCache(tmp_path / 'warm.db') as cache:
+        _scan(image_paths, cache)
+        cache.hits = cache.misses = 0
+        benchmark(_scan, image_paths, cache)
+        benchmark.extra_info['hits'] = cache.hits
+        benchmark.extra_info['misses'] = cache.misses
+        assert cache.misses == 0
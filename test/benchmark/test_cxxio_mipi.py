@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from cxx_image_io import pack_mipi10, pack_mipi12, unpack_mipi10, unpack_mipi12
+
+pytestmark = pytest.mark.nrt
+
+# 12 MP frame.
+WIDTH, HEIGHT = 4000, 3000
+
+
+# Pure NumPy references of the C++ code, the throughput baseline.
+def _numpy_unpack_mipi10(data, width, height):
+    groups = np.frombuffer(data, dtype=np.uint8).reshape(height, width // 4, 5).astype(np.uint16)
+    low = groups[..., 4:5] >> np.array([0, 2, 4, 6], dtype=np.uint16) & 3
+    return ((groups[..., :4] << 2) | low).reshape(height, width)
+
+
+def _numpy_unpack_mipi12(data, width, height):
+    groups = np.frombuffer(data, dtype=np.uint8).reshape(height, width // 2, 3).astype(np.uint16)
+    low = groups[..., 2:3] >> np.array([0, 4], dtype=np.uint16) & 0xF
+    return ((groups[..., :2] << 4) | low).reshape(height, width)
+
+
+def _numpy_pack_mipi10(image):
+    pixels = image.reshape(image.shape[0], -1, 4)
+    low = (pixels & 3) << np.array([0, 2, 4, 6], dtype=np.uint16)
+    packed = np.concatenate([pixels >> 2, np.bitwise_or.reduce(low, axis=-1)[..., None]], axis=-1)
+    return packed.astype(np.uint8).reshape(image.shape[0], -1)
+
+
+def _numpy_pack_mipi12(image):
+    pixels = image.reshape(image.shape[0], -1, 2)
+    low = (pixels[..., 0] & 0xF) | ((pixels[..., 1] & 0xF) << 4)
+    return np.concatenate([pixels >> 4, low[..., None]], axis=-1).astype(np.uint8).reshape(image.shape[0], -1)
+
+
+def _image(bits):
+    return np.random.default_rng(bits).integers(0, 1 << bits, (HEIGHT, WIDTH), dtype=np.uint16)
+
+
+def _report_throughput(benchmark, nbytes):
+    # Unpacked bytes processed per second.
+    benchmark.extra_info['GB/s'] = nbytes / benchmark.stats.stats.mean / 1e9
+
+
+# The C++ code runs on all the threads (0) and on one thread, against the NumPy reference.
+@pytest.mark.parametrize("bits, pack, unpack, reference", [(10, pack_mipi10, unpack_mipi10, _numpy_unpack_mipi10),
+                                                           (12, pack_mipi12, unpack_mipi12, _numpy_unpack_mipi12)])
+@pytest.mark.parametrize("implementation", ['cxx', 'cxx_1_thread', 'numpy'])
+def test_cxxio_unpack_mipi(benchmark, bits, pack, unpack, reference, implementation):
+    benchmark.group = 'unpack MIPI RAW{0}'.format(bits)
+    image = _image(bits)
+    data = pack(image).tobytes()
+    if implementation == 'numpy':
+        result = benchmark(reference, data, WIDTH, HEIGHT)
+    else:
+        result = benchmark(unpack, data, WIDTH, HEIGHT, 1 if implementation == 'cxx_1_thread' else 0)
+    _report_throughput(benchmark, image.nbytes)
+    np.testing.assert_array_equal(result, image)
+
+
+@pytest.mark.parametrize("bits, pack, reference", [(10, pack_mipi10, _numpy_pack_mipi10),
+                                                   (12, pack_mipi12, _numpy_pack_mipi12)])
+@pytest.mark.parametrize("implementation", ['cxx', 'cxx_1_thread', 'numpy'])
+def test_cxxio_pack_mipi(benchmark, bits, pack, reference, implementation):
+    benchmark.group = 'pack MIPI RAW{0}'.format(bits)
+    image = _image(bits)
+    if implementation == 'numpy':
+        result = benchmark(reference, image)
+    else:
+        result = benchmark(pack, image, 1 if implementation == 'cxx_1_thread' else 0)
+    _report_throughput(benchmark, image.nbytes)
+    np.testing.assert_array_equal(result, reference(image))
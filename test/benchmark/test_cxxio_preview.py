@@ -0,0 +1,28 @@
+import pytest
+
+from cxx_image_io import read_image
+
+pytestmark = pytest.mark.nrt
+
+# Longest side of the previews.
+PREVIEW_SIZE = 256
+
+
+def _read_preview_scaled(image_path):
+    return read_image(image_path, max_size=PREVIEW_SIZE)[0]
+
+
+def _read_preview_full_decode(image_path):
+    image = read_image(image_path)[0]
+    step = -(-max(image.shape[:2]) // PREVIEW_SIZE)
+    return image[::step, ::step].copy()
+
+
+def test_cxxio_preview_scaled(benchmark, images_dir):
+    benchmark.group = 'jpeg preview'
+    benchmark(_read_preview_scaled, images_dir / 'rgb_8bit.jpg')
+
+
+def test_cxxio_preview_full_decode(benchmark, images_dir):
+    benchmark.group = 'jpeg preview'
+    benchmark(_read_preview_full_decode, images_dir / 'rgb_8bit.jpg')
@@ -0,0 +1,25 @@
+import pytest
+
+from cxx_image_io import probe_image, read_image
+
+pytestmark = pytest.mark.nrt
+
+IMAGE_FILES = [
+    'RAW_CANON_EOS_1DX.CR2', 'RAW_KODAK_DC120.KDC', 'RAW_KODAK_DCSPRO.DCR', 'RAW_LEICA_DLUX3.RAW', 'RAW_NIKON_D3X.NEF',
+    'RAW_OLYMPUS_E3.ORF', 'RAW_PANASONIC_LX3.RW2', 'RAW_PENTAX_KX.PEF', 'RAW_SAMSUNG_NX300M.SRW', 'RAW_SONY_RX100.ARW',
+    'bayer_10bit.RAWMIPI', 'bayer_12bit.RAWMIPI12', 'bayer_12bits.dng', 'bayer_16bit.cfa', 'bayer_16bit.plain16',
+    'bayer_16bit.tif', 'gray_16bit.png', 'raw.nv12', 'raw_420.yuv', 'rgb_8bit.bmp', 'rgb_8bit.jpg', 'rgb_8bit.png',
+    'rgb_8bit.tif'
+]
+
+
+@pytest.mark.parametrize("file_name", IMAGE_FILES)
+def test_cxxio_probe(benchmark, images_dir, file_name):
+    benchmark.group = 'probe vs read: {0}'.format(file_name)
+    benchmark(probe_image, images_dir / file_name)
+
+
+@pytest.mark.parametrize("file_name", IMAGE_FILES)
+def test_cxxio_read(benchmark, images_dir, file_name):
+    benchmark.group = 'probe vs read: {0}'.format(file_name)
+    benchmark(read_image, images_dir / file_name)
@@ -0,0 +1,44 @@
+import pytest
+
+from cxx_image_io import probe_image, read_image
+
+pytestmark = pytest.mark.nrt
+
+IMAGE_FILES = [
+    'RAW_NIKON_D3X.NEF', 'bayer_10bit.RAWMIPI', 'bayer_12bit.RAWMIPI12', 'bayer_12bits.dng', 'bayer_16bit.plain16',
+    'bayer_16bit.tif', 'rgb_8bit.jpg', 'rgb_8bit.tif'
+]
+
+# Number of patches extracted per round, spread over the image.
+PATCHES = 16
+PATCH_SIZE = 32
+
+
+def _patches(image_path):
+    # Patch origins on a diagonal of the image, aligned on the bayer pattern.
+    file_info = probe_image(image_path).fileInfo
+    size_x, size_y = min(PATCH_SIZE, file_info.width), min(PATCH_SIZE, file_info.height)
+    step_x, step_y = (file_info.width - size_x) // PATCHES, (file_info.height - size_y) // PATCHES
+    return [(i * step_x & ~1, i * step_y & ~1, size_x, size_y) for i in range(PATCHES)]
+
+
+def _read_patches_roi(image_path, patches):
+    return [read_image(image_path, roi=roi)[0] for roi in patches]
+
+
+def _read_patches_full(image_path, patches):
+    return [read_image(image_path)[0][y:y + h, x:x + w].copy() for x, y, w, h in patches]
+
+
+@pytest.mark.parametrize("file_name", IMAGE_FILES)
+def test_cxxio_patches_roi(benchmark, images_dir, file_name):
+    benchmark.group = 'patch extraction: {0}'.format(file_name)
+    image_path = images_dir / file_name
+    benchmark(_read_patches_roi, image_path, _patches(image_path))
+
+
+@pytest.mark.parametrize("file_name", IMAGE_FILES)
+def test_cxxio_patches_full_decode(benchmark, images_dir, file_name):
+    benchmark.group = 'patch extraction: {0}'.format(file_name)
+    image_path = images_dir / file_name
+    benchmark(_read_patches_full, image_path, _patches(image_path))
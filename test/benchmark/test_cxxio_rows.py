@@ -0,0 +1,35 @@
+import pytest
+
+from cxx_image_io import iter_rows, read_image
+
+pytestmark = pytest.mark.nrt
+
+IMAGE_FILES = [
+    'bayer_10bit.RAWMIPI', 'bayer_12bit.RAWMIPI12', 'bayer_16bit.plain16', 'bayer_16bit.tif', 'rgb_8bit.tif'
+]
+
+ROWS_PER_CHUNK = 64
+
+
+def _mean_by_bands(image_path):
+    total, count = 0, 0
+    for band in iter_rows(image_path, rows_per_chunk=ROWS_PER_CHUNK):
+        total += band.sum(dtype='float64')
+        count += band.size
+    return total / count
+
+
+def _mean_full_decode(image_path):
+    return read_image(image_path)[0].mean(dtype='float64')
+
+
+@pytest.mark.parametrize("file_name", IMAGE_FILES)
+def test_cxxio_mean_by_bands(benchmark, images_dir, file_name):
+    benchmark.group = 'streaming mean: {0}'.format(file_name)
+    benchmark(_mean_by_bands, images_dir / file_name)
+
+
+@pytest.mark.parametrize("file_name", IMAGE_FILES)
+def test_cxxio_mean_full_decode(benchmark, images_dir, file_name):
+    benchmark.group = 'streaming mean: {0}'.format(file_name)
+    benchmark(_mean_full_decode, images_dir / file_name)
@@ -0,0 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cxx_image_io import read_image
+
+pytestmark = pytest.mark.nrt
+
+# Number of decodes per benchmark round, large enough to keep every worker busy.
+BATCH_SIZE = 16
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+@pytest.mark.parametrize(
+    "file_name", ['rgb_8bit.jpg', 'rgb_8bit.tif', 'bayer_12bits.dng', 'RAW_CANON_EOS_1DX.CR2', 'RAW_NIKON_D3X.NEF'])
+def test_cxxio_read_threads(benchmark, images_dir, file_name, workers):
+    # Decoders release the GIL, so the round time should shrink almost linearly with workers.
+    image_path = images_dir / file_name
+    benchmark.group = 'read_image threads: {0}'.format(file_name)
+    benchmark.extra_info['workers'] = workers
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def read_batch():
+            for _ in executor.map(read_image, [image_path] * BATCH_SIZE):
+                pass
+
+        benchmark(read_batch)
@@ -0,0 +1,38 @@
+import pytest
+
+from cxx_image_io import UnSupportedFileException, read_image, read_thumbnail
+
+pytestmark = pytest.mark.nrt
+
+RAW_FILES = [
+    'RAW_CANON_EOS_1DX.CR2', 'RAW_KODAK_DC120.KDC', 'RAW_KODAK_DCSPRO.DCR', 'RAW_LEICA_DLUX3.RAW', 'RAW_NIKON_D3X.NEF',
+    'RAW_OLYMPUS_E3.ORF', 'RAW_PANASONIC_LX3.RW2', 'RAW_PENTAX_KX.PEF', 'RAW_SAMSUNG_NX300M.SRW', 'RAW_SONY_RX100.ARW'
+]
+
+
+def _raw_path(images_dir, file_name):
+    # Some old camera formats do not embed any preview.
+    image_path = images_dir / file_name
+    try:
+        read_thumbnail(image_path, decode=False)
+    except UnSupportedFileException:
+        pytest.skip('no embedded thumbnail in {0}'.format(file_name))
+    return image_path
+
+
+@pytest.mark.parametrize("file_name", RAW_FILES)
+def test_cxxio_thumbnail(benchmark, images_dir, file_name):
+    benchmark.group = 'raw preview: {0}'.format(file_name)
+    benchmark(read_thumbnail, _raw_path(images_dir, file_name))
+
+
+@pytest.mark.parametrize("file_name", RAW_FILES)
+def test_cxxio_thumbnail_bytes(benchmark, images_dir, file_name):
+    benchmark.group = 'raw preview: {0}'.format(file_name)
+    benchmark(read_thumbnail, _raw_path(images_dir, file_name), False)
+
+
+@pytest.mark.parametrize("file_name", RAW_FILES)
+def test_cxxio_raw_unpack(benchmark, images_dir, file_name):
+    benchmark.group = 'raw preview: {0}'.format(file_name)
+    benchmark(read_image, images_dir / file_name)
@@ -0,0 +1,39 @@
+import shutil
+
+import pytest
+
+from cxx_image_io import read_image
+from cxx_image_io.reader.factory import ImageReaderFactory
+
+pytestmark = pytest.mark.nrt
+
+RAW_FILES = [
+    'RAW_CANON_EOS_1DX.CR2', 'RAW_KODAK_DC120.KDC', 'RAW_KODAK_DCSPRO.DCR', 'RAW_LEICA_DLUX3.RAW', 'RAW_NIKON_D3X.NEF',
+    'RAW_OLYMPUS_E3.ORF', 'RAW_PANASONIC_LX3.RW2', 'RAW_PENTAX_KX.PEF', 'RAW_SAMSUNG_NX300M.SRW', 'RAW_SONY_RX100.ARW'
+]
+
+
+@pytest.fixture(scope='module')
+def unknown_ext_dir(images_dir, tmp_path_factory):
+    # Same RAW files without an extension known by any reader, so routing relies on the file content.
+    output_dir = tmp_path_factory.mktemp('unknown_ext')
+    for file_name in RAW_FILES:
+        shutil.copy(images_dir / file_name, output_dir / (file_name + '.unknown'))
+    return output_dir
+
+
+@pytest.mark.parametrize("reuse_processor", [False, True])
+@pytest.mark.parametrize("file_name", RAW_FILES)
+def test_cxxio_read_unknown_ext(benchmark, monkeypatch, unknown_ext_dir, file_name, reuse_processor):
+    # Routing of a new file followed by its decoding, the processor opened to route it is reused or not.
+    image_path = unknown_ext_dir / (file_name + '.unknown')
+    benchmark.group = 'read unknown extension: {0}'.format(file_name)
+    benchmark.extra_info['reuse_processor'] = reuse_processor
+    if not reuse_processor:
+        monkeypatch.setattr(ImageReaderFactory.LIBRAW_READER, 'MAX_OPENED', 0)
+
+    def read_new_file():
+        ImageReaderFactory._select_reader_cached.cache_clear()
+        return read_image(image_path)
+
+    benchmark(read_new_file)
@@ -46,6 +46,18 @@ def test_read_only_exif(test_images_dir, case):
     compare_exif_values(exif, case.exif)
 
 
+@pytest.mark.parametrize('case', [case for case in TEST_CASES if case.exif and case.file.startswith('RAW_')])
+def test_read_only_exif_camera_raw(test_images_dir, case):
+    # Given a camera RAW file (CR2, NEF, ARW...), which the C++ readers do not support.
+    image_path = test_images_dir / case.file
+
+    # When the EXIF metadata is read using the read_exif API, from the file header only.
+    exif = read_exif(image_path)
+
+    # Then the returned EXIF metadata should match the expected values, as read_image returns them.
+    compare_exif_values(exif, case.exif)
+
+
 def test_read_only_exif_error_handling(test_images_dir):
     #  Given a non-existing image file.
     image_path = test_images_dir / 'non_existing_file.jpg'
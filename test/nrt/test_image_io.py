@@ -1,3 +1,4 @@
+import gc
 import platform
 import shutil
 from pathlib import Path
@@ -6,9 +7,11 @@ from unittest.mock import MagicMock, patch
 import numpy as np
 import pytest
 
-from cxx_image_io import (ImageMetadata, ImageWriter, LibRaw_errors, Matrix3,
-                          UnSupportedFileException, read_image,
-                          read_image_libraw, write_image)
+from cxx_image_io import (FrameSequence, ImageMetadata, ImageWriter, LibRaw,
+                          LibRaw_errors, Matrix3, RawBuffer,
+                          UnSupportedFileException, probe_image, read_image,
+                          read_image_bytes, read_image_libraw, write_image)
+from cxx_image_io.utils.region import bin_bayer
 
 from .data_cases import TEST_CASES
 from .helpers import (PSNR_THRESHOLD, get_file_hash, get_image_hash, is_musl,
@@ -47,6 +50,272 @@ def test_read_image(test_images_dir, case):
     assert ref_hash == hash
 
 
+@pytest.mark.parametrize("case", TEST_CASES)
+def test_probe_image(test_images_dir, case):
+    # Given: an existing image file
+    image_path = test_images_dir / case.file
+
+    # When: the header is probed and the full image is read
+    probed = probe_image(image_path)
+    image, metadata = read_image(image_path)
+
+    # Then: probe_image returns the same fileInfo as read_image without decoding the pixels
+    assert probed.fileInfo.serialize() == metadata.fileInfo.serialize()
+
+
+@pytest.mark.parametrize("case", [case for case in TEST_CASES if case.file.startswith('RAW_')])
+def test_probe_image_camera_raw_header_only(test_images_dir, case):
+    # Given: a camera RAW file
+    image_path = test_images_dir / case.file
+
+    # When: the header is probed and the full image is read
+    probed = probe_image(image_path)
+    _, metadata = read_image(image_path)
+
+    # Then: fileInfo and exif data are the ones of read_image, the calibration data is left to read_image,
+    # LibRaw computes the black level of many formats while unpacking
+    assert probed.fileInfo.serialize() == metadata.fileInfo.serialize()
+    assert probed.exifMetadata.serialize() == metadata.exifMetadata.serialize()
+    assert probed.calibrationData.blackLevel is None and probed.calibrationData.whiteLevel is None
+    assert probed.serialize()['calibrationData'] == {}
+    assert metadata.calibrationData.blackLevel is not None
+
+
+@pytest.mark.parametrize("case", [case for case in TEST_CASES if case.name in ('raw', 'yuv', 'nv12', 'cfa', 'jpg')])
+def test_read_image_mmap(test_images_dir, case):
+    # Given: an existing image file
+    image_path = test_images_dir / case.file
+
+    # When: the image is read with and without mmap
+    mapped, mapped_metadata = read_image(image_path, mmap=True)
+    image, metadata = read_image(image_path)
+
+    # Then: plain files are mapped read-only, other files are read as usual, with the same pixels and fileInfo
+    assert isinstance(mapped, np.memmap) == (case.name != 'jpg')
+    np.testing.assert_array_equal(mapped, image)
+    assert mapped_metadata.fileInfo.serialize() == metadata.fileInfo.serialize()
+
+
+@pytest.mark.parametrize("case", [case for case in TEST_CASES if case.name not in ('yuv', 'nv12')])
+@pytest.mark.parametrize("roi", [(0, 0, 16, 8), (3, 5, 17, 9)])
+def test_read_image_roi(test_images_dir, case, roi):
+    # Given: an existing image file
+    image_path = test_images_dir / case.file
+
+    # When: a region is read, and the full image is read
+    region, region_metadata = read_image(image_path, roi=roi)
+    image, metadata = read_image(image_path)
+
+    # Then: the region has the pixels of the full image and the fileInfo of the region
+    x, y, w, h = roi
+    np.testing.assert_array_equal(region, image[y:y + h, x:x + w])
+    assert region.dtype == image.dtype
+    assert (region_metadata.fileInfo.width, region_metadata.fileInfo.height) == (w, h)
+    assert region_metadata.fileInfo.pixelPrecision == metadata.fileInfo.pixelPrecision
+
+
+@pytest.mark.parametrize("case", TEST_CASES)
+def test_read_image_out(test_images_dir, case):
+    # Given: an existing image file, and an array preallocated from its probed information
+    image_path = test_images_dir / case.file
+    image, metadata = read_image(image_path)
+    out = np.zeros_like(image, order='C')
+
+    # When: the image is read into the preallocated array
+    result, result_metadata = read_image(image_path, out=out)
+
+    # Then: the preallocated array is returned with the pixels and the metadata of read_image
+    assert result is out
+    np.testing.assert_array_equal(out, image)
+    assert result_metadata.fileInfo.serialize() == metadata.fileInfo.serialize()
+
+
+def test_read_image_out_mismatch(test_images_dir):
+    # Given: an array which does not have the dtype of the image
+    image_path = test_images_dir / 'rgb_8bit.jpg'
+    image, _ = read_image(image_path)
+
+    # When / Then: it is rejected before decoding
+    with pytest.raises(AssertionError, match="out dtype"):
+        read_image(image_path, out=np.zeros(image.shape, dtype=np.uint16))
+
+
+@pytest.mark.parametrize("case", TEST_CASES)
+def test_read_image_lazy(test_images_dir, case):
+    # Given: an existing image file, and its sidecar if any
+    image_path = test_images_dir / case.file
+    image, metadata = read_image(image_path)
+
+    # When: the image is read lazily
+    lazy, lazy_metadata = read_image(image_path, lazy=True)
+
+    # Then: the metadata is the one of read_image before decoding, and the pixels are the same once decoded
+    assert not lazy.decoded
+    assert lazy_metadata.fileInfo.serialize() == metadata.fileInfo.serialize()
+    np.testing.assert_array_equal(np.asarray(lazy), image)
+
+
+@pytest.mark.parametrize("file_name, sidecar_name", [('raw.nv12', 'raw.json'), ('raw_420.yuv', 'raw_420.json'),
+                                                     ('bayer_16bit.plain16', 'bayer_16bit.json')])
+def test_frame_sequence(test_images_dir, tmp_path, file_name, sidecar_name):
+    # Given: a dump of 3 copies of a plain raw file, with the sidecar of one frame
+    image_path = test_images_dir / file_name
+    image, metadata = read_image(image_path, test_images_dir / sidecar_name)
+    dump_path = tmp_path / file_name
+    dump_path.write_bytes(image_path.read_bytes() * 3)
+
+    # When: the dump is opened as a frame sequence
+    frames = FrameSequence(dump_path, test_images_dir / sidecar_name)
+
+    # Then: each frame is the image read_image returns, with the same metadata
+    assert len(frames) == 3
+    for frame in (frames[0], frames[-1]):
+        np.testing.assert_array_equal(frame, image)
+    assert frames[1:].shape == (2, ) + image.shape
+    assert frames.metadata.fileInfo.serialize() == metadata.fileInfo.serialize()
+
+
+@pytest.mark.parametrize("file_name, copy_name", [('rgb_8bit.jpg', 'photo.nef'), ('rgb_8bit.png', 'photo.dat'),
+                                                  ('bayer_12bits.dng', 'x.raw'), ('rgb_8bit.bmp', 'photo')])
+def test_read_image_wrong_extension(test_images_dir, tmp_path, file_name, copy_name):
+    # Given: an image file copied under the extension of another format, or none
+    image_path = test_images_dir / file_name
+    copy_path = tmp_path / copy_name
+    shutil.copyfile(image_path, copy_path)
+    image, metadata = read_image(image_path)
+
+    # When: the copy is probed and read
+    probed = probe_image(copy_path)
+    copy, copy_metadata = read_image(copy_path)
+
+    # Then: it is decoded as the format of its content
+    np.testing.assert_array_equal(copy, image)
+    assert copy_metadata.fileInfo.serialize() == metadata.fileInfo.serialize()
+    assert (probed.fileInfo.width, probed.fileInfo.height) == (metadata.fileInfo.width, metadata.fileInfo.height)
+
+
+@pytest.mark.parametrize("file_name", ['RAW_NIKON_D3X.NEF', 'RAW_CANON_EOS_1DX.CR2', 'RAW_SONY_RX100.ARW'])
+def test_read_image_raw_visible(test_images_dir, file_name):
+    # Given: a camera RAW file, and its raw data with margins
+    image_path = test_images_dir / file_name
+    raw, metadata = read_image(image_path)
+    params = metadata.libRawParameters
+    top, left = params.topMargin, params.leftMargin
+    visible = raw[top:top + params.rawHeightVisible, left:left + params.rawWidthVisible]
+
+    # When: the visible area is read as a view, and as a compact copy
+    view, view_metadata = read_image(image_path, crop='visible')
+    compact, compact_metadata = read_image(image_path, compact=True)
+
+    # Then: both are the raw data without margins, described by their fileInfo
+    np.testing.assert_array_equal(view, visible)
+    np.testing.assert_array_equal(compact, visible)
+    assert compact.flags.owndata
+    for file_info in (view_metadata.fileInfo, compact_metadata.fileInfo):
+        assert (file_info.width, file_info.height) == (params.rawWidthVisible, params.rawHeightVisible)
+
+
+@pytest.mark.parametrize("file_name", ['RAW_NIKON_D3X.NEF', 'RAW_CANON_EOS_1DX.CR2', 'RAW_SONY_RX100.ARW'])
+def test_read_image_raw_binning(test_images_dir, file_name):
+    # Given: a camera RAW file, and its visible area
+    image_path = test_images_dir / file_name
+    visible, metadata = read_image(image_path, crop='visible')
+
+    # When: the visible area is read binned
+    binned, binned_metadata = read_image(image_path, crop='visible', binning=2)
+
+    # Then: it is the planes of the CFA channels of the visible area averaged in 2x2, in the order of its bayer pattern
+    np.testing.assert_array_equal(binned, bin_bayer(visible, 2))
+    assert binned.shape[0] == 4 and binned.size * 4 <= visible.size
+    file_info = binned_metadata.fileInfo
+    assert (file_info.width, file_info.height) == (binned.shape[2], binned.shape[1])
+    assert file_info.pixelType == metadata.fileInfo.pixelType
+
+
+@pytest.mark.parametrize("scale", [1, 1 / 2, 1 / 4, 1 / 8])
+def test_read_image_jpeg_scale(test_images_dir, scale):
+    # Given: a JPEG file
+    image_path = test_images_dir / 'rgb_8bit.jpg'
+    image, _ = read_image(image_path)
+
+    # When: the image is decoded downscaled
+    scaled, metadata = read_image(image_path, scale=scale)
+
+    # Then: the image size is rounded up, and the fileInfo describes the downscaled image
+    denom = round(1 / scale)
+    height, width = -(-image.shape[0] // denom), -(-image.shape[1] // denom)
+    assert scaled.shape == (height, width, 3)
+    assert scaled.dtype == np.uint8
+    assert (metadata.fileInfo.width, metadata.fileInfo.height) == (width, height)
+    if scale == 1:
+        np.testing.assert_array_equal(scaled, image)
+
+
+def test_read_image_jpeg_max_size(test_images_dir):
+    # Given: a JPEG file, and a maximal size of a quarter of its longest side
+    image_path = test_images_dir / 'rgb_8bit.jpg'
+    image, _ = read_image(image_path)
+    max_size = -(-max(image.shape[:2]) // 4)
+
+    # When: the image is decoded within the maximal size
+    scaled, _ = read_image(image_path, max_size=max_size)
+
+    # Then: the image is downscaled by 1/4, the smallest downscale fitting in the maximal size
+    assert scaled.shape == read_image(image_path, scale=1 / 4)[0].shape
+
+
+def test_read_image_scale_unsupported(test_images_dir):
+    # Given: a PNG file and a JPEG file
+    # When / Then: a downscale is rejected for the PNG file, and a factor libjpeg does not support for the JPEG file
+    with pytest.raises(AssertionError, match="only supported for JPEG and DNG"):
+        read_image(test_images_dir / 'rgb_8bit.png', scale=1 / 2)
+    with pytest.raises(AssertionError, match="scale must be"):
+        read_image(test_images_dir / 'rgb_8bit.jpg', scale=1 / 3)
+
+
+@pytest.mark.parametrize("case", [case for case in TEST_CASES if case.name in ('yuv', 'nv12')])
+def test_read_image_roi_yuv(test_images_dir, case):
+    # Given: a YUV 420 image file
+    image_path = test_images_dir / case.file
+
+    # When / Then: a region is rejected, chroma planes are stacked below the luma plane
+    with pytest.raises(AssertionError, match="roi is not supported"):
+        read_image(image_path, roi=(0, 0, 8, 8))
+
+
+@pytest.mark.parametrize("case", TEST_CASES)
+def test_read_image_bytes(test_images_dir, case):
+    # Given: the content of an image file held in memory, and its sidecar if any
+    image_path = test_images_dir / case.file
+    sidecar_path = image_path.with_suffix('.json')
+    data = image_path.read_bytes()
+
+    # When: the content is read, with the file extension as hint
+    image, metadata = read_image_bytes(data, image_path.suffix, sidecar_path if sidecar_path.exists() else None)
+
+    # Then: it gives the pixels and the fileInfo of the file
+    ref_image, ref_metadata = read_image(image_path)
+    np.testing.assert_array_equal(image, ref_image)
+    assert metadata.fileInfo.serialize() == ref_metadata.fileInfo.serialize()
+
+
+def test_libraw_open_buffer_keeps_buffer_exported(test_images_dir):
+    # Given: a camera RAW file held in a bytearray, opened by a LibRaw processor
+    data = bytearray((test_images_dir / 'RAW_CANON_EOS_1DX.CR2').read_bytes())
+    processor = LibRaw()
+    assert processor.open_buffer(RawBuffer(data)) == LibRaw_errors.LIBRAW_SUCCESS
+
+    # When / Then: the bytearray can not be resized while the processor may read it
+    with pytest.raises(BufferError):
+        data.extend(b'0')
+    assert processor.unpack() == LibRaw_errors.LIBRAW_SUCCESS
+
+    # When / Then: it can once the processor is released
+    del processor
+    gc.collect()
+    data.extend(b'0')
+
+
 def test_read_image_with_non_existing_file(test_images_dir):
     # Given: a non-existing image file
     image_path = test_images_dir / 'non_existing_file.jpg'
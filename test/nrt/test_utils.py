@@ -2,7 +2,8 @@ import numpy as np
 import pytest
 
 from cxx_image_io import (ImageMetadata, PixelType, merge_image_channels,
-                          read_image, split_image_channels)
+                          pack_mipi10, pack_mipi12, read_image,
+                          split_image_channels, unpack_mipi10, unpack_mipi12)
 
 from .data_cases import TEST_CASES, TEST_CHANNELS_CASES
 
@@ -79,3 +80,34 @@ def test_split_and_merge_images(test_images_dir, case):
     image_post = merge_image_channels(channels, metadata)
 
     np.array_equal(image, image_post)
+
+
+@pytest.mark.parametrize("file_name, unpack", [('bayer_10bit.RAWMIPI', unpack_mipi10),
+                                               ('bayer_12bit.RAWMIPI12', unpack_mipi12)])
+def test_unpack_mipi_file_content(test_images_dir, file_name, unpack):
+    # Given: a MIPI packed file and the image read from it
+    image_path = test_images_dir / file_name
+    image, metadata = read_image(image_path)
+
+    # When: the content of the file is unpacked
+    unpacked = unpack(image_path.read_bytes(), metadata.fileInfo.width, metadata.fileInfo.height)
+
+    # Then: it is the image read by the MIPI reader
+    np.testing.assert_array_equal(unpacked, image)
+
+
+@pytest.mark.parametrize("bits, pack, unpack, group", [(10, pack_mipi10, unpack_mipi10, (4, 5)),
+                                                       (12, pack_mipi12, unpack_mipi12, (2, 3))])
+@pytest.mark.parametrize("threads", [0, 1, 3])
+def test_pack_and_unpack_mipi(bits, pack, unpack, group, threads):
+    # Given: an image of values on the MIPI bit depth
+    image = np.random.default_rng(bits).integers(0, 1 << bits, (37, 64), dtype=np.uint16)
+
+    # When: it is packed, then unpacked from rows padded to 128 bytes
+    packed = pack(image, threads)
+    padded = np.pad(packed, ((0, 0), (0, 128 - packed.shape[1])))
+    unpacked = unpack(padded.tobytes(), 64, 37, threads)
+
+    # Then: the packed rows have the MIPI size, and unpacking gives the image back
+    assert packed.shape == (37, 64 // group[0] * group[1])
+    np.testing.assert_array_equal(unpacked, image)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from cxx_image_io import ImageMetadata, PixelType
+
+
+class DecodeCountingReader:
+    # Reader stand-in recording the decodes, its images are 10 x 10 bayer pixels of dtype.
+    def __init__(self, dtype=np.uint8):
+        self.dtype = dtype
+        self.reads = []
+
+    def read(self, image_path, metadata_path=None, **options):
+        self.reads.append((image_path.name, options))
+        metadata = ImageMetadata()
+        metadata.fileInfo.width, metadata.fileInfo.height = 10, 10
+        metadata.fileInfo.pixelType = PixelType.BAYER_RGGB
+        image = np.full((10, 10), len(self.reads), dtype=self.dtype)
+        if 'out' in options:
+            options['out'][...] = image
+            image = options['out']
+        return image, metadata
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    # Create count image files, their content is not read by the reader stand-ins.
+    def create(count):
+        paths = [tmp_path / 'image_{0}.tif'.format(index) for index in range(count)]
+        for path in paths:
+            path.write_bytes(bytes(16))
+        return paths
+
+    return create
@@ -0,0 +1,98 @@
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from cxx_image_io import read_image_async, read_images_async, write_image_async
+
+pytestmark = pytest.mark.unittest
+
+
+def test_read_image_async_runs_on_executor(monkeypatch):
+    # Given: a read_image recording the thread it runs on
+    threads = []
+
+    def fake_read_image(image_path, metadata_path=None):
+        threads.append(threading.current_thread())
+        return np.zeros((2, 2), dtype=np.uint16), {'path': image_path}
+
+    monkeypatch.setattr("cxx_image_io.async_io.read_image", fake_read_image)
+
+    # When: the coroutine is awaited with a dedicated executor
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='decoder') as executor:
+        image, metadata = asyncio.run(read_image_async(Path('0.dng'), executor=executor))
+
+    # Then: the decoding ran off the event loop thread
+    assert threads[0].name.startswith('decoder')
+    assert metadata == {'path': Path('0.dng')}
+    assert image.shape == (2, 2)
+
+
+def test_read_image_async_turns_exit_into_error(monkeypatch):
+    # Given: a read_image failing like read_image_cxx, with sys.exit
+    def fake_read_image(image_path, metadata_path=None):
+        sys.exit("Exception caught in reading image, check the error log.")
+
+    monkeypatch.setattr("cxx_image_io.async_io.read_image", fake_read_image)
+
+    # When / Then: the awaiting coroutine gets a RuntimeError, the event loop keeps running
+    with pytest.raises(RuntimeError, match="reading image"):
+        asyncio.run(read_image_async(Path('0.jpg')))
+
+
+def test_write_image_async_respects_limit(monkeypatch):
+    # Given: a slow write_image and a limit of 2 writes in flight
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def fake_write_image(output_path, image_array, write_options):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        threading.Event().wait(0.01)
+        with lock:
+            running[0] -= 1
+
+    monkeypatch.setattr("cxx_image_io.async_io.write_image", fake_write_image)
+
+    async def write_all():
+        limit = asyncio.Semaphore(2)
+        image = np.zeros((2, 2), dtype=np.uint8)
+        await asyncio.gather(
+            *[write_image_async(Path('{0}.png'.format(i)), image, None, limit=limit) for i in range(8)])
+
+    # When: 8 writes are started at once on the default executor
+    asyncio.run(write_all())
+
+    # Then: never more than 2 ran at the same time
+    assert running[1] <= 2
+
+
+def test_read_images_async_keeps_input_order(monkeypatch):
+    # Given: a reader where later files finish first, and one corrupted file
+    class FakeReader:
+        def read(self, image_path, metadata_path=None):
+            index = int(image_path.stem)
+            threading.Event().wait(0.002 * (10 - index))
+            if image_path.suffix == '.bad':
+                raise RuntimeError('corrupted file')
+            return np.full((2, 2), index, dtype=np.uint16), None
+
+    monkeypatch.setattr("cxx_image_io.batch.ImageReaderFactory.get_reader", lambda image_path: FakeReader())
+    paths = [Path('{0}.jpg'.format(i)) for i in range(9)] + [Path('9.bad')]
+
+    async def read_all():
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            return [r async for r in read_images_async(paths, executor=executor, max_in_flight=3)]
+
+    # When: the batch is read asynchronously
+    results = asyncio.run(read_all())
+
+    # Then: results keep the input order and the failure is reported per file
+    assert [r.path for r in results] == paths
+    assert [int(r.image[0, 0]) for r in results[:-1]] == list(range(9))
+    assert isinstance(results[-1].error, RuntimeError)
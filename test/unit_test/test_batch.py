@@ -0,0 +1,198 @@
+import gc
+import threading
+import time
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from cxx_image_io import ReadResult, read_images
+from cxx_image_io.batch import _attach_shared, _read_one_shared
+
+pytestmark = pytest.mark.unittest
+
+
+class FakeReader:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.sidecars = {}
+
+    def read(self, image_path, metadata_path=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            self.sidecars[image_path] = metadata_path
+            index = int(image_path.stem)
+            # Later files finish first, so the output order only holds if read_images reorders.
+            time.sleep(0.002 * (10 - index % 10))
+            if image_path.suffix == '.bad':
+                raise RuntimeError('corrupted file')
+            return np.full((2, 2), index, dtype=np.uint16), {'index': index}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def fake_reader(monkeypatch):
+    reader = FakeReader()
+    monkeypatch.setattr("cxx_image_io.batch.ImageReaderFactory.get_reader", lambda image_path: reader)
+    return reader
+
+
+def test_read_images_keeps_input_order(fake_reader):
+    # Given: 20 files decoded on 4 workers
+    paths = [Path('{0}.jpg'.format(i)) for i in range(20)]
+
+    # When: the batch is read
+    results = list(read_images(paths, workers=4))
+
+    # Then: results come back in input order with their pixels and metadata
+    assert [r.path for r in results] == paths
+    for i, (path, image, metadata) in enumerate(results):
+        assert image[0, 0] == i
+        assert metadata == {'index': i}
+
+
+def test_read_images_reports_failures(fake_reader):
+    # Given: a batch where one file fails to decode
+    paths = [Path('0.jpg'), Path('1.bad'), Path('2.jpg')]
+
+    # When: the batch is read
+    results = list(read_images(paths, workers=2))
+
+    # Then: the failure is reported in its result and the other files are decoded
+    assert [r.ok for r in results] == [True, False, True]
+    assert isinstance(results[1].error, RuntimeError)
+    assert results[1].image is None
+    assert isinstance(results[1], ReadResult)
+
+
+def test_read_images_catches_system_exit(monkeypatch):
+    # Given: a reader failing like read_image_cxx does, with sys.exit
+    class ExitReader:
+        def read(self, image_path, metadata_path=None):
+            raise SystemExit("Exception caught in reading image, check the error log.")
+
+    monkeypatch.setattr("cxx_image_io.batch.ImageReaderFactory.get_reader", lambda image_path: ExitReader())
+
+    # When: the batch is read
+    results = list(read_images([Path('0.raw')], workers=1))
+
+    # Then: the process is not killed and the error is reported
+    assert isinstance(results[0].error, SystemExit)
+
+
+def test_read_images_bounds_in_flight(fake_reader):
+    # Given: a lazy stream of paths
+    submitted = []
+
+    def paths():
+        for i in range(30):
+            submitted.append(i)
+            yield Path('{0}.jpg'.format(i))
+
+    # When: the consumer is slower than the workers
+    stream = read_images(paths(), workers=4, max_in_flight=3)
+    first = next(stream)
+
+    # Then: no more than max_in_flight files are pulled ahead of the consumer
+    assert first.path == Path('0.jpg')
+    assert len(submitted) <= 4
+    assert fake_reader.max_running <= 3
+    stream.close()
+
+
+def test_read_images_sidecar_mapping(fake_reader):
+    # Given: a sidecar stored elsewhere for one of the files
+    sidecar = Path('/sidecars/1.json')
+
+    # When: the batch is read with the mapping
+    list(read_images(['0.jpg', '1.jpg'], metadata_paths={'1.jpg': sidecar}, workers=2))
+
+    # Then: only the mapped file gets its sidecar
+    assert fake_reader.sidecars == {Path('0.jpg'): None, Path('1.jpg'): sidecar}
+
+
+class FakeMetadata:
+    def serialize(self):
+        return {'fileInfo': {'width': 3, 'height': 2}}
+
+
+def test_shared_memory_round_trip(monkeypatch):
+    # Given: a reader returning a non contiguous uint16 image
+    image = np.arange(24, dtype=np.uint16).reshape(4, 6)[::2, ::2]
+
+    class ArrayReader:
+        def read(self, image_path, metadata_path=None):
+            return image, FakeMetadata()
+
+    monkeypatch.setattr("cxx_image_io.batch.ImageReaderFactory.get_reader", lambda image_path: ArrayReader())
+
+    # When: a process worker decodes into shared memory and the parent attaches the block
+    shared_result = _read_one_shared(Path('0.raw'), None)
+    result = _attach_shared(shared_result)
+
+    # Then: the parent gets an array with the same pixels and the serialized metadata
+    attached, metadata = result.image, result.metadata
+    del result
+    np.testing.assert_array_equal(attached, image)
+    assert metadata == {'fileInfo': {'width': 3, 'height': 2}}
+    # And: the block name is already removed, the array alone keeps the memory alive
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=shared_result[1])
+
+
+def test_shared_memory_kept_by_views(monkeypatch):
+    # Given: an image attached from shared memory
+    image = np.arange(24, dtype=np.uint16).reshape(4, 6)
+
+    class ArrayReader:
+        def read(self, image_path, metadata_path=None):
+            return image, FakeMetadata()
+
+    monkeypatch.setattr("cxx_image_io.batch.ImageReaderFactory.get_reader", lambda image_path: ArrayReader())
+    closed = []
+    monkeypatch.setattr("cxx_image_io.batch.shared_memory.SharedMemory.close",
+                        lambda block, close=shared_memory.SharedMemory.close: closed.append(close(block)))
+    attached = _attach_shared(_read_one_shared(Path('0.raw'), None)).image
+    # The worker closed its own handle on the block.
+    closed.clear()
+
+    # When: only a view on the array is kept
+    view = attached[1:, ::2]
+    del attached
+    gc.collect()
+
+    # Then: the block stays mapped until the view goes away
+    assert not closed
+    np.testing.assert_array_equal(view, image[1:, ::2])
+    del view
+    gc.collect()
+    assert closed
+
+
+def test_shared_memory_failure_is_reported(monkeypatch):
+    # Given: a reader failing on the file
+    class BadReader:
+        def read(self, image_path, metadata_path=None):
+            raise RuntimeError('corrupted file')
+
+    monkeypatch.setattr("cxx_image_io.batch.ImageReaderFactory.get_reader", lambda image_path: BadReader())
+
+    # When: a process worker decodes it
+    result = _attach_shared(_read_one_shared(Path('0.raw'), None))
+
+    # Then: no shared memory is created and the error is forwarded
+    assert not result.ok
+    assert isinstance(result.error, RuntimeError)
+
+
+def test_read_images_rejects_unknown_mode():
+    # When / Then: only thread and process modes exist
+    with pytest.raises(AssertionError, match="mode must be"):
+        next(read_images([Path('0.jpg')], mode='gpu'))
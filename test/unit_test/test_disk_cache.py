@@ -0,0 +1,152 @@
+import os
+
+import numpy as np
+import pytest
+
+from cxx_image_io import (CachedImageReader, DecodedImageCache, DiskImageCache, ImageMetadata, PixelType, read_image)
+
+from .conftest import DecodeCountingReader
+
+pytestmark = pytest.mark.unittest
+
+
+def test_disk_cache_decodes_once(tmp_path, image_paths):
+    # Given: a reader wrapped with a disk cache
+    image_path, = image_paths(1)
+    reader = DecodeCountingReader(np.uint16)
+    cache = DiskImageCache(tmp_path / 'cache', 1 << 20)
+    cached_reader = CachedImageReader(reader, cache)
+
+    # When: the image is read twice, the second time by another cache on the same directory (next epoch)
+    first, _ = cached_reader.read(image_path)
+    second, metadata = CachedImageReader(reader, DiskImageCache(tmp_path / 'cache', 1 << 20)).read(image_path)
+
+    # Then: it is decoded once, and loaded back as a read-only memmap with its metadata
+    assert len(reader.reads) == 1
+    assert isinstance(second, np.memmap) and not second.flags.writeable
+    np.testing.assert_array_equal(first, second)
+    assert second.dtype == np.uint16
+    assert metadata.fileInfo.pixelType == PixelType.BAYER_RGGB
+    assert (cache.hits, cache.misses, len(cache)) == (0, 1, 1)
+
+
+def test_disk_cache_invalidated_by_changes(tmp_path, image_paths):
+    # Given: a cached image
+    image_path, = image_paths(1)
+    reader = DecodeCountingReader(np.uint16)
+    cache = DiskImageCache(tmp_path / 'cache', 1 << 20)
+    cached_reader = CachedImageReader(reader, cache)
+    cached_reader.read(image_path)
+
+    # When: its file is modified
+    stat = image_path.stat()
+    os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    image, _ = cached_reader.read(image_path)
+
+    # Then: it is decoded again, and replaces the previous image in the directory and in the budget
+    assert len(reader.reads) == 2 and image[0, 0] == 2
+    assert len(cache) == 1
+    assert cache.nbytes == sum(path.stat().st_size for path in (tmp_path / 'cache').glob('*.npy'))
+    assert cached_reader.read(image_path)[0][0, 0] == 2
+
+
+def test_disk_cache_overwrite_keeps_budget(tmp_path, image_paths):
+    # Given: an image stored in a disk cache
+    image_path, = image_paths(1)
+    image, metadata = DecodeCountingReader(np.uint16).read(image_path)
+    cache = DiskImageCache(tmp_path / 'cache', 1 << 20)
+    stamp = (1, 2)
+    cache.put('key', stamp, image.copy(), metadata)
+    size = cache.nbytes
+
+    # When: the same key and stamp are stored again, as by another worker which missed it too
+    cache.put('key', stamp, image.copy(), metadata)
+
+    # Then: the entry is counted once
+    assert (len(cache), cache.nbytes) == (1, size)
+    assert cache.get('key', stamp) is not None
+
+
+def test_disk_cache_invalidated_by_sidecar_changes(tmp_path, image_paths):
+    # Given: a cached image with a sidecar next to it
+    image_path, = image_paths(1)
+    sidecar = image_path.with_suffix('.json')
+    sidecar.write_text('{}')
+    reader = DecodeCountingReader(np.uint16)
+    cached_reader = CachedImageReader(reader, DiskImageCache(tmp_path / 'cache', 1 << 20))
+    cached_reader.read(image_path)
+
+    # When: only the sidecar is modified
+    sidecar.write_text('{"fileInfo": {}}')
+    image, _ = cached_reader.read(image_path)
+
+    # Then: the image is decoded again
+    assert len(reader.reads) == 2 and image[0, 0] == 2
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path, image_paths):
+    # Given: a cache holding 2 images, the first one being used after the second one
+    paths = image_paths(3)
+    reader = DecodeCountingReader(np.uint16)
+    cached_reader = CachedImageReader(reader, DiskImageCache(tmp_path / 'cache', 1 << 20))
+    for path in paths[:2]:
+        cached_reader.read(path)
+    npy_files = sorted((tmp_path / 'cache').glob('*.npy'), key=lambda path: path.stat().st_mtime_ns)
+    for age, npy_file in enumerate(npy_files):
+        os.utime(npy_file, ns=(0, (age + 1) * 10**9))
+    cached_reader.read(paths[0])
+    size = npy_files[0].stat().st_size
+
+    # When: a third image is read with a budget of 2 images
+    cache = DiskImageCache(tmp_path / 'cache', 2 * size)
+    CachedImageReader(reader, cache).read(paths[2])
+
+    # Then: the second image, least recently used, is removed
+    assert (len(cache), cache.nbytes, cache.evictions) == (2, 2 * size, 1)
+    assert len(reader.reads) == 3
+    cached_reader.read(paths[0])
+    assert len(reader.reads) == 3
+    cached_reader.read(paths[1])
+    assert len(reader.reads) == 4
+
+
+def test_disk_cache_skips_uncacheable_metadata(tmp_path, image_paths):
+    # Given: a reader returning metadata with a face detection, which can not be rebuilt from its serialized form
+    image_path, = image_paths(1)
+
+    class FaceDetectionReader(DecodeCountingReader):
+        def read(self, image_path, metadata_path=None, **options):
+            image, metadata = super().read(image_path, metadata_path, **options)
+            metadata.cameraControls.faceDetection = [ImageMetadata.ROI(0, 0, 10, 10)]
+            return image, metadata
+
+    cache = DiskImageCache(tmp_path / 'cache', 1 << 20)
+
+    # When: the image is read
+    image, _ = CachedImageReader(FaceDetectionReader(), cache).read(image_path)
+
+    # Then: it is returned as decoded, writeable, and not stored
+    assert image.flags.writeable
+    assert (len(cache), cache.nbytes) == (0, 0)
+
+
+def test_read_image_with_disk_and_memory_caches(tmp_path, monkeypatch, image_paths):
+    # Given: a reader selected for the file, an empty disk cache and a memory cache
+    image_path, = image_paths(1)
+    reader = DecodeCountingReader(np.uint16)
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda path: reader)
+    disk_cache = DiskImageCache(tmp_path / 'cache', 1 << 20)
+    image_cache = DecodedImageCache(1 << 20)
+
+    # When: the image is read three times, the memory cache being cleared after the first read
+    read_image(image_path, image_cache=image_cache, disk_cache=disk_cache)
+    image_cache.clear()
+    for _ in range(2):
+        read_image(image_path, image_cache=image_cache, disk_cache=disk_cache)
+
+    # Then: it is decoded once, loaded once from the disk, then served from memory
+    assert len(reader.reads) == 1
+    assert (disk_cache.hits, disk_cache.misses) == (1, 1)
+    assert (image_cache.hits, image_cache.misses) == (1, 1)
+    disk_cache.clear()
+    assert (len(disk_cache), disk_cache.nbytes) == (0, 0)
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cxx_image_io import (FrameSequence, ImageLayout, ImageMetadata,
+                          PixelRepresentation, PixelType)
+
+pytestmark = pytest.mark.unittest
+
+
+class FakePlainReader:
+    # Reader stand-in exposing the layout of one frame parsed from a sidecar.
+    def __init__(self, width, height, pixel_type, image_layout, pixel_repr):
+        self._layout = (width, height, pixel_type, image_layout, pixel_repr)
+
+    def width(self):
+        return self._layout[0]
+
+    def height(self):
+        return self._layout[1]
+
+    def pixelType(self):
+        return self._layout[2]
+
+    def imageLayout(self):
+        return self._layout[3]
+
+    def pixelRepresentation(self):
+        return self._layout[4]
+
+    def pixelPrecision(self):
+        return 8
+
+
+@pytest.fixture
+def open_with(monkeypatch):
+    # Make the frame sequence parse the given reader instead of the sidecar.
+    monkeypatch.setattr("cxx_image_io.utils.io_sidecar_raw.io", SimpleNamespace(PlainReader=FakePlainReader))
+
+    def patch(reader):
+        monkeypatch.setattr("cxx_image_io.utils.io_cxx_image._make_reader",
+                            lambda image_path, metadata_path, image_format=None: (reader, ImageMetadata()))
+
+    return patch
+
+
+def test_nv12_frames(tmp_path, open_with):
+    # Given: a dump of 5 NV12 frames of 8x4 pixels
+    frames = np.arange(5 * 6 * 8, dtype=np.uint8).reshape(5, 6, 8)
+    image_path = tmp_path / 'dump.nv12'
+    frames.tofile(image_path)
+    open_with(FakePlainReader(8, 4, PixelType.YUV, ImageLayout.NV12, PixelRepresentation.UINT8))
+
+    # When: the dump is opened
+    sequence = FrameSequence(image_path)
+
+    # Then: frames are read-only views of the file, by index, negative index and slice
+    assert len(sequence) == 5
+    assert sequence.frame_shape == (6, 8)
+    np.testing.assert_array_equal(sequence[3], frames[3])
+    np.testing.assert_array_equal(sequence[-1], frames[4])
+    np.testing.assert_array_equal(sequence[1:4:2], frames[1:4:2])
+    assert not sequence[0].flags.writeable
+    assert (sequence.metadata.fileInfo.width, sequence.metadata.fileInfo.height) == (8, 4)
+
+
+def test_interleaved_frames(tmp_path, open_with):
+    # Given: a dump of 3 interleaved 16 bits RGB frames
+    frames = np.arange(3 * 2 * 4 * 3, dtype=np.uint16).reshape(3, 2, 4, 3)
+    image_path = tmp_path / 'dump.plain16'
+    frames.tofile(image_path)
+    open_with(FakePlainReader(4, 2, PixelType.RGB, ImageLayout.INTERLEAVED, PixelRepresentation.UINT16))
+
+    # When / Then: the frames have the shape of the image read_image returns
+    sequence = FrameSequence(image_path)
+    assert [frame.shape for frame in sequence] == [(2, 4, 3)] * 3
+    np.testing.assert_array_equal(sequence[2], frames[2])
+
+
+def test_truncated_frames(tmp_path, open_with):
+    # Given: a dump whose last frame is truncated
+    image_path = tmp_path / 'dump.plain16'
+    np.zeros(2 * 4 * 4 + 3, dtype=np.uint16).tofile(image_path)
+    open_with(FakePlainReader(4, 4, PixelType.BAYER_RGGB, ImageLayout.PLANAR, PixelRepresentation.UINT16))
+
+    # When / Then: it is rejected
+    with pytest.raises(AssertionError, match="not a whole number of frames"):
+        FrameSequence(image_path)
@@ -0,0 +1,201 @@
+import os
+
+import numpy as np
+import pytest
+
+from cxx_image_io import (CachedImageReader, DecodedImageCache, ImageMetadata,
+                          read_image)
+
+from .conftest import DecodeCountingReader
+
+pytestmark = pytest.mark.unittest
+
+
+def test_cached_reader_decodes_once(image_paths):
+    # Given: a reader wrapped with a cache
+    image_path, = image_paths(1)
+    reader = DecodeCountingReader()
+    cached_reader = CachedImageReader(reader, DecodedImageCache(1000))
+
+    # When: the same image is read three times
+    images = [cached_reader.read(image_path)[0] for _ in range(3)]
+
+    # Then: it is decoded once, and returned read-only
+    assert len(reader.reads) == 1
+    assert all(image is images[0] for image in images)
+    assert not images[0].flags.writeable
+    with pytest.raises(ValueError):
+        images[0][0, 0] = 0
+    assert (cached_reader.cache.hits, cached_reader.cache.misses) == (2, 1)
+    assert cached_reader.cache.hit_rate == pytest.approx(2 / 3)
+
+
+def test_cached_reader_keys_options(image_paths):
+    # Given: a reader wrapped with a cache
+    image_path, = image_paths(1)
+    reader = DecodeCountingReader()
+    cached_reader = CachedImageReader(reader, DecodedImageCache(1000))
+
+    # When: the image is read whole and with a roi, twice
+    for _ in range(2):
+        cached_reader.read(image_path)
+        cached_reader.read(image_path, roi=(0, 0, 2, 2))
+
+    # Then: each set of options is decoded once
+    assert reader.reads == [('image_0.tif', {}), ('image_0.tif', {'roi': (0, 0, 2, 2)})]
+
+
+def test_cached_reader_copies_metadata(image_paths):
+    # Given: a cached image
+    image_path, = image_paths(1)
+    cached_reader = CachedImageReader(DecodeCountingReader(), DecodedImageCache(1000))
+    _, first = cached_reader.read(image_path)
+
+    # When: the caller modifies its metadata, then reads the image again twice
+    first.fileInfo.width = 20
+    second, third = (cached_reader.read(image_path)[1] for _ in range(2))
+
+    # Then: each hit gets its own copy of the metadata as it was decoded
+    assert second is not third
+    assert second.fileInfo.width == 10 and third.fileInfo.width == 10
+
+
+def test_cache_skips_uncacheable_metadata(image_paths):
+    # Given: a reader whose metadata has a face detection, which can not be copied
+    class MaskedReader(DecodeCountingReader):
+        def read(self, image_path, metadata_path=None, **options):
+            image, metadata = super().read(image_path, metadata_path, **options)
+            metadata.cameraControls.faceDetection = [ImageMetadata.ROI(0, 0, 10, 10)]
+            return image, metadata
+
+    image_path, = image_paths(1)
+    reader = MaskedReader()
+    cached_reader = CachedImageReader(reader, DecodedImageCache(1000))
+
+    # When: the image is read twice
+    for _ in range(2):
+        cached_reader.read(image_path)
+
+    # Then: it is decoded each time, and not cached
+    assert len(reader.reads) == 2 and len(cached_reader.cache) == 0
+
+
+def test_cache_evicts_least_recently_used(image_paths):
+    # Given: a cache holding 3 images of 100 bytes
+    paths = image_paths(4)
+    reader = DecodeCountingReader()
+    cache = DecodedImageCache(300)
+    cached_reader = CachedImageReader(reader, cache)
+    for path in paths[:3]:
+        cached_reader.read(path)
+
+    # When: the first image is used again, then a fourth one is read
+    cached_reader.read(paths[0])
+    cached_reader.read(paths[3])
+
+    # Then: the second image, least recently used, is evicted
+    assert (len(cache), cache.nbytes, cache.evictions) == (3, 300, 1)
+    cached_reader.read(paths[1])
+    assert [name for name, _ in reader.reads
+            ] == ['image_0.tif', 'image_1.tif', 'image_2.tif', 'image_3.tif', 'image_1.tif']
+
+
+def test_cache_skips_images_over_budget(image_paths):
+    # Given: a cache smaller than the image
+    image_path, = image_paths(1)
+    cache = DecodedImageCache(50)
+
+    # When: the image is read
+    image, _ = CachedImageReader(DecodeCountingReader(), cache).read(image_path)
+
+    # Then: it is returned as decoded, writeable, and not cached
+    assert image.flags.writeable
+    assert (len(cache), cache.nbytes) == (0, 0)
+
+
+def test_cache_stores_views_compact():
+    # Given: a view of a larger decoded image, as a visible crop
+    metadata = ImageMetadata()
+    full = np.zeros((100, 100), dtype=np.uint8)
+    view = full[10:20, 10:20]
+    cache = DecodedImageCache(1000)
+
+    # When: it is cached
+    image = cache.put('key', (), view, metadata)
+
+    # Then: a compact copy is kept, and the budget counts the bytes really held
+    assert image.base is None and not image.flags.writeable
+    np.testing.assert_array_equal(image, view)
+    assert cache.nbytes == 100
+    assert full.flags.writeable
+
+
+def test_cache_invalidated_by_changes(image_paths):
+    # Given: a cached image
+    image_path, = image_paths(1)
+    reader = DecodeCountingReader()
+    cache = DecodedImageCache(1000)
+    cached_reader = CachedImageReader(reader, cache)
+    first, _ = cached_reader.read(image_path)
+
+    # When: its file is modified
+    stat = image_path.stat()
+    os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    second, _ = cached_reader.read(image_path)
+
+    # Then: it is decoded again, and replaces the previous image
+    assert len(reader.reads) == 2
+    assert first[0, 0] == 1 and second[0, 0] == 2
+    assert (len(cache), cache.nbytes) == (1, 100)
+
+
+@pytest.mark.parametrize("explicit", [False, True])
+def test_cache_invalidated_by_sidecar_changes(tmp_path, explicit, image_paths):
+    # Given: a cached image described by a sidecar, next to it or given explicitly
+    image_path, = image_paths(1)
+    sidecar = image_path.with_suffix('.json') if not explicit else tmp_path / 'sidecar.json'
+    sidecar.write_text('{}')
+    metadata_path = sidecar if explicit else None
+    reader = DecodeCountingReader()
+    cached_reader = CachedImageReader(reader, DecodedImageCache(1000))
+    cached_reader.read(image_path, metadata_path)
+
+    # When: only the sidecar is modified
+    sidecar.write_text('{"fileInfo": {}}')
+    image, _ = cached_reader.read(image_path, metadata_path)
+
+    # Then: the image is decoded again
+    assert len(reader.reads) == 2 and image[0, 0] == 2
+
+
+def test_cache_bypassed_with_out(image_paths):
+    # Given: a reader wrapped with a cache, and a preallocated array
+    image_path, = image_paths(1)
+    reader = DecodeCountingReader()
+    cached_reader = CachedImageReader(reader, DecodedImageCache(1000))
+    out = np.zeros((10, 10), dtype=np.uint8)
+
+    # When: the image is read into out twice
+    images = [cached_reader.read(image_path, out=out)[0] for _ in range(2)]
+
+    # Then: it is decoded each time, into the caller's writeable array
+    assert len(reader.reads) == 2
+    assert images[1] is out and out.flags.writeable
+    assert len(cached_reader.cache) == 0
+
+
+def test_read_image_with_cache(monkeypatch, image_paths):
+    # Given: a reader selected for the file, and a cache
+    image_path, = image_paths(1)
+    reader = DecodeCountingReader()
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda path: reader)
+    cache = DecodedImageCache(1000)
+
+    # When: the image is read twice, then cleared from the cache
+    first, _ = read_image(image_path, image_cache=cache)
+    second, _ = read_image(image_path, image_cache=cache)
+    cache.clear()
+
+    # Then: it is decoded once
+    assert len(reader.reads) == 1 and first is second
+    assert (len(cache), cache.nbytes, cache.hits, cache.misses) == (0, 0, 0, 0)
@@ -0,0 +1,124 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from cxx_image_io import ImageMetadata, LazyImage, read_image
+
+pytestmark = pytest.mark.unittest
+
+
+class CountingReader:
+    # Reader stand-in counting the decodes, and recording the options of the last one.
+    def __init__(self):
+        self.reads = 0
+        self.options = None
+
+    def probe(self, image_path, metadata_path=None):
+        metadata = ImageMetadata()
+        metadata.fileInfo.width = 8
+        metadata.fileInfo.height = 4
+        return metadata
+
+    def read(self, image_path, metadata_path=None, **options):
+        self.reads += 1
+        self.options = options
+        return np.arange(32, dtype=np.uint16).reshape(4, 8), self.probe(image_path)
+
+
+def test_lazy_image_decodes_once_on_access():
+    # Given: a lazy image
+    reader = CountingReader()
+    image = LazyImage(reader, Path('x.tif'), None, reader.probe(Path('x.tif')), {'mmap': True})
+
+    # When: the metadata is read, then the pixels are accessed twice
+    assert image.metadata.fileInfo.width == 8
+    assert reader.reads == 0 and not image.decoded
+    first = image.pixels
+    second = np.asarray(image)
+
+    # Then: the file is decoded once with the read options, and the same array is returned
+    assert reader.reads == 1 and image.decoded
+    assert reader.options == {'mmap': True}
+    assert second is first
+
+
+def test_lazy_image_array_conversion():
+    # Given: a lazy image
+    reader = CountingReader()
+    image = LazyImage(reader, Path('x.tif'), None, reader.probe(Path('x.tif')), {})
+
+    # When / Then: numpy conversions follow the requested dtype and copy
+    assert np.asarray(image, dtype=np.float32).dtype == np.float32
+    assert np.array(image) is not image.pixels
+    np.testing.assert_array_equal(np.array(image), image.pixels)
+
+
+def test_read_image_lazy(monkeypatch):
+    # Given: a reader selected for the file
+    reader = CountingReader()
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda image_path: reader)
+
+    # When: the image is read lazily with a region of interest
+    image, metadata = read_image(Path('x.tif'), roi=(2, 0, 4, 2), lazy=True)
+
+    # Then: only the header is read, the metadata describes the region, and the region is decoded on access
+    assert isinstance(image, LazyImage) and reader.reads == 0
+    assert (metadata.fileInfo.width, metadata.fileInfo.height) == (4, 2)
+    assert image.pixels.shape == (4, 8)
+    assert reader.options == {'roi': (2, 0, 4, 2)}
+
+
+def test_read_image_lazy_metadata_updated_on_decode(monkeypatch):
+    # Given: a reader whose header has no calibration data, unlike its decoded images
+    class CalibratedReader(CountingReader):
+        def read(self, image_path, metadata_path=None, **options):
+            image, metadata = super().read(image_path, metadata_path, **options)
+            metadata.fileInfo.width, metadata.fileInfo.height = 4, 2
+            metadata.calibrationData.blackLevel = 64
+            return image, metadata
+
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda image_path: CalibratedReader())
+    image, metadata = read_image(Path('x.cr2'), roi=(2, 0, 4, 2), lazy=True)
+    assert metadata.calibrationData.blackLevel is None
+
+    # When: the pixels are decoded
+    image.pixels
+
+    # Then: the metadata returned by read_image is updated with the decoded one
+    assert image.metadata is metadata
+    assert metadata.calibrationData.blackLevel == 64
+    assert (metadata.fileInfo.width, metadata.fileInfo.height) == (4, 2)
+
+
+@pytest.mark.parametrize("options", [{'crop': 'visible'}, {'compact': True}])
+def test_read_image_lazy_rejects_camera_raw_options(monkeypatch, options):
+    # Given: a reader of files which are not camera RAW files
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda image_path: CountingReader())
+
+    # When / Then: the visible area options are rejected before the metadata is adjusted
+    with pytest.raises(AssertionError, match="only supported for camera RAW files"):
+        read_image(Path('x.jpg'), lazy=True, **options)
+
+
+def test_read_image_lazy_rejects_scale(monkeypatch):
+    # Given: a reader selected for the file
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda image_path: CountingReader())
+
+    # When / Then: the size of a downscaled image is unknown before decoding
+    with pytest.raises(AssertionError, match="lazy can not be used"):
+        read_image(Path('x.jpg'), scale=1 / 2, lazy=True)
+
+
+def test_read_image_lazy_binning(monkeypatch):
+    # Given: a reader selected for the file
+    reader = CountingReader()
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda image_path: reader)
+
+    # When: the image is read lazily and binned
+    image, metadata = read_image(Path('x.nef'), binning=2, lazy=True)
+
+    # Then: the metadata describes the binned image, and binning is forwarded to the decode
+    assert (metadata.fileInfo.width, metadata.fileInfo.height) == (2, 1)
+    image.pixels
+    assert reader.options == {'binning': 2}
@@ -1,15 +1,24 @@
+import threading
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import numpy as np
 import pytest
-
-from cxx_image_io import (ImageLayout, LibRawParameters, Matrix3, Metadata,
-                          PixelRepresentation, PixelType)
-from cxx_image_io.utils.io_cxx_libraw import (_bayer_pattern_to_pixel_type,
-                                              _fill_calibration_data,
+from cxx_libraw import LibRaw, ThumbnailFormat
+
+from cxx_image_io import (ImageLayout, ImageMetadata, ImageReaderFactory,
+                          LibRaw_errors, LibRawImageReader, LibRawParameters,
+                          LibRawProcessorPool, Matrix3, Metadata,
+                          PixelRepresentation, PixelType,
+                          UnSupportedFileException, read_image,
+                          read_image_libraw)
+from cxx_image_io.utils.io_cxx_libraw import (_fill_calibration_data,
                                               _fill_exif_metadata,
                                               _fill_file_info,
-                                              _parse_pixelType)
+                                              _parse_pixelType,
+                                              read_exif_libraw,
+                                              read_thumbnail_libraw)
+from cxx_image_io.utils.region import bin_bayer
 
 pytestmark = pytest.mark.unittest
 
@@ -33,92 +42,103 @@ def test_parse_pixelType_filters_too_small():
 # -----------------------------
 @pytest.mark.unittest
 def test_parse_pixelType_invalid_pattern(monkeypatch):
-    # Given: a libRaw object with filters >= 1000
+    # Given: a libRaw object with filters >= 1000, whose pattern the binding can not decode
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw._pixel_type_cache", {})
     libRaw = MagicMock()
     libRaw.imgdata.idata.filters = 1000
+    libRaw.imgdata.idata.cdesc = 'RGBG'
+    libRaw.bayer_pattern.side_effect = ValueError("Invalid 4×4 Bayer pattern; sub-blocks are inconsistent.")
 
-    # And: a 4x4 Bayer pattern with inconsistent sub-blocks
-    pattern_4x4 = np.array(
-        [
-            [0, 1, 0, 1],
-            [1, 0, 1, 0],
-            [0, 1, 1, 0],  # inconsistency here
-            [1, 0, 0, 1]
-        ],
-        dtype=np.uint8)
-
-    # Patch _raw_color to return values from the mock pattern
-    # When: _parse_pixelType is called
-    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw._raw_color", lambda libRaw, y, x: pattern_4x4[y, x])
-
-    # Then: it should raise ValueError due to inconsistent 4x4 sub-blocks
+    # When & Then: _parse_pixelType should raise ValueError
     with pytest.raises(ValueError):
         _parse_pixelType(libRaw)
 
 
 # -----------------------------
-# Test successful 2x2 CFA pattern extraction
+# Test successful 2x2 CFA pattern conversion
 # -----------------------------
 @pytest.mark.unittest
-def test_parse_pixelType_success(monkeypatch):
-    # Given: a libRaw object with filters >= 1000
+@pytest.mark.parametrize("pixel_type", [PixelType.BAYER_RGGB, PixelType.CUSTOM])
+def test_parse_pixelType_success(monkeypatch, pixel_type):
+    # Given: a libRaw object with filters >= 1000, whose pixel type the binding decodes
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw._pixel_type_cache", {})
     libRaw = MagicMock()
     libRaw.imgdata.idata.filters = 1000
+    libRaw.imgdata.idata.cdesc = 'RGBG'
+    libRaw.bayer_pattern.return_value = pixel_type
 
-    # And: a consistent 4x4 Bayer pattern
-    pattern_4x4 = np.array([[0, 1, 0, 1], [1, 0, 1, 0], [0, 1, 0, 1], [1, 0, 1, 0]], dtype=np.uint8)
-
-    # Patch _raw_color to return values from the consistent pattern
-    # When: _parse_pixelType is called
-    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw._raw_color", lambda libRaw, y, x: pattern_4x4[y, x])
+    # When / Then: the pixel type decoded by the binding is returned
+    assert _parse_pixelType(libRaw) == pixel_type
 
-    top_left = _parse_pixelType(libRaw)
 
-    # Then: it should return the correct 2x2 top-left CFA pattern
-    expected = np.array([[0, 1], [1, 0]], dtype=np.uint8)
-    np.testing.assert_array_equal(top_left, expected)
+def _camera_processor(filters, cdesc):
+    libRaw = MagicMock()
+    libRaw.imgdata.idata.filters, libRaw.imgdata.idata.cdesc = filters, cdesc
+    libRaw.bayer_pattern.return_value = PixelType.CUSTOM if cdesc == 'GMCY' else PixelType.BAYER_RGGB
+    return libRaw
 
 
-# -----------------------------
-# Convert a 2x2 RGGB Bayer matrix into PixelType.BAYER_RGGB
-# -----------------------------
 @pytest.mark.unittest
-def test_bayer_pattern_to_pixel_type_rggb():
-    # Given: A 2x2 Bayer pattern representing RGGB
-    pattern = np.array([[0, 1], [3, 2]])
+def test_parse_pixelType_cached_per_filters(monkeypatch):
+    # Given: files with the same filters and colors, and files with other ones
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw._pixel_type_cache", {})
+    first, second = _camera_processor(0xB4B4B4B4, 'RGBG'), _camera_processor(0xB4B4B4B4, 'RGBG')
+    cmyg, other = _camera_processor(0xB4B4B4B4, 'GMCY'), _camera_processor(0x1E1E1E1E, 'RGBG')
 
-    # When: I call _bayer_pattern_to_pixel_type with this pattern
-    result = _bayer_pattern_to_pixel_type(pattern)
+    # When: their pixel types are parsed
+    pixel_types = [_parse_pixelType(libRaw) for libRaw in (first, second, cmyg, other)]
 
-    # --- Then: The function should return PixelType.BAYER_RGGB ----------------
-    assert result == PixelType.BAYER_RGGB
+    # Then: the pattern is decoded once per filters and color description
+    assert pixel_types == [PixelType.BAYER_RGGB, PixelType.BAYER_RGGB, PixelType.CUSTOM, PixelType.BAYER_RGGB]
+    first.bayer_pattern.assert_called_once()
+    second.bayer_pattern.assert_not_called()
+    cmyg.bayer_pattern.assert_called_once()
+    other.bayer_pattern.assert_called_once()
+
+
+def _libraw_with_filters(filters, cdesc):
+    libRaw = LibRaw()
+    libRaw.imgdata.idata.filters = filters
+    libRaw.imgdata.idata.cdesc = cdesc
+    return libRaw
 
 
 # -----------------------------
-# Convert a 2x2 BGGR Bayer matrix into PixelType.BAYER_BGGR
+# Test the 2x2 CFA decoding of the binding from the filters bitmask (2 bits per pixel, 8 rows of 2 pixels)
 # -----------------------------
 @pytest.mark.unittest
-def test_bayer_pattern_to_pixel_type_bggr():
-    # Given: the BGGR pattern[[2, 3],[1, 0]] representing BGGR
-    pattern = np.array([[2, 3], [1, 0]])
-    # When: I pass the pattern to _bayer_pattern_to_pixel_type
-    result = _bayer_pattern_to_pixel_type(pattern)
-    # Then: the returned value should be PixelType.BAYER_BGGR
-    assert result == PixelType.BAYER_BGGR
+@pytest.mark.parametrize("filters, expected", [(0xB4B4B4B4, PixelType.BAYER_RGGB), (0x1E1E1E1E, PixelType.BAYER_BGGR),
+                                               (0x4B4B4B4B, PixelType.BAYER_GBRG), (0xE1E1E1E1, PixelType.BAYER_GRBG)])
+def test_bayer_pattern_from_filters(filters, expected):
+    # Given: a processor with the filters of a 2x2 bayer CFA and RGB colors
+    libRaw = _libraw_with_filters(filters, 'RGBG')
+
+    # When / Then: the bayer pixel type is decoded
+    assert libRaw.bayer_pattern() == expected
 
 
-# -----------------------------
-# Passing an invalid 2x2 matrix to the Bayer pattern converter
-# -----------------------------
 @pytest.mark.unittest
-def test_bayer_pattern_to_pixel_type_invalid():
-    # --- Given: A pattern that does not match any known Bayer layout ----------
-    pattern = np.array([[9, 9], [9, 9]])
+def test_bayer_pattern_custom_colors():
+    # Given: a processor with a 2x2 CFA of other colors than RGB
+    libRaw = _libraw_with_filters(0xB4B4B4B4, 'GMCY')
 
-    # --- When: I call _bayer_pattern_to_pixel_type with this pattern ----------
-    # --- Then: The function should raise a ValueError -------------------------
-    with pytest.raises(ValueError):
-        _bayer_pattern_to_pixel_type(pattern)
+    # When / Then: the pixel type is CUSTOM
+    assert libRaw.bayer_pattern() == PixelType.CUSTOM
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize("filters, cdesc, message", [(0xB4B4E1B4, 'RGBG', "inconsistent"),
+                                                     (0xB4B4E1B4, 'GMCY', "inconsistent"),
+                                                     (0x55555555, 'RGBG', "Invalid Bayer pattern"),
+                                                     (999, 'RGBG', "Only 2x2")])
+def test_bayer_pattern_invalid(filters, cdesc, message):
+    # Given: a processor whose filters are not a 2x2 bayer CFA: rows 2 and 3 which differ from rows 0 and 1, whatever
+    # the colors, a green only CFA, or a filters value which is not a bitmask
+    libRaw = _libraw_with_filters(filters, cdesc)
+
+    # When / Then: the pattern is rejected
+    with pytest.raises(ValueError, match=message):
+        libRaw.bayer_pattern()
 
 
 # Fake libraw-like structure for test
@@ -163,6 +183,7 @@ def test_fill_file_info_bayer_pattern():
         raw_bps = 14  # 14-bit raw => UINT16
 
     class FakeIdata:
+        make, model = 'Canon', 'EOS-1D X'
         cdesc = 'RGGB'  # ensures Bayer path
         filters = 2000  # need to > 1000
 
@@ -178,10 +199,8 @@ def test_fill_file_info_bayer_pattern():
     class FakeLibRaw:
         imgdata = FakeImgData()
 
-        def COLOR(self, y, x):
-            # RGGB 2x2 pattern:
-            pattern = [[0, 1], [3, 2]]
-            return pattern[y % 2][x % 2]
+        def bayer_pattern(self):
+            return PixelType.BAYER_RGGB
 
     libRaw = FakeLibRaw()
     libraw_params = LibRawParameters(libRaw.imgdata.rawdata.sizes.raw_width, libRaw.imgdata.rawdata.sizes.raw_height,
@@ -215,6 +234,7 @@ def test_fill_file_info_custom_pixel_type():
         raw_bps = 12  # 12-bit raw
 
     class FakeIdata:
+        make, model = 'Canon', 'EOS-1D X'
         cdesc = 'XXXX'  # Not a recognized Bayer cdesc
         filters = 2000  # need to > 1000
 
@@ -230,10 +250,9 @@ def test_fill_file_info_custom_pixel_type():
     class FakeLibRaw:
         imgdata = FakeImgData()
 
-        def COLOR(self, y, x):
-            # RGGB 2x2 pattern:
-            pattern = [[0, 1], [3, 2]]
-            return pattern[y % 2][x % 2]
+        def bayer_pattern(self):
+            # As the binding does for a CFA of other colors than RGB.
+            return PixelType.CUSTOM
 
     libRaw = FakeLibRaw()
     libraw_params = LibRawParameters(libRaw.imgdata.rawdata.sizes.raw_width, libRaw.imgdata.rawdata.sizes.raw_height,
@@ -559,3 +578,300 @@ def test_metadata():
             'leftMargin': 5
         }
     })
+
+
+# Internal function to make a processor whose unpack_thumb gives the thumbnail.
+def _thumbnail_processor(tformat, data, width=0, height=0, colors=0, ret=LibRaw_errors.LIBRAW_SUCCESS):
+    processor = MagicMock()
+    processor.unpack_thumb.return_value = ret
+    thumbnail = processor.imgdata.thumbnail
+    thumbnail.tformat, thumbnail.data = tformat, data
+    thumbnail.twidth, thumbnail.theight, thumbnail.tcolors = width, height, colors
+    return processor
+
+
+@pytest.mark.parametrize("tformat, dtype", [(ThumbnailFormat.LIBRAW_THUMBNAIL_BITMAP, np.uint8),
+                                            (ThumbnailFormat.LIBRAW_THUMBNAIL_BITMAP16, np.uint16)])
+def test_read_thumbnail_bitmap(tformat, dtype):
+    # Given: a processor with an interleaved bitmap thumbnail of 2x3 pixels
+    bitmap = np.arange(2 * 3 * 3, dtype=dtype).reshape(2, 3, 3)
+    processor = _thumbnail_processor(tformat, bitmap.tobytes(), width=3, height=2, colors=3)
+
+    # When: the thumbnail is read
+    thumbnail = read_thumbnail_libraw(None, processor)
+
+    # Then: the bitmap is returned as an array of height x width x colors, the raw data is never unpacked
+    np.testing.assert_array_equal(thumbnail, bitmap)
+    assert thumbnail.dtype == dtype
+    processor.unpack.assert_not_called()
+
+
+def test_read_thumbnail_jpeg_bytes():
+    # Given: a processor with a JPEG thumbnail
+    processor = _thumbnail_processor(ThumbnailFormat.LIBRAW_THUMBNAIL_JPEG, b'\xff\xd8jpeg content')
+
+    # When / Then: the JPEG file content is returned as is when it is not decoded
+    assert read_thumbnail_libraw(None, processor, decode=False) == b'\xff\xd8jpeg content'
+
+
+def test_read_thumbnail_missing():
+    # Given: a processor of a file without thumbnail, and one with a thumbnail format which can not be returned
+    missing = _thumbnail_processor(ThumbnailFormat.LIBRAW_THUMBNAIL_UNKNOWN,
+                                   b'',
+                                   ret=LibRaw_errors.LIBRAW_NO_THUMBNAIL)
+    layer = _thumbnail_processor(ThumbnailFormat.LIBRAW_THUMBNAIL_LAYER, b'layers')
+
+    # When / Then: both are reported as unsupported
+    with pytest.raises(UnSupportedFileException, match="No supported thumbnail"):
+        read_thumbnail_libraw(None, missing)
+    with pytest.raises(UnSupportedFileException, match="Unsupported thumbnail format"):
+        read_thumbnail_libraw(None, layer)
+
+
+# Internal function to make an opened processor whose raw data has a margin of 2 rows on top and 1 column on the left.
+def _raw_processor(monkeypatch, raw):
+    processor = MagicMock()
+    processor.imgdata.rawdata = raw
+    sizes = processor.imgdata.sizes
+    sizes.raw_height, sizes.raw_width = raw.shape
+    sizes.top_margin, sizes.left_margin = 2, 1
+    sizes.height, sizes.width = raw.shape[0] - 2, raw.shape[1] - 1
+
+    def raw_metadata(libRaw):
+        metadata = ImageMetadata()
+        metadata.fileInfo.width, metadata.fileInfo.height = raw.shape[1], raw.shape[0]
+        metadata.fileInfo.pixelType = PixelType.BAYER_RGGB
+        return metadata
+
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw._convert_LibRawdata_to_Metadata", raw_metadata)
+    return processor
+
+
+def test_read_libraw_crop_visible(monkeypatch):
+    # Given: raw data with margins
+    raw = np.arange(8 * 9, dtype=np.uint16).reshape(8, 9)
+    processor = _raw_processor(monkeypatch, raw)
+
+    # When: the visible area is read
+    image, metadata = read_image_libraw(None, processor, crop='visible')
+
+    # Then: it is a view of the raw data without margins, with the bayer pattern seen from its origin
+    np.testing.assert_array_equal(image, raw[2:, 1:])
+    assert np.shares_memory(image, raw)
+    assert (metadata.fileInfo.width, metadata.fileInfo.height) == (8, 6)
+    assert metadata.fileInfo.pixelType == PixelType.BAYER_GRBG
+    processor.recycle.assert_not_called()
+
+
+def test_read_libraw_compact(monkeypatch):
+    # Given: raw data with margins
+    raw = np.arange(8 * 9, dtype=np.uint16).reshape(8, 9)
+    processor = _raw_processor(monkeypatch, raw)
+
+    # When: a region of the visible area is read compact
+    image, metadata = read_image_libraw(None, processor, roi=(2, 1, 4, 3), compact=True)
+
+    # Then: the region is copied relative to the visible area, and the raw data is freed
+    np.testing.assert_array_equal(image, raw[3:6, 3:7])
+    assert not np.shares_memory(image, raw)
+    assert (metadata.fileInfo.width, metadata.fileInfo.height) == (4, 3)
+    processor.recycle.assert_called_once()
+
+
+def test_read_libraw_crop_rejected(monkeypatch):
+    # Given: raw data with margins
+    processor = _raw_processor(monkeypatch, np.zeros((8, 9), dtype=np.uint16))
+
+    # When / Then: unknown crops, and regions outside of the visible area, are rejected
+    with pytest.raises(AssertionError, match="crop must be"):
+        read_image_libraw(None, processor, crop='active')
+    with pytest.raises(AssertionError, match="outside of the image"):
+        read_image_libraw(None, processor, roi=(4, 0, 6, 2), crop='visible')
+
+
+def test_read_libraw_binning(monkeypatch):
+    # Given: raw data with margins
+    raw = np.arange(8 * 9, dtype=np.uint16).reshape(8, 9)
+    processor = _raw_processor(monkeypatch, raw)
+
+    # When: the visible area is read binned
+    image, metadata = read_image_libraw(None, processor, crop='visible', binning=2)
+
+    # Then: each CFA channel is averaged in 2x2 into its plane, the bayer pattern is kept, and the raw data is freed
+    np.testing.assert_array_equal(image, bin_bayer(raw[2:, 1:], 2))
+    assert image.shape == (4, 1, 2)
+    assert (metadata.fileInfo.width, metadata.fileInfo.height) == (2, 1)
+    assert metadata.fileInfo.pixelType == PixelType.BAYER_GRBG
+    processor.recycle.assert_called_once()
+
+
+def test_read_libraw_binning_rejects_non_bayer(monkeypatch):
+    # Given: raw data without a bayer pattern
+    processor = _raw_processor(monkeypatch, np.zeros((8, 9), dtype=np.uint16))
+
+    def raw_metadata(libRaw):
+        metadata = ImageMetadata()
+        metadata.fileInfo.width, metadata.fileInfo.height = 9, 8
+        metadata.fileInfo.pixelType = PixelType.CUSTOM
+        return metadata
+
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw._convert_LibRawdata_to_Metadata", raw_metadata)
+
+    # When / Then: binning is rejected
+    with pytest.raises(AssertionError, match="only supported for bayer"):
+        read_image_libraw(None, processor, binning=2)
+
+
+class PooledLibRaw:
+    # LibRaw stand-in holding raw data until it is recycled.
+    created = 0
+
+    def __init__(self):
+        PooledLibRaw.created += 1
+        self.opened = []
+        self.recycled = 0
+
+    def open_file(self, path):
+        self.opened.append(path)
+        return LibRaw_errors.LIBRAW_SUCCESS
+
+    def recycle(self):
+        self.recycled += 1
+
+
+def _pool_read(monkeypatch, raw):
+    # read_image_libraw stand-in returning a view of the raw data.
+    PooledLibRaw.created = 0
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw.LibRaw", PooledLibRaw)
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw.read_image_libraw", lambda image_path, processor, **options:
+                        (raw[1:], ImageMetadata()))
+
+
+def test_processor_pool_reuses_recycled_processor(monkeypatch):
+    # Given: a pool and a raw file
+    raw = np.arange(16, dtype=np.uint16).reshape(4, 4)
+    _pool_read(monkeypatch, raw)
+    pool = LibRawProcessorPool()
+
+    # When: several files are read in the same thread
+    pool.read('a.NEF')
+    pool.read('b.NEF')
+    with pool.processor() as processor:
+        pass
+
+    # Then: one processor is created, and recycled after each read
+    assert PooledLibRaw.created == 1
+    assert processor.opened == ['a.NEF', 'b.NEF'] and processor.recycled == 3
+
+
+def test_processor_pool_nested_use(monkeypatch):
+    # Given: a pool whose processor is lent
+    _pool_read(monkeypatch, np.zeros((4, 4), dtype=np.uint16))
+    pool = LibRawProcessorPool()
+
+    # When: a processor is requested again before it is given back
+    with pool.processor() as outer:
+        with pool.processor() as inner:
+            pass
+
+    # Then: another processor is lent
+    assert inner is not outer and PooledLibRaw.created == 2
+
+
+def test_processor_pool_per_thread(monkeypatch):
+    # Given: a pool used by another thread
+    _pool_read(monkeypatch, np.zeros((4, 4), dtype=np.uint16))
+    pool = LibRawProcessorPool()
+    with pool.processor() as processor:
+        pass
+    thread = threading.Thread(target=pool.read, args=('a.NEF', ))
+    thread.start()
+    thread.join()
+
+    # Then: each thread has its own processor
+    assert PooledLibRaw.created == 2 and processor.opened == []
+
+
+def test_processor_pool_copies_views(monkeypatch):
+    # Given: a read returning a view of the raw data
+    raw = np.arange(16, dtype=np.uint16).reshape(4, 4)
+    _pool_read(monkeypatch, raw)
+
+    # When: the file is read with a pool
+    image, _ = LibRawProcessorPool().read('a.NEF')
+
+    # Then: the image is copied out of the raw data freed by recycle
+    np.testing.assert_array_equal(image, raw[1:])
+    assert image.flags.owndata and not np.shares_memory(image, raw)
+
+
+def test_processor_pool_open_failure(monkeypatch):
+    # Given: a file that LibRaw can not open
+    _pool_read(monkeypatch, np.zeros((4, 4), dtype=np.uint16))
+    monkeypatch.setattr(PooledLibRaw, "open_file", lambda self, path: LibRaw_errors.LIBRAW_FILE_UNSUPPORTED)
+    pool = LibRawProcessorPool()
+
+    # When / Then: the read fails, and the processor is still given back
+    with pytest.raises(UnSupportedFileException):
+        pool.read('a.txt')
+    with pool.processor() as processor:
+        assert processor.recycled == 1
+    assert PooledLibRaw.created == 1
+
+
+def test_libraw_reader_uses_pool(monkeypatch):
+    # Given: a reader with a pool
+    raw = np.arange(16, dtype=np.uint16).reshape(4, 4)
+    _pool_read(monkeypatch, raw)
+    reader = LibRawImageReader(pool=LibRawProcessorPool())
+
+    # When: a file is read
+    image, _ = reader.read(Path('a.NEF'), roi=(0, 0, 2, 2))
+
+    # Then: it is decoded by a processor of the pool
+    assert PooledLibRaw.created == 1 and image.flags.owndata
+
+
+def test_read_image_with_factory_pool(monkeypatch, tmp_path):
+    # Given: a camera RAW file routed to the LibRaw reader, then a pool set on the factory
+    raw = np.arange(16, dtype=np.uint16).reshape(4, 4)
+    _pool_read(monkeypatch, raw)
+    monkeypatch.setattr(ImageReaderFactory, "LIBRAW_READER", ImageReaderFactory.LIBRAW_READER)
+    image_path = tmp_path / 'a.NEF'
+    image_path.write_bytes(bytes(16))
+    assert ImageReaderFactory.get_reader(image_path).pool is None
+    ImageReaderFactory.set_libraw_pool(LibRawProcessorPool())
+
+    # When: the file is read twice by read_image
+    images = [read_image(image_path)[0] for _ in range(2)]
+
+    # Then: the routing decision follows the new reader, and one processor of the pool decodes both reads
+    assert ImageReaderFactory.get_reader(image_path).pool is not None
+    assert PooledLibRaw.created == 1 and all(image.flags.owndata for image in images)
+
+    # When / Then: the pool can be removed again
+    ImageReaderFactory.set_libraw_pool(None)
+    assert ImageReaderFactory.get_reader(image_path).pool is None
+
+
+def test_read_exif_libraw_header_only():
+    # Given: a processor on which open_file succeeded, for a file without a 2x2 bayer pattern
+    processor = MagicMock()
+    sizes = processor.imgdata.sizes
+    sizes.raw_width, sizes.raw_height, sizes.width, sizes.height = 6048, 4032, 6000, 4000
+    sizes.top_margin, sizes.left_margin, sizes.flip = 0, 0, 6
+    other = processor.imgdata.other
+    other.iso_speed, other.shutter, other.aperture, other.focal_len = 200, 0.004, 5.6, 23.0
+    other.timestamp, other.desc = '2024:05:01 10:00:00', ''
+    processor.imgdata.idata.make, processor.imgdata.idata.model = 'Fujifilm', 'X-T3'
+    processor.imgdata.idata.filters = 9
+
+    # When: its exif data is read
+    exif = read_exif_libraw(None, processor)
+
+    # Then: it is filled from the header, the raw data is neither unpacked nor parsed
+    assert (exif.make, exif.model, exif.isoSpeedRatings, exif.orientation) == ('Fujifilm', 'X-T3', 200, 8)
+    assert (exif.imageWidth, exif.imageHeight) == (6000, 4000)
+    assert exif.exposureTime.denominator == 250
+    processor.unpack.assert_not_called()
+    processor.bayer_pattern.assert_not_called()
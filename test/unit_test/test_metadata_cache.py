@@ -0,0 +1,174 @@
+import os
+
+import pytest
+
+from cxx_image_io import (ExifMetadata, ImageMetadata, LibRawParameters,
+                          Matrix3, Metadata, MetadataCache, PixelType,
+                          RgbColorSpace, probe_image, read_exif, read_image)
+
+pytestmark = pytest.mark.unittest
+
+
+class ProbeCountingReader:
+    # Reader stand-in counting the header reads.
+    def __init__(self):
+        self.probes = 0
+        self.exif_reads = 0
+
+    def probe(self, image_path, metadata_path=None):
+        self.probes += 1
+        return _metadata()
+
+    def read_exif(self, image_path):
+        self.exif_reads += 1
+        return _metadata().exifMetadata
+
+
+def _metadata():
+    metadata = ImageMetadata()
+    metadata.fileInfo.width, metadata.fileInfo.height = 8, 4
+    metadata.fileInfo.pixelType = PixelType.BAYER_GBRG
+    metadata.exifMetadata.make = 'Canon'
+    metadata.exifMetadata.exposureTime = ExifMetadata.Rational(1, 80)
+    metadata.exifMetadata.exposureBiasValue = ExifMetadata.SRational(-1, 3)
+    metadata.shootingParams.zoom = ImageMetadata.ROI(1, 2, 3, 4)
+    metadata.cameraControls.whiteBalance = ImageMetadata.WhiteBalance(1.5, 2.0)
+    metadata.calibrationData.blackLevel = 64
+    metadata.calibrationData.colorMatrix = Matrix3([[1, 0, 0], [0, 2, 0], [0, 0, 3]])
+    metadata.calibrationData.colorMatrixTarget = RgbColorSpace.SRGB
+    return metadata
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / 'image.tif'
+    path.write_bytes(bytes(16))
+    return path
+
+
+def test_metadata_cache_round_trip(tmp_path, image_path):
+    # Given: a cache holding the metadata of a file
+    with MetadataCache(tmp_path / 'cache.db') as cache:
+        cache.put_metadata(image_path, _metadata())
+
+        # When: it is read back
+        metadata = cache.get_metadata(image_path)
+
+    # Then: the metadata is rebuilt as a whole
+    assert metadata.serialize() == _metadata().serialize()
+    assert metadata.fileInfo.pixelType == PixelType.BAYER_GBRG
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_metadata_cache_libraw_metadata(tmp_path, image_path):
+    # Given: the metadata of a camera RAW file
+    metadata = Metadata(LibRawParameters(5344, 3584, 5218, 3482, 100, 126))
+    metadata.fileInfo.width = 5344
+
+    # When: it is cached, and the cache opened again
+    with MetadataCache(tmp_path / 'cache.db') as cache:
+        cache.put_metadata(image_path, metadata)
+    with MetadataCache(tmp_path / 'cache.db') as cache:
+        cached = cache.get_metadata(image_path)
+
+    # Then: it is still a Metadata with its LibRaw parameters
+    assert isinstance(cached, Metadata)
+    assert cached.serialize() == metadata.serialize()
+
+
+def test_metadata_cache_invalidated_by_changes(tmp_path, image_path):
+    # Given: a cache holding the metadata of a file and of a file with a sidecar
+    raw_path = tmp_path / 'image.plain16'
+    raw_path.write_bytes(bytes(64))
+    sidecar = tmp_path / 'image.json'
+    sidecar.write_text('{}')
+    cache = MetadataCache(tmp_path / 'cache.db')
+    cache.put_metadata(image_path, _metadata())
+    cache.put_metadata(raw_path, _metadata())
+
+    # When: the file, then the sidecar, are modified
+    stat = image_path.stat()
+    os.utime(image_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    sidecar.write_text('{"fileInfo": {}}')
+
+    # Then: their metadata is no longer returned
+    assert cache.get_metadata(image_path) is None
+    assert cache.get_metadata(raw_path) is None
+    assert (cache.hits, cache.misses) == (0, 2)
+    cache.close()
+
+
+def test_metadata_cache_skips_uncacheable(tmp_path, image_path):
+    # Given: metadata with a face detection, which can not be rebuilt from its serialized form
+    metadata = _metadata()
+    metadata.cameraControls.faceDetection = [ImageMetadata.ROI(0, 0, 10, 10)]
+
+    # When: it is cached
+    with MetadataCache(tmp_path / 'cache.db') as cache:
+        cache.put_metadata(image_path, metadata)
+
+        # Then: nothing is stored
+        assert len(cache) == 0
+
+
+def test_probe_image_with_cache(tmp_path, image_path, monkeypatch):
+    # Given: a reader selected for the file, and a cache
+    reader = ProbeCountingReader()
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda path: reader)
+
+    with MetadataCache(tmp_path / 'cache.db') as cache:
+        # When: the file is probed twice, then read lazily
+        first = probe_image(image_path, metadata_cache=cache)
+        second = probe_image(image_path, metadata_cache=cache)
+        _, lazy_metadata = read_image(image_path, roi=(0, 0, 2, 2), lazy=True, metadata_cache=cache)
+
+        # Then: its header is read once
+        assert reader.probes == 1 and (cache.hits, cache.misses) == (2, 1)
+    assert first.serialize() == second.serialize()
+    assert (lazy_metadata.fileInfo.width, lazy_metadata.fileInfo.height) == (2, 2)
+
+
+def test_read_image_with_cache_kept_apart_from_probes(tmp_path, image_path, monkeypatch):
+    # Given: a reader whose decoded metadata differs from the header, and a cache
+    class DecodingReader(ProbeCountingReader):
+        def read(self, image_path, metadata_path=None, **options):
+            metadata = _metadata()
+            metadata.calibrationData.whiteLevel = 1023
+            return None, metadata
+
+    reader = DecodingReader()
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda path: reader)
+
+    with MetadataCache(tmp_path / 'cache.db') as cache:
+        # When: the whole file is read, then probed
+        read_image(image_path, metadata_cache=cache)
+        metadata = probe_image(image_path, metadata_cache=cache)
+
+        # Then: the probe reads the header, and each metadata is cached under its own entry
+        assert reader.probes == 1 and metadata.calibrationData.whiteLevel is None
+        assert cache.get_metadata(image_path).calibrationData.whiteLevel is None
+        assert cache.get_metadata(image_path, decoded=True).calibrationData.whiteLevel == 1023
+
+
+def test_read_exif_with_cache(tmp_path, image_path, monkeypatch):
+    # Given: a reader selected for the file, and a cache
+    reader = ProbeCountingReader()
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda path: reader)
+
+    with MetadataCache(tmp_path / 'cache.db') as cache:
+        # When: the exif data is read twice
+        exif = [read_exif(image_path, metadata_cache=cache) for _ in range(2)]
+
+        # Then: the file is read once, and the exif data is the same
+        assert reader.exif_reads == 1 and (cache.hits, cache.misses) == (1, 1)
+    assert exif[0].serialize() == exif[1].serialize()
+
+
+def test_metadata_cache_missing_exif(tmp_path, image_path):
+    # Given: a file without exif data
+    with MetadataCache(tmp_path / 'cache.db') as cache:
+        assert cache.get_exif(image_path) == (False, None)
+        cache.put_exif(image_path, None)
+
+        # When / Then: its lack of exif data is cached too
+        assert cache.get_exif(image_path) == (True, None)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from cxx_image_io import pack_mipi10, pack_mipi12, unpack_mipi10, unpack_mipi12
+
+pytestmark = pytest.mark.unittest
+
+
+def test_unpack_mipi_rejects_partial_groups():
+    # Given: widths which are not a whole number of packed pixel groups
+    # When / Then: they are rejected before unpacking
+    with pytest.raises(AssertionError, match="MIPI RAW10 width must be a multiple of 4"):
+        unpack_mipi10(bytes(30), 6, 4)
+    with pytest.raises(AssertionError, match="MIPI RAW12 width must be a multiple of 2"):
+        unpack_mipi12(bytes(30), 5, 4)
+
+
+def test_unpack_mipi_rejects_non_contiguous_data():
+    # Given: a view on every other byte of a buffer
+    data = np.zeros(40, dtype=np.uint8)[::2]
+
+    # When / Then: it is rejected
+    with pytest.raises(AssertionError, match="contiguous"):
+        unpack_mipi10(data, 4, 4)
+
+
+def test_pack_mipi_rejects_images():
+    # Given: a 3D image and an image whose width is not a whole number of groups
+    # When / Then: they are rejected before packing
+    with pytest.raises(AssertionError, match="2D numpy array"):
+        pack_mipi10(np.zeros((4, 8, 3), dtype=np.uint16))
+    with pytest.raises(AssertionError, match="MIPI RAW12 width must be a multiple of 2"):
+        pack_mipi12(np.zeros((4, 7), dtype=np.uint16))
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from cxx_image import io
+
+from cxx_image_io.utils.io_cxx_image import _read_region
+from cxx_image_io.utils.out_array import check_out, copy_into
+
+pytestmark = pytest.mark.unittest
+
+
+def test_copy_into_reuses_out():
+    # Given: a decoded image and a preallocated array of the same shape and dtype
+    image = np.arange(6 * 8, dtype=np.uint16).reshape(6, 8)
+    out = np.zeros((6, 8), dtype=np.uint16)
+
+    # When: the image is copied into it
+    result = copy_into(out, image[::1])
+
+    # Then: the preallocated array holds the pixels and is returned
+    assert result is out
+    np.testing.assert_array_equal(out, image)
+
+
+@pytest.mark.parametrize("out", [
+    np.zeros((6, 8), dtype=np.uint8),
+    np.zeros((8, 6), dtype=np.uint16),
+    np.zeros((1, 6, 8), dtype=np.uint16),
+    np.zeros((6, 16), dtype=np.uint16)[:, ::2],
+    [[0] * 8] * 6,
+])
+def test_check_out_rejects(out):
+    # When / Then: arrays which would be broadcast, cast or strided are rejected
+    with pytest.raises(AssertionError):
+        check_out(out, (6, 8), np.uint16)
+
+
+def test_check_out_rejects_read_only():
+    # Given: a read-only array
+    out = np.zeros((6, 8), dtype=np.uint16)
+    out.flags.writeable = False
+
+    # When / Then: it can not be decoded into
+    with pytest.raises(AssertionError, match="writeable"):
+        check_out(out, (6, 8), np.uint16)
+
+
+@pytest.mark.parametrize("decoded", [True, False])
+def test_png_region_read_into_out(monkeypatch, decoded):
+    # Given: a PNG reader, and a row decoder which supports the layout of the file or not
+    class PngReader:
+        pass
+
+    calls = []
+
+    def read_png_region(path, x, y, w, h, out=None):
+        calls.append((path, (x, y, w, h)))
+        if not decoded:
+            return None
+        out[...] = 7
+        return out
+
+    monkeypatch.setattr(io, 'PngReader', PngReader, raising=False)
+    monkeypatch.setattr(io, 'readPngRegion', read_png_region, raising=False)
+    out = np.zeros((4, 5), dtype=np.uint8)
+
+    # When: the region is read into a preallocated array
+    result = _read_region(Path('image.png'), PngReader(), (1, 2, 5, 4), out)
+
+    # Then: the rows are decoded straight into it, or None is returned for the image to be decoded as a whole
+    assert calls == [('image.png', (1, 2, 5, 4))]
+    if decoded:
+        assert result is out and (out == 7).all()
+    else:
+        assert result is None
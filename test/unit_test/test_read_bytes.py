@@ -0,0 +1,66 @@
+import io
+from pathlib import Path
+
+import pytest
+
+import cxx_image_io
+from cxx_image_io import read_image_bytes
+from cxx_image_io.reader.factory import ImageReaderFactory
+
+pytestmark = pytest.mark.unittest
+
+JPEG = b'\xff\xd8\xff\xe1' + bytes(100)
+CR2 = b'II*\x00\x10\x00\x00\x00CR\x02\x00' + bytes(100)
+
+
+@pytest.fixture
+def read_calls(monkeypatch):
+    # Record the reader chosen for the content, and the file name it gets.
+    calls = []
+    for name, reader in (('cxx', ImageReaderFactory.CXX_READER), ('libraw', ImageReaderFactory.LIBRAW_READER)):
+        monkeypatch.setattr(reader,
+                            'read_bytes',
+                            lambda data, file_name, metadata=None, name=name: calls.append(
+                                (name, file_name, metadata)) or (data, metadata))
+    return calls
+
+
+@pytest.mark.parametrize("data, format_hint, metadata, expected", [
+    (JPEG, None, None, ('cxx', Path('memory.jpg'))),
+    (JPEG, 'nef', None, ('cxx', Path('memory.jpg'))),
+    (CR2, None, None, ('libraw', Path('memory'))),
+    (bytes(100), 'image.NEF', None, ('libraw', Path('memory.NEF'))),
+    (bytes(100), None, None, ('libraw', Path('memory'))),
+    (bytes(100), '.RAWMIPI12', 'sidecar', ('cxx', Path('memory.RAWMIPI12'))),
+    (bytes(100), 'nv12', 'sidecar', ('cxx', Path('memory.nv12'))),
+])
+def test_read_bytes_routing(read_calls, data, format_hint, metadata, expected):
+    # When: an image held in memory is read
+    read_image_bytes(data, format_hint, metadata)
+
+    # Then: the content, then the format hint and the metadata select the reader
+    assert read_calls == [expected + (metadata, )]
+
+
+def test_read_bytes_from_file_object(read_calls):
+    # Given: a file-like object, e.g. a download stream
+    stream = io.BytesIO(JPEG)
+
+    # When: it is read
+    data, _ = read_image_bytes(stream)
+
+    # Then: its content is given to the reader
+    assert data == JPEG
+    assert read_calls[0][0] == 'cxx'
+
+
+def test_read_bytes_non_contiguous():
+    # When / Then: a strided buffer is rejected
+    with pytest.raises(AssertionError, match="contiguous"):
+        read_image_bytes(memoryview(JPEG)[::2])
+
+
+def test_readers_implement_read_bytes():
+    # When / Then: read_bytes is part of the reader interface
+    with pytest.raises(NotImplementedError, match="read_bytes must be implemented in subclasses"):
+        cxx_image_io.BaseImageReader.read_bytes(None, b'', Path('memory'))
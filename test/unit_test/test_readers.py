@@ -1,9 +1,11 @@
 from pathlib import Path
 
+import numpy as np
 import pytest
 
-from cxx_image_io import (BaseImageReader, CxxImageReader, LibRaw_errors,
-                          LibRawImageReader)
+from cxx_image_io import (BaseImageReader, CxxImageReader, ImageMetadata,
+                          LibRaw_errors, LibRawImageReader,
+                          UnSupportedFileException, read_exif)
 
 # ---------------------------------------------------------------------
 # BaseImageReader tests
@@ -24,6 +26,48 @@ def test_base_reader_read_not_implemented():
         BaseImageReader.read(None, Path("x.raw"))
 
 
+def test_base_reader_probe_not_implemented():
+    # Given: a BaseImageReader class
+    # When / Then: calling probe on the class should raise NotImplementedError
+    with pytest.raises(NotImplementedError, match="probe must be implemented in subclasses"):
+        BaseImageReader.probe(None, Path("x.raw"))
+
+
+def test_base_reader_only_needs_can_read_and_read():
+    # Given: a reader implementing only can_read and read
+    class MinimalReader(BaseImageReader):
+        def can_read(self, image_path):
+            return True
+
+        def read(self, image_path, metadata_path=None, **options):
+            return np.zeros((2, 2)), None
+
+    # When: it is instantiated
+    reader = MinimalReader()
+
+    # Then: the optional methods report that they are not supported
+    with pytest.raises(NotImplementedError, match="probe must be implemented in subclasses"):
+        reader.probe(Path("x.raw"))
+    with pytest.raises(NotImplementedError, match="read_bytes must be implemented in subclasses"):
+        reader.read_bytes(b'', Path("x.raw"))
+
+
+def test_base_reader_iter_rows_from_read():
+    # Given: a reader which only decodes whole images
+    class WholeImageReader(BaseImageReader):
+        can_read = None
+
+        def read(self, image_path, metadata_path=None, **options):
+            return np.arange(5 * 4).reshape(5, 4), None
+
+    # When: the image is read by bands of 2 rows
+    bands = list(WholeImageReader().iter_rows(Path("x.raw"), rows_per_chunk=2))
+
+    # Then: the bands are cut out of the decoded image, the last one is shorter
+    assert [band.shape for band in bands] == [(2, 4), (2, 4), (1, 4)]
+    np.testing.assert_array_equal(np.concatenate(bands), np.arange(5 * 4).reshape(5, 4))
+
+
 # ---------------------------------------------------------------------
 # CxxImageReader tests
 # ---------------------------------------------------------------------
@@ -71,3 +115,159 @@ def test_libraw_try_open_fail(monkeypatch):
 
     # When / Then: libraw rejects → can_read = False
     assert not reader.can_read(Path("file.bad"))
+
+
+def test_libraw_probe_does_not_unpack(monkeypatch):
+    # Given: LibRaw patched to open the file and record any unpack
+    calls = []
+
+    class FakeImgData:
+        def __init__(self):
+            self.sizes = 'sizes parsed by open_file'
+            self.rawdata = type('RawData', (), {'sizes': None})()
+
+    class FakeLibRaw:
+        def __init__(self):
+            self.imgdata = FakeImgData()
+
+        def open_file(self, path):
+            return LibRaw_errors.LIBRAW_SUCCESS
+
+        def unpack(self):
+            calls.append('unpack')
+
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw.LibRaw", FakeLibRaw)
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw._convert_header_to_Metadata",
+                        lambda libRaw: libRaw.imgdata.rawdata.sizes)
+
+    # When: the raw file is probed
+    metadata = LibRawImageReader().probe(Path("x.cr2"))
+
+    # Then: metadata is built from the header sizes and the raw data is never unpacked
+    assert metadata == 'sizes parsed by open_file'
+    assert calls == []
+
+
+def test_libraw_probe_unsupported(monkeypatch):
+    # Given: LibRaw patched to reject the file
+    class FakeLibRaw:
+        def open_file(self, path):
+            return LibRaw_errors.LIBRAW_FILE_UNSUPPORTED
+
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_libraw.LibRaw", FakeLibRaw)
+
+    # When / Then: probing raises UnSupportedFileException
+    with pytest.raises(UnSupportedFileException):
+        LibRawImageReader().probe(Path("file.bad"))
+
+
+class OpenCountingLibRaw:
+    # LibRaw stand-in counting the files opened.
+    opened = []
+
+    def open_file(self, path):
+        OpenCountingLibRaw.opened.append(path)
+        return LibRaw_errors.LIBRAW_SUCCESS
+
+
+def test_libraw_read_reuses_processor_opened_by_can_read(monkeypatch, tmp_path):
+    # Given: a RAW file with an unknown extension, and readers recording the processor they get
+    OpenCountingLibRaw.opened = []
+    monkeypatch.setattr("cxx_image_io.reader.cxx_libraw_reader.LibRaw", OpenCountingLibRaw)
+    monkeypatch.setattr("cxx_image_io.reader.cxx_libraw_reader.read_image_libraw",
+                        lambda image_path, processor=None, **options: processor)
+    image_path = tmp_path / "image.unknown"
+    image_path.write_bytes(bytes(16))
+    reader = LibRawImageReader()
+
+    # When: the file is checked then read twice
+    assert reader.can_read(image_path)
+    first = reader.read(image_path)
+    second = reader.read(image_path)
+
+    # Then: the first read gets the processor opened by can_read, the second one opens the file again itself
+    assert isinstance(first, OpenCountingLibRaw)
+    assert second is None
+    assert OpenCountingLibRaw.opened == [str(image_path)]
+
+
+def test_libraw_read_does_not_reuse_processor_of_modified_file(monkeypatch, tmp_path):
+    # Given: a file checked by can_read, then rewritten
+    monkeypatch.setattr("cxx_image_io.reader.cxx_libraw_reader.LibRaw", OpenCountingLibRaw)
+    monkeypatch.setattr("cxx_image_io.reader.cxx_libraw_reader.read_image_libraw",
+                        lambda image_path, processor=None, **options: processor)
+    image_path = tmp_path / "image.unknown"
+    image_path.write_bytes(bytes(16))
+    reader = LibRawImageReader()
+    assert reader.can_read(image_path)
+    image_path.write_bytes(bytes(32))
+
+    # When / Then: the read opens the new file content
+    assert reader.read(image_path) is None
+
+
+def test_libraw_keeps_a_bounded_number_of_processors(monkeypatch, tmp_path):
+    # Given: more checked files than the reader keeps processors for
+    monkeypatch.setattr("cxx_image_io.reader.cxx_libraw_reader.LibRaw", OpenCountingLibRaw)
+    reader = LibRawImageReader()
+    paths = [tmp_path / "{0}.unknown".format(i) for i in range(reader.MAX_OPENED + 2)]
+    for path in paths:
+        path.write_bytes(bytes(16))
+        reader.can_read(path)
+
+    # When / Then: only the most recent processors are kept, the oldest files are closed
+    assert len(reader._opened) == reader.MAX_OPENED
+    assert reader._take_opened(paths[0]) is None
+    assert reader._take_opened(paths[-1]) is not None
+
+
+def test_libraw_read_rejects_scale():
+    # Given: a LibRaw reader
+    reader = LibRawImageReader()
+
+    # When / Then: a downscale is rejected before opening the file, raw data has no DCT to downscale in
+    with pytest.raises(AssertionError, match="only supported for JPEG and DNG"):
+        reader.read(Path("x.cr2"), scale=1 / 2)
+
+
+def test_cxx_read_rejects_binning():
+    # Given: a C++ reader
+    reader = CxxImageReader()
+
+    # When / Then: binning is rejected before opening the file, it applies to camera RAW data only
+    with pytest.raises(AssertionError, match="binning is only supported"):
+        reader.read(Path("x.tif"), binning=2)
+
+
+def test_read_exif_uses_selected_reader(monkeypatch, tmp_path):
+    # Given: a camera RAW file, routed to the LibRaw reader
+    image_path = tmp_path / "image.nef"
+    image_path.write_bytes(bytes(16))
+    exif = object()
+    reader = LibRawImageReader()
+    monkeypatch.setattr(reader, "read_exif", lambda path: exif)
+    monkeypatch.setattr("cxx_image_io.io.ImageReaderFactory.get_reader", lambda path: reader)
+
+    # When / Then: read_exif delegates to it
+    assert read_exif(image_path) is exif
+
+
+def test_base_reader_read_exif_from_probe():
+    # Given: a reader implementing probe only
+    class ProbeReader(BaseImageReader):
+        def can_read(self, image_path):
+            return True
+
+        def read(self, image_path, metadata_path=None, **options):
+            raise AssertionError("read must not be called")
+
+        def probe(self, image_path, metadata_path=None):
+            metadata = ImageMetadata()
+            metadata.exifMetadata.make = 'Canon'
+            return metadata
+
+        def read_bytes(self, data, file_name, metadata=None):
+            raise AssertionError("read_bytes must not be called")
+
+    # When / Then: the exif data is taken from the probed metadata
+    assert ProbeReader().read_exif(Path("x.cr2")).make == 'Canon'
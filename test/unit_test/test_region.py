@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from cxx_image_io import ImageLayout, ImageMetadata, PixelType
+from cxx_image_io.utils.region import (bin_bayer, check_roi, crop_image,
+                                       fill_binned_file_info,
+                                       fill_region_file_info, shift_pixel_type)
+
+pytestmark = pytest.mark.unittest
+
+
+@pytest.mark.parametrize("x, y, expected", [
+    (0, 0, PixelType.BAYER_GRBG),
+    (1, 0, PixelType.BAYER_RGGB),
+    (0, 1, PixelType.BAYER_BGGR),
+    (3, 5, PixelType.BAYER_GBRG),
+    (2, 4, PixelType.BAYER_GRBG),
+])
+def test_shift_bayer(x, y, expected):
+    # When / Then: the pattern of a region depends on the parity of its origin
+    assert shift_pixel_type(PixelType.BAYER_GRBG, x, y) == expected
+
+
+def test_shift_quad_bayer_and_others():
+    # When / Then: quad bayer keeps its blocks on even origins only, the other types do not change
+    assert shift_pixel_type(PixelType.QUADBAYER_RGGB, 2, 0) == PixelType.QUADBAYER_GRBG
+    assert shift_pixel_type(PixelType.QUADBAYER_RGGB, 2, 2) == PixelType.QUADBAYER_BGGR
+    assert shift_pixel_type(PixelType.QUADBAYER_RGGB, 4, 0) == PixelType.QUADBAYER_RGGB
+    assert shift_pixel_type(PixelType.QUADBAYER_RGGB, 1, 0) == PixelType.CUSTOM
+    assert shift_pixel_type(PixelType.RGB, 1, 1) == PixelType.RGB
+
+
+@pytest.mark.parametrize("roi", [(0, 0, 0, 4), (-1, 0, 2, 2), (6, 0, 3, 2), (0, 0, 2.0, 2), (0, 0, 2)])
+def test_check_roi_rejects(roi):
+    # When / Then: empty, negative, out of bounds or malformed regions are rejected
+    with pytest.raises(AssertionError):
+        check_roi(roi, 8, 6)
+
+
+def test_crop_and_file_info():
+    # Given: an image and its fileInfo
+    image = np.arange(6 * 8 * 3, dtype=np.uint8).reshape(6, 8, 3)
+    metadata = ImageMetadata()
+    metadata.fileInfo.width, metadata.fileInfo.height = 8, 6
+    metadata.fileInfo.pixelType = PixelType.BAYER_RGGB
+    check_roi((1, 1, 7, 5), 8, 6)
+
+    # When: a region is cropped
+    region = crop_image(image, (1, 1, 7, 5))
+    fill_region_file_info(metadata.fileInfo, (1, 1, 7, 5))
+
+    # Then: the region owns its pixels, and fileInfo describes it
+    assert region.flags.owndata and region.flags.c_contiguous
+    np.testing.assert_array_equal(region, image[1:6, 1:8])
+    assert (metadata.fileInfo.width, metadata.fileInfo.height) == (7, 5)
+    assert metadata.fileInfo.pixelType == PixelType.BAYER_BGGR
+
+
+@pytest.mark.parametrize("binning", [1, 2, 3])
+def test_bin_bayer(binning):
+    # Given: a bayer image whose size is not a multiple of the blocks
+    image = np.random.default_rng(0).integers(0, 4096, size=(13, 17), dtype=np.uint16)
+
+    # When: it is binned
+    binned = bin_bayer(image, binning)
+
+    # Then: each plane pixel is the rounded mean of the pixels of its channel in its block
+    block = 2 * binning
+    assert binned.shape == (4, 13 // block, 17 // block) and binned.dtype == np.uint16
+    for channel, y, x in np.ndindex(binned.shape):
+        top, left = y * block + channel // 2, x * block + channel % 2
+        same_color = image[top:top + block:2, left:left + block:2]
+        assert binned[channel, y, x] == np.floor(same_color.mean() + 0.5)
+
+
+def test_bin_bayer_float_and_errors():
+    # When / Then: float images are averaged, images smaller than a block or not bayer are rejected
+    image = np.arange(16, dtype=np.float32).reshape(4, 4)
+    np.testing.assert_allclose(bin_bayer(image, 2), [[[5]], [[6]], [[9]], [[10]]])
+    with pytest.raises(AssertionError):
+        bin_bayer(image, 3)
+    with pytest.raises(AssertionError):
+        bin_bayer(np.zeros((4, 4, 3), dtype=np.uint8), 2)
+
+
+def test_fill_binned_file_info():
+    # Given: the fileInfo of a bayer image
+    metadata = ImageMetadata()
+    metadata.fileInfo.width, metadata.fileInfo.height = 4000, 3001
+    metadata.fileInfo.pixelType = PixelType.BAYER_GRBG
+
+    # When: it is adjusted to the binned image
+    fill_binned_file_info(metadata.fileInfo, 2)
+
+    # Then: the size is the one of the planes of bin_bayer, and the pattern giving their colors is kept
+    assert (metadata.fileInfo.width, metadata.fileInfo.height) == (1000, 750)
+    assert metadata.fileInfo.pixelType == PixelType.BAYER_GRBG
+    assert metadata.fileInfo.imageLayout == ImageLayout.PLANAR
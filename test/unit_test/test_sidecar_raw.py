@@ -0,0 +1,267 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from cxx_image_io import ImageLayout, PixelRepresentation, PixelType
+from cxx_image_io.utils.io_cxx_image import iter_rows_cxx
+from cxx_image_io.utils.io_sidecar_raw import map_plain_image, read_raw_region
+
+pytestmark = pytest.mark.unittest
+
+
+class FakeReader:
+    # Reader stand-in exposing the layout parsed from a sidecar.
+    def __init__(self,
+                 width,
+                 height,
+                 pixel_type=PixelType.BAYER_RGGB,
+                 image_layout=ImageLayout.PLANAR,
+                 pixel_repr=PixelRepresentation.UINT16):
+        self._layout = (width, height, pixel_type, image_layout, pixel_repr)
+
+    def width(self):
+        return self._layout[0]
+
+    def height(self):
+        return self._layout[1]
+
+    def pixelType(self):
+        return self._layout[2]
+
+    def imageLayout(self):
+        return self._layout[3]
+
+    def pixelRepresentation(self):
+        return self._layout[4]
+
+
+class FakePlainReader(FakeReader):
+    pass
+
+
+class FakeCfaReader(FakeReader):
+    pass
+
+
+class FakeMipiRaw10Reader(FakeReader):
+    pass
+
+
+class FakeMipiRaw12Reader(FakeReader):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def fake_plain_reader_type(monkeypatch):
+    monkeypatch.setattr(
+        "cxx_image_io.utils.io_sidecar_raw.io",
+        SimpleNamespace(PlainReader=FakePlainReader,
+                        CfaReader=FakeCfaReader,
+                        MipiRaw10Reader=FakeMipiRaw10Reader,
+                        MipiRaw12Reader=FakeMipiRaw12Reader))
+
+
+def _pack_mipi_raw10(image):
+    # 4 pixels in 5 bytes: the 8 high bits of each pixel, then their 2 low bits from the first pixel.
+    pixels = image.reshape(image.shape[0], -1, 4)
+    low = sum((pixels[..., i] & 3) << (2 * i) for i in range(4))
+    return np.concatenate([pixels >> 2, low[..., None]], axis=-1).astype(np.uint8).reshape(image.shape[0], -1)
+
+
+def _pack_mipi_raw12(image):
+    # 2 pixels in 3 bytes: the 8 high bits of each pixel, then their 4 low bits from the first pixel.
+    pixels = image.reshape(image.shape[0], -1, 2)
+    low = (pixels[..., 0] & 0xF) | ((pixels[..., 1] & 0xF) << 4)
+    return np.concatenate([pixels >> 4, low[..., None]], axis=-1).astype(np.uint8).reshape(image.shape[0], -1)
+
+
+def test_map_bayer_plain16(tmp_path):
+    # Given: a 16 bits bayer plain file
+    image = np.arange(6 * 8, dtype=np.uint16).reshape(6, 8)
+    image_path = tmp_path / 'bayer.plain16'
+    image.tofile(image_path)
+
+    # When: the file is mapped
+    mapped = map_plain_image(image_path, FakePlainReader(8, 6))
+
+    # Then: the pixels come from a read-only memmap of the file
+    assert isinstance(mapped, np.memmap)
+    assert not mapped.flags.writeable
+    np.testing.assert_array_equal(mapped, image)
+
+
+def test_map_padded_rows(tmp_path):
+    # Given: a plain file whose rows of 10 pixels are aligned to 16 pixels
+    rows = np.arange(6 * 16, dtype=np.uint16).reshape(6, 16)
+    image_path = tmp_path / 'bayer.plain16'
+    rows.tofile(image_path)
+
+    # When: the file is mapped
+    mapped = map_plain_image(image_path, FakePlainReader(10, 6))
+
+    # Then: the padding is skipped by the row stride, as read_image_cxx does
+    assert mapped.shape == (6, 10)
+    assert mapped.strides == (32, 2)
+    np.testing.assert_array_equal(mapped, rows[:, :10])
+
+
+def test_map_interleaved_rgb_and_yuv(tmp_path):
+    # Given: an interleaved 8 bits RGB file and a YUV 420 file
+    rgb = np.arange(6 * 8 * 3, dtype=np.uint8).reshape(6, 8, 3)
+    yuv = np.arange(12 * 8, dtype=np.uint8).reshape(12, 8)
+    rgb.tofile(tmp_path / 'rgb.plain')
+    yuv.tofile(tmp_path / 'image.yuv')
+
+    # When: both files are mapped
+    mapped_rgb = map_plain_image(
+        tmp_path / 'rgb.plain', FakePlainReader(8, 6, PixelType.RGB, ImageLayout.INTERLEAVED,
+                                                PixelRepresentation.UINT8))
+    mapped_yuv = map_plain_image(tmp_path / 'image.yuv',
+                                 FakePlainReader(8, 8, PixelType.YUV, ImageLayout.YUV_420, PixelRepresentation.UINT8))
+
+    # Then: they have the shapes of the decoded images
+    np.testing.assert_array_equal(mapped_rgb, rgb)
+    np.testing.assert_array_equal(mapped_yuv, yuv)
+
+
+def _write_cfa(image_path, image):
+    # 128 bytes header, then the 16 bits little endian pixels.
+    with open(image_path, 'wb') as f:
+        f.write(b' AFC' + bytes(124))
+        f.write(image.astype('<u2').tobytes())
+
+
+def test_map_cfa(tmp_path):
+    # Given: a CFA file, and a truncated one
+    image = np.arange(6 * 8, dtype=np.uint16).reshape(6, 8)
+    _write_cfa(tmp_path / 'bayer.cfa', image)
+    _write_cfa(tmp_path / 'truncated.cfa', image[:5])
+
+    # When: the files are mapped
+    mapped = map_plain_image(tmp_path / 'bayer.cfa', FakeCfaReader(8, 6))
+    truncated = map_plain_image(tmp_path / 'truncated.cfa', FakeCfaReader(8, 6))
+
+    # Then: the pixels after the header come from a read-only memmap, the truncated file will be read as usual
+    assert isinstance(mapped, np.memmap) and not mapped.flags.writeable
+    np.testing.assert_array_equal(mapped, image)
+    assert truncated is None
+
+
+def test_map_unsupported_files(tmp_path):
+    # Given: a planar RGB file, a file too small for its layout, and a reader which is not plain
+    image_path = tmp_path / 'image.plain'
+    np.zeros(6 * 8 * 3, dtype=np.uint8).tofile(image_path)
+
+    # When / Then: they are not mapped, and will be read as usual
+    assert map_plain_image(image_path,
+                           FakePlainReader(8, 6, PixelType.RGB, ImageLayout.PLANAR, PixelRepresentation.UINT8)) is None
+    assert map_plain_image(image_path, FakePlainReader(80, 6)) is None
+    assert map_plain_image(image_path, object()) is None
+
+
+@pytest.mark.parametrize("reader_type", [FakePlainReader, FakeCfaReader])
+def test_plain_region(tmp_path, reader_type):
+    # Given: a 16 bits bayer plain or CFA file
+    image = np.arange(6 * 8, dtype=np.uint16).reshape(6, 8)
+    image_path = tmp_path / 'bayer.raw'
+    if reader_type is FakeCfaReader:
+        _write_cfa(image_path, image)
+    else:
+        image.tofile(image_path)
+
+    # When: a region is read
+    region = read_raw_region(image_path, reader_type(8, 6), (3, 1, 4, 2))
+
+    # Then: the region is an array of its own
+    assert not isinstance(region, np.memmap)
+    np.testing.assert_array_equal(region, image[1:3, 3:7])
+
+
+@pytest.mark.parametrize("reader_type, pack, bits", [(FakeMipiRaw10Reader, _pack_mipi_raw10, 10),
+                                                     (FakeMipiRaw12Reader, _pack_mipi_raw12, 12)])
+@pytest.mark.parametrize("roi", [(0, 0, 16, 6), (5, 1, 7, 3), (3, 5, 1, 1)])
+def test_mipi_region(tmp_path, reader_type, pack, bits, roi):
+    # Given: a MIPI packed file with rows padded to 32 bytes
+    image = np.random.default_rng(bits).integers(0, 1 << bits, (6, 16), dtype=np.uint16)
+    packed = pack(image)
+    image_path = tmp_path / 'bayer.RAWMIPI'
+    np.pad(packed, ((0, 0), (0, 32 - packed.shape[1]))).tofile(image_path)
+
+    # When: a region is read
+    x, y, w, h = roi
+    region = read_raw_region(image_path, reader_type(16, 6), roi)
+
+    # Then: only its pixels are unpacked
+    assert region.dtype == np.uint16
+    np.testing.assert_array_equal(region, image[y:y + h, x:x + w])
+
+
+def test_region_into_out(tmp_path):
+    # Given: a MIPI RAW10 file, and a preallocated array
+    image = np.random.default_rng(0).integers(0, 1 << 10, (6, 16), dtype=np.uint16)
+    image_path = tmp_path / 'bayer.RAWMIPI'
+    _pack_mipi_raw10(image).tofile(image_path)
+    out = np.zeros((6, 16), dtype=np.uint16)
+
+    # When: the whole image is read into it
+    result = read_raw_region(image_path, FakeMipiRaw10Reader(16, 6), (0, 0, 16, 6), out)
+
+    # Then: the pixels are unpacked into the preallocated array
+    assert result is out
+    np.testing.assert_array_equal(out, image)
+
+
+def test_region_unsupported_files(tmp_path):
+    # Given: a YUV 420 file, and a MIPI file whose width is not a whole number of pixel groups
+    image_path = tmp_path / 'image.yuv'
+    np.zeros(12 * 8, dtype=np.uint8).tofile(image_path)
+
+    # When / Then: they are not read by rows, and will be decoded as a whole
+    assert read_raw_region(image_path,
+                           FakePlainReader(8, 8, PixelType.YUV, ImageLayout.YUV_420, PixelRepresentation.UINT8),
+                           (0, 0, 2, 2)) is None
+    assert read_raw_region(image_path, FakeMipiRaw10Reader(6, 8), (0, 0, 2, 2)) is None
+    assert read_raw_region(image_path, object(), (0, 0, 2, 2)) is None
+
+
+@pytest.mark.parametrize("rows_per_chunk", [1, 4, 6, 10])
+def test_iter_rows_mipi(tmp_path, monkeypatch, rows_per_chunk):
+    # Given: a MIPI RAW12 file, opened by a reader parsing its sidecar
+    image = np.random.default_rng(1).integers(0, 1 << 12, (6, 16), dtype=np.uint16)
+    image_path = tmp_path / 'bayer.RAWMIPI12'
+    _pack_mipi_raw12(image).tofile(image_path)
+    monkeypatch.setattr(
+        "cxx_image_io.utils.io_cxx_image.io",
+        SimpleNamespace(TiffReader=(),
+                        DngReader=(),
+                        JpegReader=(),
+                        PngReader=(),
+                        PlainReader=FakePlainReader,
+                        CfaReader=FakeCfaReader,
+                        MipiRaw10Reader=FakeMipiRaw10Reader,
+                        MipiRaw12Reader=FakeMipiRaw12Reader))
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_image._make_reader",
+                        lambda image_path, metadata_path, image_format=None: (FakeMipiRaw12Reader(16, 6), None))
+
+    # When: the file is read by bands
+    bands = list(iter_rows_cxx(image_path, rows_per_chunk=rows_per_chunk))
+
+    # Then: each band is unpacked on its own, and the bands make the image
+    assert [band.shape[0] for band in bands[:-1]] == [rows_per_chunk] * (len(bands) - 1)
+    np.testing.assert_array_equal(np.concatenate(bands), image)
+
+
+def test_iter_rows_rejects_yuv(tmp_path, monkeypatch):
+    # Given: a YUV 420 file
+    image_path = tmp_path / 'image.yuv'
+    np.zeros(12 * 8, dtype=np.uint8).tofile(image_path)
+    reader = FakePlainReader(8, 8, PixelType.YUV, ImageLayout.YUV_420, PixelRepresentation.UINT8)
+    monkeypatch.setattr("cxx_image_io.utils.io_cxx_image._make_reader",
+                        lambda image_path, metadata_path, image_format=None: (reader, None))
+
+    # When / Then: its rows are rejected, and so is an empty band
+    with pytest.raises(AssertionError, match="not supported for YUV 420"):
+        iter_rows_cxx(image_path)
+    with pytest.raises(AssertionError, match="rows_per_chunk"):
+        iter_rows_cxx(image_path, rows_per_chunk=0)
@@ -0,0 +1,178 @@
+import struct
+
+import pytest
+
+from cxx_image_io.reader.factory import ImageReaderFactory
+from cxx_image_io.reader.signature import (CAMERA_TIFF, TIFF,
+                                           sniff_image_bytes,
+                                           sniff_image_format)
+from cxx_image_io.utils import io_cxx_image
+
+pytestmark = pytest.mark.unittest
+
+
+def _tiff_header(entries, byte_order=b'II', extra=b''):
+    # Build a TIFF header with IFD0 right after it, entries are (tag, type, count, value bytes).
+    endian = '<' if byte_order == b'II' else '>'
+    magic = b'*\x00' if byte_order == b'II' else b'\x00*'
+    ifd = struct.pack(endian + 'H', len(entries))
+    for tag, tag_type, count, value in entries:
+        ifd += struct.pack(endian + 'HHI', tag, tag_type, count) + value.ljust(4, b'\x00')
+    return byte_order + magic + struct.pack(endian + 'I', 8) + ifd + struct.pack(endian + 'I', 0) + extra
+
+
+@pytest.fixture
+def write_file(tmp_path):
+    def write(name, content):
+        path = tmp_path / name
+        path.write_bytes(content)
+        return path
+
+    return write
+
+
+@pytest.mark.parametrize("content, expected", [
+    (b'\xff\xd8\xff\xe1' + bytes(100), 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n' + bytes(100), 'png'),
+    (b'IIRO\x08\x00\x00\x00' + bytes(100), 'orf'),
+    (b'IIU\x00\x08\x00\x00\x00' + bytes(100), 'rw2'),
+    (b'FUJIFILMCCD-RAW 0201' + bytes(100), 'raf'),
+    (b'\x00\x00\x00\x18ftypcrx ' + bytes(100), 'cr3'),
+    (b'II*\x00\x10\x00\x00\x00CR\x02\x00' + bytes(100), 'cr2'),
+    (bytes(100), None),
+])
+def test_sniff_magic(write_file, content, expected):
+    # Given: a file starting with a known signature, whatever its extension
+    path = write_file('image.bin', content)
+
+    # When / Then: the format is recognized from the content
+    assert sniff_image_format(path) == expected
+
+
+def test_sniff_bmp_checks_file_size(write_file):
+    # Given: a real BMP header, and a raw buffer which happens to start with 'BM'
+    bmp = write_file('a.bin', b'BM' + struct.pack('<I', 64) + bytes(58))
+    raw = write_file('b.bin', b'BM' + struct.pack('<I', 1234) + bytes(58))
+
+    # When / Then: only the header holding the file size is a BMP
+    assert sniff_image_format(bmp) == 'bmp'
+    assert sniff_image_format(raw) is None
+
+
+@pytest.mark.parametrize("byte_order", [b'II', b'MM'])
+def test_sniff_tiff_ifd0(write_file, byte_order):
+    # Given: TIFF files with a DNGVersion tag, with a long camera Make, and without any marker
+    endian = '<' if byte_order == b'II' else '>'
+    # The long Make string is stored after IFD0 with a single entry: 8 + 2 + 12 + 4 = 26
+    make = (0x010F, 2, 10, struct.pack(endian + 'I', 26))
+    dng = write_file('a.bin', _tiff_header([(0xC612, 1, 4, b'\x01\x04\x00\x00')], byte_order))
+    nef = write_file('b.bin', _tiff_header([make], byte_order, b'NIKON CORP'))
+    tif = write_file('c.bin', _tiff_header([(0x0100, 3, 1, b'\x01\x00')], byte_order))
+
+    # When / Then: IFD0 tells DNG, camera TIFF and plain TIFF apart
+    assert sniff_image_format(dng) == 'dng'
+    assert sniff_image_format(nef) == CAMERA_TIFF
+    assert sniff_image_format(tif) == TIFF
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+def test_sniff_bytes(wrap):
+    # Given: contents held in memory, a TIFF with its Make after IFD0, a BMP, and a buffer too short for a header
+    make = (0x010F, 2, 10, struct.pack('<I', 26))
+    nef = _tiff_header([make], b'II', b'NIKON CORP')
+    bmp = b'BM' + struct.pack('<I', 64) + bytes(58)
+
+    # When / Then: they are recognized as the same files on disk
+    assert sniff_image_bytes(wrap(nef)) == CAMERA_TIFF
+    assert sniff_image_bytes(wrap(bmp)) == 'bmp'
+    assert sniff_image_bytes(wrap(b'II*\x00')) is None
+
+
+def test_sniff_missing_file(tmp_path):
+    # When / Then: a missing file is not recognized, and does not raise
+    assert sniff_image_format(tmp_path / 'missing.jpg') is None
+
+
+def test_factory_routes_by_content(write_file):
+    # Given: a JPEG with a RAW extension, and a CR2 with an unknown extension
+    jpeg = write_file('photo.nef', b'\xff\xd8\xff\xe1' + bytes(100))
+    cr2 = write_file('photo.dat', b'II*\x00\x10\x00\x00\x00CR\x02\x00' + bytes(100))
+
+    # When / Then: the content wins over the extension, the C++ reader decodes the file as its content format
+    assert ImageReaderFactory.get_reader(jpeg).image_format == 'jpeg'
+    assert ImageReaderFactory.get_reader(cr2) is ImageReaderFactory.LIBRAW_READER
+
+
+@pytest.mark.parametrize("name, expected", [('photo.nef', 'photo.jpg'), ('photo.JPEG', 'photo.JPEG'),
+                                            ('photo', 'photo.jpg')])
+def test_cxx_reader_named_for_content(write_file, monkeypatch, name, expected):
+    # Given: a JPEG file, and the C++ reader factories recording the file name they get
+    jpeg = write_file(name, b'\xff\xd8\xff\xe1' + bytes(100))
+    calls = []
+    monkeypatch.setattr(io_cxx_image.io, "makeReader", lambda path, metadata: calls.append(path), raising=False)
+    monkeypatch.setattr(io_cxx_image.io, "MemoryStream", lambda data: bytes(data), raising=False)
+    monkeypatch.setattr(io_cxx_image.io,
+                        "makeReaderFromStream",
+                        lambda path, stream, metadata: calls.append((path, stream)),
+                        raising=False)
+
+    # When: the reader of the file is made for the format of its content
+    io_cxx_image._open_reader(jpeg, None, 'jpeg')
+
+    # Then: a file with another extension is read from a mapping, under the name of its format
+    if expected == name:
+        assert calls == [str(jpeg)]
+    else:
+        assert calls == [(str(jpeg.with_name(expected)), jpeg.read_bytes())]
+
+
+def test_factory_routes_sidecar_raw_without_libraw(write_file, monkeypatch):
+    # Given: a MIPI raw buffer with its sidecar, and LibRaw trial opens recorded
+    calls = []
+    monkeypatch.setattr(ImageReaderFactory.LIBRAW_READER, '_can_open', lambda image_path: calls.append(image_path))
+    raw = write_file('bayer.RAWMIPI', bytes(range(256)) * 4)
+    write_file('bayer.json', b'{}')
+
+    # When / Then: the sidecar routes to the C++ reader without opening the file with LibRaw
+    assert ImageReaderFactory.get_reader(raw) is ImageReaderFactory.CXX_READER
+    assert calls == []
+
+
+def test_factory_caches_decision(write_file, monkeypatch):
+    # Given: a file with no signature, routed by a LibRaw trial open
+    calls = []
+
+    def can_open(image_path):
+        calls.append(image_path)
+        return True
+
+    monkeypatch.setattr(ImageReaderFactory.LIBRAW_READER, '_can_open', can_open)
+    path = write_file('unknown.bin', bytes(100))
+
+    # When: the reader is selected twice
+    first = ImageReaderFactory.get_reader(path)
+    second = ImageReaderFactory.get_reader(path)
+
+    # Then: the file was opened only once
+    assert first is second is ImageReaderFactory.LIBRAW_READER
+    assert calls == [path]
+
+    # When: the file changes
+    path.write_bytes(bytes(200))
+
+    # Then: the decision is computed again
+    ImageReaderFactory.get_reader(path)
+    assert len(calls) == 2
+
+
+def test_factory_decision_follows_sidecar(write_file, monkeypatch):
+    # Given: a file with no signature, routed to LibRaw by a trial open
+    monkeypatch.setattr(ImageReaderFactory.LIBRAW_READER, '_can_open', lambda image_path: True)
+    path = write_file('bayer.raw', bytes(100))
+    assert ImageReaderFactory.get_reader(path) is ImageReaderFactory.LIBRAW_READER
+
+    # When / Then: a sidecar written next to it routes it to the C++ reader, and its removal back to LibRaw
+    sidecar = write_file('bayer.json', b'{}')
+    assert ImageReaderFactory.get_reader(path) is ImageReaderFactory.CXX_READER
+    sidecar.unlink()
+    assert ImageReaderFactory.get_reader(path) is ImageReaderFactory.LIBRAW_READER